@@ -1,5 +1,7 @@
 from django.contrib import admin
-from core.models import BlogCategory, BlogPost, GalleryItem, FeedbackMessage, SiteSetting
+from core.models import (
+    BlogCategory, BlogPost, GalleryItem, FeedbackMessage, RequestMetric, SiteSetting, Tag,
+)
 
 
 @admin.register(BlogCategory)
@@ -16,6 +18,13 @@ class BlogPostAdmin(admin.ModelAdmin):
     prepopulated_fields = {"slug": ("title",)}
 
 
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ("name", "slug", "post_count")
+    search_fields = ("name",)
+    readonly_fields = ("post_count",)
+
+
 @admin.register(GalleryItem)
 class GalleryItemAdmin(admin.ModelAdmin):
     list_display = ("title", "category", "media_type", "sort_order")
@@ -33,3 +42,9 @@ class FeedbackMessageAdmin(admin.ModelAdmin):
 @admin.register(SiteSetting)
 class SiteSettingAdmin(admin.ModelAdmin):
     list_display = ("key", "value")
+
+
+@admin.register(RequestMetric)
+class RequestMetricAdmin(admin.ModelAdmin):
+    list_display = ("path", "view_name", "status_code", "query_count", "total_ms", "created_at")
+    list_filter = ("view_name", "status_code")
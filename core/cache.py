@@ -0,0 +1,39 @@
+import fcntl
+import hashlib
+import os
+from contextlib import contextmanager
+
+from django.core.cache.backends.filebased import FileBasedCache
+
+LOCK_STRIPES = 64
+
+
+class LockingFileBasedCache(FileBasedCache):
+    """FileBasedCache whose add() and incr() are atomic across processes.
+
+    Every gunicorn worker on the host shares the directory, so counters (rate
+    limits) and invalidation stamps are seen by all of them. The stock backend
+    implements incr() as get-then-set; here it runs under an flock on one of
+    a fixed set of lock files.
+    """
+
+    def add(self, key, value, timeout=None, version=None):
+        with self._locked(key, version):
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with self._locked(key, version):
+            return super().incr(key, delta, version)
+
+    @contextmanager
+    def _locked(self, key, version):
+        digest = hashlib.md5(self.make_and_validate_key(key, version).encode(), usedforsecurity=False)
+        lock_dir = os.path.join(self._dir, "locks")
+        os.makedirs(lock_dir, exist_ok=True)
+        path = os.path.join(lock_dir, f"{int(digest.hexdigest(), 16) % LOCK_STRIPES}.lock")
+        with open(path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
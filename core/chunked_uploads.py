@@ -0,0 +1,144 @@
+import fcntl
+import json
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+
+from core.uploads import UploadError, check_upload, process_upload
+
+# What the browser is asked to send per request.
+CHUNK_SIZE = 8 * 1024 * 1024
+# Request bodies are copied to disk this much at a time.
+COPY_BUFFER = 64 * 1024
+# Unfinished uploads untouched for this long are removed.
+UPLOAD_EXPIRY = 24 * 60 * 60
+
+UPLOAD_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class OffsetMismatch(UploadError):
+    """A chunk didn't start where the file on disk ends."""
+
+    def __init__(self, offset):
+        super().__init__(f"Expected a chunk at offset {offset}.")
+        self.offset = offset
+
+
+class ChunkedUpload:
+    """A file arriving in chunks, appended to <id>.part with its details in <id>.json.
+
+    Chunks must arrive in order; each one says which offset it starts at, and
+    the size of the part file on disk is the only record of progress. So
+    after a dropped connection the browser asks for the offset and carries
+    on from there, and a chunk cut off halfway still counts for what arrived.
+    Appends hold an exclusive lock on the part file, so a retried chunk
+    racing its original can't write twice. The append that writes the last
+    byte renames the part file to <id>.finishing under that lock, which
+    claims the file for finish(); later chunks find no part file to add to.
+    """
+
+    def __init__(self, directory, upload_id):
+        if not UPLOAD_ID_RE.match(upload_id):
+            raise UploadError("Unknown upload.")
+        self.directory = Path(directory)
+        self.id = upload_id
+        self.part = self.directory / f"{upload_id}.part"
+        self.finishing = self.directory / f"{upload_id}.finishing"
+        self.meta_path = self.directory / f"{upload_id}.json"
+
+    @classmethod
+    def create(cls, directory, folder, content_type, size, owner):
+        check_upload(folder, content_type, size)
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        remove_expired(directory)
+        upload = cls(directory, uuid.uuid4().hex)
+        upload.part.touch()
+        upload.meta_path.write_text(json.dumps({
+            "folder": folder, "content_type": content_type, "size": size, "owner": owner,
+        }))
+        return upload
+
+    @property
+    def meta(self):
+        try:
+            return json.loads(self.meta_path.read_text())
+        except FileNotFoundError:
+            raise UploadError("Unknown upload.")
+
+    @property
+    def offset(self):
+        for path in (self.part, self.finishing):
+            try:
+                return path.stat().st_size
+            except FileNotFoundError:
+                pass
+        raise UploadError("Unknown upload.")
+
+    def append(self, offset, stream, length):
+        """Copy length bytes from stream onto the part file. Returns the new offset.
+
+        Memory use is COPY_BUFFER however large the chunk is. When the new
+        offset is the file's size, this call has claimed it and the caller
+        must finish() it.
+        """
+        size = self.meta["size"]
+        if not length and size:
+            raise UploadError("The chunk is empty.")
+        try:
+            f = open(self.part, "r+b")
+        except FileNotFoundError:
+            raise UploadError("Unknown upload.")
+        with f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            if not self.part.exists():
+                raise UploadError("Unknown upload.")  # Claimed or discarded while we waited.
+            current = f.seek(0, os.SEEK_END)
+            if offset != current:
+                raise OffsetMismatch(current)
+            if current + length > size:
+                raise UploadError("The chunk runs past the end of the file.")
+            remaining = length
+            while remaining:
+                piece = stream.read(min(COPY_BUFFER, remaining))
+                if not piece:
+                    break
+                f.write(piece)
+                remaining -= len(piece)
+            f.flush()
+            if f.tell() == size:
+                self.part.rename(self.finishing)
+            return f.tell()
+
+    def finish(self):
+        """Stream the claimed file through the image pipeline. Returns its URL."""
+        folder = self.meta["folder"]
+        try:
+            with open(self.finishing, "rb") as f:
+                return process_upload(f, folder)
+        except FileNotFoundError:
+            raise UploadError("Unknown upload.")
+        finally:
+            self.discard()
+
+    def discard(self):
+        self.part.unlink(missing_ok=True)
+        self.finishing.unlink(missing_ok=True)
+        self.meta_path.unlink(missing_ok=True)
+
+
+def remove_expired(directory, now=None):
+    """Delete unfinished uploads nobody has added to in UPLOAD_EXPIRY seconds."""
+    cutoff = (now or time.time()) - UPLOAD_EXPIRY
+    for meta in Path(directory).glob("*.json"):
+        if not UPLOAD_ID_RE.match(meta.stem):
+            continue
+        touched = 0
+        for path in (meta, meta.with_suffix(".part"), meta.with_suffix(".finishing")):
+            try:
+                touched = max(touched, path.stat().st_mtime)
+            except FileNotFoundError:
+                pass
+        if touched < cutoff:
+            ChunkedUpload(directory, meta.stem).discard()
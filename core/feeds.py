@@ -0,0 +1,110 @@
+import hashlib
+import uuid
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import parse_http_date_safe
+from core.models import BlogCategory, BlogPost
+from core.routers import replica_reads
+
+FEED_SIZE = 20
+# Each feed is cached under the current generation; invalidate_feeds() starts
+# a new one, so a build that finishes after it lands under the old generation
+# where nothing reads it, and old entries age out.
+GENERATION_KEY = "feed:generation"
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class PostsFeed(Feed):
+    """RSS 2.0 feed of published posts, optionally for one category."""
+
+    def get_object(self, request, slug=None):
+        return get_object_or_404(BlogCategory, slug=slug) if slug else None
+
+    def title(self, category):
+        return f"Treefel - {category.name}" if category else "Treefel"
+
+    def link(self, category):
+        url = reverse("core:blog_list")
+        return f"{url}?category={category.slug}" if category else url
+
+    def description(self, category):
+        return f"Posts in {category.name}" if category else "Latest posts from the Treefel blog"
+
+    def items(self, category):
+        posts = BlogPost.objects.filter(published=True).select_related("category")
+        if category:
+            posts = posts.filter(category=category)
+        return posts.defer("body")[:FEED_SIZE]
+
+    def item_title(self, post):
+        return post.title
+
+    def item_description(self, post):
+        return post.body_rendered
+
+    def item_link(self, post):
+        return reverse("core:blog_detail", kwargs={"slug": post.slug})
+
+    def item_pubdate(self, post):
+        return post.created_at
+
+    def item_updateddate(self, post):
+        return post.updated_at
+
+    def item_categories(self, post):
+        return [post.category.name] if post.category else []
+
+
+class PostsAtomFeed(PostsFeed):
+    feed_type = Atom1Feed
+    subtitle = PostsFeed.description
+
+
+def cached_feed(feed):
+    """Serve a feed from the cache with ETag and Last-Modified validators.
+
+    The feed is only built on a miss, always from the primary; invalidate_feeds()
+    retires every cached feed when a published post changes.
+    """
+
+    def view(request, slug=None):
+        generation = cache.get_or_set(GENERATION_KEY, uuid.uuid4().hex, None)
+        key = f"feed:{generation}:{type(feed).__name__}:{request.get_host()}:{slug or ''}"
+        entry = cache.get(key)
+        if entry is None:
+            with replica_reads(False):
+                built = feed(request, slug=slug)
+            entry = {
+                "content": built.content,
+                "content_type": built["Content-Type"],
+                "etag": f'"{hashlib.md5(built.content, usedforsecurity=False).hexdigest()}"',
+                "last_modified": built["Last-Modified"],
+            }
+            cache.set(key, entry, CACHE_TIMEOUT)
+
+        response = get_conditional_response(
+            request,
+            etag=entry["etag"],
+            last_modified=parse_http_date_safe(entry["last_modified"]),
+        )
+        if response is None:
+            response = HttpResponse(entry["content"], content_type=entry["content_type"])
+        response["ETag"] = entry["etag"]
+        response["Last-Modified"] = entry["last_modified"]
+        return response
+
+    return view
+
+
+def invalidate_feeds():
+    cache.set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+blog_feed = cached_feed(PostsFeed())
+blog_feed_atom = cached_feed(PostsAtomFeed())
@@ -0,0 +1,152 @@
+import atexit
+import fcntl
+import json
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from core.models import FeedbackCounts, FeedbackMessage
+
+logger = logging.getLogger(__name__)
+
+SPOOL_NAME = "feedback.jsonl"
+FIELDS = ("email", "subject", "body", "is_spam")
+
+
+class FeedbackBuffer:
+    """Append-only spool of feedback submissions, bulk inserted in batches.
+
+    enqueue() appends one JSON line and fsyncs it before returning, so an
+    accepted message survives a crash. Any process can flush(): it swaps the
+    spool file out under an exclusive lock (appends hold a shared one), then
+    inserts the batch. Rows carry an ingest_id, so a batch that was inserted
+    but not yet deleted when a process died is skipped on replay.
+    """
+
+    def __init__(self, directory, batch_size=500, interval=2.0):
+        self.directory = Path(directory)
+        self.batch_size = batch_size
+        self.interval = interval
+        self._wake = threading.Event()
+        self._thread = None
+        self._pending = 0
+
+    @property
+    def spool(self):
+        return self.directory / SPOOL_NAME
+
+    @contextmanager
+    def _lock(self, mode):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / "spool.lock", "a") as f:
+            fcntl.flock(f, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def enqueue(self, data):
+        record = {name: data.get(name, "") for name in FIELDS}
+        record["is_spam"] = bool(record["is_spam"])
+        record["ingest_id"] = uuid.uuid4().hex
+        line = (json.dumps(record) + "\n").encode()
+        with self._lock(fcntl.LOCK_SH):
+            fd = os.open(self.spool, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, line)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self._wake.set()
+
+    def flush(self):
+        """Insert everything spooled so far. Returns the number of new rows."""
+        with self._lock(fcntl.LOCK_EX):
+            if self.spool.exists():
+                self.spool.rename(self.directory / f"{uuid.uuid4().hex}.flushing")
+            self._pending = 0
+        # Includes batches left behind by a process that died mid-flush.
+        inserted = 0
+        for batch in sorted(self.directory.glob("*.flushing")):
+            inserted += self._insert(batch)
+        return inserted
+
+    def _insert(self, path):
+        try:
+            lines = path.read_bytes().splitlines()
+        except FileNotFoundError:
+            return 0  # Another process got to it first.
+        messages = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning("Skipping unreadable feedback spool line in %s", path.name)
+                continue
+            messages.append(FeedbackMessage(**record))
+        ids = [message.ingest_id for message in messages]
+        with transaction.atomic():
+            # Holding the counts row makes concurrent flushes of the same batch take turns.
+            list(FeedbackCounts.objects.select_for_update().filter(pk=1))
+            stored = FeedbackMessage.objects.filter(ingest_id__in=ids)
+            already = set(stored.values_list("ingest_id", flat=True))
+            new = [message for message in messages if uuid.UUID(message.ingest_id) not in already]
+            FeedbackMessage.objects.bulk_create(new, batch_size=self.batch_size, ignore_conflicts=True)
+            inserted = stored.count() - len(already)
+            if inserted == len(new):
+                # bulk_create skips save(); spooled messages start out pending or spam.
+                spam = sum(1 for message in new if message.is_spam)
+                FeedbackCounts.adjust(pending=len(new) - spam, spam=spam)
+            else:
+                # Some rows were skipped as conflicts, so which ones is unknown.
+                FeedbackCounts.rebuild()
+        path.unlink(missing_ok=True)
+        return inserted
+
+    def start(self):
+        """Flush every interval seconds (sooner once a batch fills) in a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="feedback-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self._flush_safely)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self._flush_safely()
+
+    def _flush_safely(self):
+        try:
+            self.flush()
+        except Exception:
+            # The spool is still on disk; the next flush retries it.
+            logger.exception("Feedback flush failed")
+        finally:
+            close_old_connections()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def feedback_buffer():
+    """The process-wide buffer, with its flusher thread running."""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = FeedbackBuffer(
+                settings.FEEDBACK_SPOOL_DIR,
+                batch_size=settings.FEEDBACK_FLUSH_BATCH_SIZE,
+                interval=settings.FEEDBACK_FLUSH_INTERVAL,
+            )
+            _buffer.start()
+    return _buffer
@@ -0,0 +1,161 @@
+import multiprocessing
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management.base import BaseCommand
+from core.benchmarks import summarize, write_results
+from core.storage import decode_image, encode_jpeg, resize_image
+
+FILTERS = {
+    "lanczos": Image.LANCZOS,
+    "bicubic": Image.BICUBIC,
+    "bilinear": Image.BILINEAR,
+    "nearest": Image.NEAREST,
+}
+
+# Timed in this order; "total" covers all of them.
+STAGES = ("decode", "resize", "encode", "write", "total")
+
+
+def make_image(width, height, alpha, fmt):
+    """A noisy gradient: compresses roughly like real artwork, unlike flat fills."""
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 48)
+    radial = Image.radial_gradient("L").resize((width, height))
+    img = Image.merge("RGB", (gradient, noise, radial))
+    if alpha:
+        img.putalpha(radial)
+    buffer = BytesIO()
+    img.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_case(data, max_dimension, resample, quality, repeat, location):
+    """Time each stage of core.storage.optimize_image (decode, resize, encode)
+    and the storage write after it. Runs in a fresh process so the reported
+    peak memory belongs to this case alone."""
+    storage = FileSystemStorage(location) if location else default_storage
+    baseline = peak_rss_kb()
+    stages = {name: [] for name in STAGES}
+    output_bytes = 0
+    for _ in range(repeat):
+        times = [time.perf_counter()]
+        img = decode_image(BytesIO(data), max_dimension)
+        times.append(time.perf_counter())
+        img = resize_image(img, max_dimension, resample)
+        times.append(time.perf_counter())
+        output = encode_jpeg(img, quality)
+        times.append(time.perf_counter())
+        path = storage.save("benchmark/image.jpg", ContentFile(output.getvalue()))
+        times.append(time.perf_counter())
+        storage.delete(path)
+
+        for name, started, finished in zip(STAGES, times, times[1:]):
+            stages[name].append((finished - started) * 1000)
+        stages["total"].append((times[-1] - times[0]) * 1000)
+        output_bytes = len(output.getvalue())
+
+    return {
+        "stages": {name: summarize(samples) for name, samples in stages.items()},
+        "output_bytes": output_bytes,
+        "peak_memory_kb": max(peak_rss_kb() - baseline, 0),
+    }
+
+
+def parse_sizes(value):
+    return [tuple(int(n) for n in size.split("x")) for size in value.split(",")]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the image upload pipeline (optimize_image's decode, resize "
+        "and encode, then the storage write) across sizes, formats, resampling "
+        "filters and JPEG qualities"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="800x600,1920x1080,4000x3000,8000x6000")
+        parser.add_argument("--formats", default="PNG,JPEG")
+        parser.add_argument("--filters", default="lanczos,bicubic,bilinear")
+        parser.add_argument("--qualities", default="75,85,90")
+        parser.add_argument("--max-dimension", type=int, default=1920)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--default-storage", action="store_true",
+            help="Write through default_storage (e.g. R2) instead of a temp directory",
+        )
+        parser.add_argument("--output", help="JSON results path (default: benchmarks/)")
+
+    def handle(self, *args, **options):
+        sizes = parse_sizes(options["sizes"])
+        formats = options["formats"].split(",")
+        filters = options["filters"].split(",")
+        qualities = [int(q) for q in options["qualities"].split(",")]
+
+        tmpdir = tempfile.TemporaryDirectory()
+        location = None if options["default_storage"] else tmpdir.name
+
+        cases = []
+        for width, height in sizes:
+            for fmt in formats:
+                # JPEG has no alpha channel.
+                for alpha in ((False, True) if fmt == "PNG" else (False,)):
+                    data = make_image(width, height, alpha, fmt)
+                    for filter_name in filters:
+                        for quality in qualities:
+                            cases.append({
+                                "size": f"{width}x{height}",
+                                "format": fmt,
+                                "alpha": alpha,
+                                "input_bytes": len(data),
+                                "filter": filter_name,
+                                "quality": quality,
+                                "_data": data,
+                            })
+
+        self.stdout.write(
+            f"{'input':<26} {'filter':<9} {'q':>3} "
+            + " ".join(f"{name:>8}" for name in STAGES)
+            + f" {'out KB':>8} {'peak MB':>8}"
+        )
+        context = multiprocessing.get_context("fork")
+        for case in cases:
+            # One short-lived worker per case keeps peak RSS readings separate.
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(
+                    run_case, case.pop("_data"), options["max_dimension"],
+                    FILTERS[case["filter"]], case["quality"], options["repeat"], location,
+                ).result()
+            case.update(result)
+            label = f"{case['size']} {case['format']}{'+alpha' if case['alpha'] else ''}"
+            self.stdout.write(
+                f"{label:<26} {case['filter']:<9} {case['quality']:>3} "
+                + " ".join(f"{result['stages'][name]['p50_ms']:>8.1f}" for name in STAGES)
+                + f" {result['output_bytes'] / 1024:>8.0f} {result['peak_memory_kb'] / 1024:>8.1f}"
+            )
+        tmpdir.cleanup()
+
+        path = write_results(
+            "images",
+            {
+                "config": {
+                    "max_dimension": options["max_dimension"],
+                    "repeat": options["repeat"],
+                    "storage": "default" if options["default_storage"] else "tempdir",
+                },
+                "cases": cases,
+            },
+            Path(options["output"]) if options["output"] else None,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Stage timings are p50 ms. Results written to {path}"))
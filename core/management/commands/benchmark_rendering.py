@@ -0,0 +1,76 @@
+import random
+import time
+from pathlib import Path
+
+from django import template
+from django.core.management.base import BaseCommand
+from django.template import Context, Engine
+from core.benchmarks import summarize, write_results
+from core.management.commands.generate_dataset import html_body
+from core.rendering import sanitize_html
+
+# Loaded into the benchmark's template engine as {% load bench %}.
+register = template.Library()
+register.filter("sanitize", sanitize_html)
+
+TEMPLATES = {
+    # What blog_detail does: emit HTML sanitized once in BlogPost.save().
+    "precomputed": "<article>{{ body|safe }}</article>",
+    # The alternative: sanitize in the template on every request.
+    "template_filter": "{% load bench %}<article>{{ body|sanitize|safe }}</article>",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare emitting precomputed body_rendered HTML against sanitizing "
+        "post bodies in the template on every request"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", help="JSON results path (default: benchmarks/)")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        bodies = [html_body(rng) for _ in range(options["posts"])]
+        # The sanitizer's cost grows with body size; pad some posts out.
+        bodies += ["\n".join(html_body(rng) for _ in range(20)) for _ in range(options["posts"] // 10)]
+        rendered = [sanitize_html(body) for body in bodies]
+
+        engine = Engine(libraries={"bench": __name__})
+        results = {}
+        for name, source in TEMPLATES.items():
+            tpl = engine.from_string(source)
+            inputs = rendered if name == "precomputed" else bodies
+            samples = []
+            for _ in range(options["repeat"]):
+                for body in inputs:
+                    start = time.perf_counter()
+                    tpl.render(Context({"body": body}))
+                    samples.append((time.perf_counter() - start) * 1000)
+            results[name] = summarize(samples)
+            row = results[name]
+            self.stdout.write(
+                f"  {name:<16} p50 {row['p50_ms']:>8.3f}ms  p95 {row['p95_ms']:>8.3f}ms  "
+                f"p99 {row['p99_ms']:>8.3f}ms"
+            )
+
+        base, filtered = results["precomputed"], results["template_filter"]
+        self.stdout.write(
+            f"  Sanitizing per request adds {filtered['p50_ms'] - base['p50_ms']:.3f}ms at p50 "
+            f"and {filtered['p95_ms'] - base['p95_ms']:.3f}ms at p95; "
+            "precomputed output adds nothing beyond the template render."
+        )
+
+        path = write_results(
+            "rendering",
+            {
+                "config": {k: options[k] for k in ("posts", "repeat", "seed")},
+                "cases": results,
+            },
+            Path(options["output"]) if options["output"] else None,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Results written to {path}"))
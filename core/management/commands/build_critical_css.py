@@ -0,0 +1,173 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+
+# Top-level public pages that get an inlined critical stylesheet.
+PAGES = ["home", "blog_list", "blog_tag", "blog_detail", "gallery", "about"]
+
+CLASS_ATTR_RE = re.compile(r'class="([^"]*)"')
+TEMPLATE_TAG_RE = re.compile(r"{%.*?%}|{{.*?}}|{#.*?#}", re.S)
+INCLUDE_RE = re.compile(r'{%\s*include\s+"([^"]+)"')
+SELECTOR_CLASS_RE = re.compile(r"\.((?:\\.|[\w-])+)")
+# Interaction states cannot affect first paint; the full stylesheet covers them.
+INTERACTIVE_RE = re.compile(r":(?:hover|focus|focus-visible|focus-within|active)\b")
+# Nor can transitions, which only animate those state changes.
+MOTION_CLASS_RE = re.compile(r"^(?:transition|duration|ease|delay)\b")
+# The public pages have no form fields above the fold.
+FORM_CONTROL_RE = re.compile(
+    r"::?(?:-webkit-|-moz-ui|file-selector-button|placeholder)|\b(?:select|textarea|optgroup|option)\b"
+)
+RELATIVE_URL_RE = re.compile(r'url\("\.\./([^"]+)"\)')
+# Page markup after this comment is below the fold and left to the full stylesheet.
+FOLD_MARKER = "{# below the fold #}"
+VAR_USE_RE = re.compile(r"var\((--[\w-]+)")
+CUSTOM_PROPERTY_RE = re.compile(r"(--[\w-]+):([^;{}]*)")
+CUSTOM_PROPERTY_DECLARATION_RE = re.compile(r"(--[\w-]+):[^;{}]*;?")
+# Layer that only declares custom properties for the rest of the stylesheet.
+VARIABLE_LAYERS = ("@layer theme",)
+# At-rules whose children are filtered; everything else (@font-face,
+# @property, @keyframes) is kept whole.
+GROUPING_AT_RULES = ("@media", "@supports", "@layer")
+# Tailwind follows each translucent colour with a color-mix() version of the
+# same colour; the plain fallback before it paints the same on first load.
+# The properties layer only backs up @property for browsers without it.
+SKIPPED_AT_RULES = ("@supports (color:color-mix(", "@layer properties")
+
+
+def template_source(name):
+    return get_template(name).template.source
+
+
+def static_url(match):
+    return "url(\"{% endverbatim %}{% static '" + match[1] + "' %}{% verbatim %}\")"
+
+
+def used_classes(*template_names):
+    """Collect every class token the markup above the fold can emit, following includes."""
+    classes = set()
+    pending = list(template_names)
+    seen = set()
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        source = template_source(name).split(FOLD_MARKER, 1)[0]
+        pending.extend(INCLUDE_RE.findall(source))
+        for attr in CLASS_ATTR_RE.findall(source):
+            classes.update(TEMPLATE_TAG_RE.sub(" ", attr).split())
+    return classes
+
+
+def parse_blocks(css, pos=0):
+    """Split CSS into (prelude, body) pairs. Nested bodies are parsed lazily."""
+    blocks = []
+    while pos < len(css):
+        if css.startswith("/*", pos):
+            pos = css.index("*/", pos) + 2
+            continue
+        brace = css.find("{", pos)
+        if brace == -1:
+            break
+        depth, end = 1, brace + 1
+        while depth:
+            if css[end] == "{":
+                depth += 1
+            elif css[end] == "}":
+                depth -= 1
+            end += 1
+        blocks.append((css[pos:brace].strip(), css[brace + 1:end - 1]))
+        pos = end
+    return blocks
+
+
+def selector_matches(selector, classes):
+    if INTERACTIVE_RE.search(selector) or FORM_CONTROL_RE.search(selector):
+        return False
+    tokens = SELECTOR_CLASS_RE.findall(selector)
+    if any(MOTION_CLASS_RE.match(token) for token in tokens):
+        return False
+    return all(re.sub(r"\\(.)", r"\1", token) in classes for token in tokens)
+
+
+def extract_blocks(css, classes):
+    out = []
+    for prelude, body in parse_blocks(css):
+        if prelude.startswith(SKIPPED_AT_RULES):
+            continue
+        if prelude.startswith(GROUPING_AT_RULES):
+            inner = "".join(extract_blocks(body, classes))
+            if inner:
+                out.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith("@"):
+            out.append(f"{prelude}{{{body}}}")
+        elif any(selector_matches(sel, classes) for sel in prelude.split(",")):
+            out.append(f"{prelude}{{{body}}}")
+    return out
+
+
+def prune_variables(blocks):
+    """Drop custom properties nothing in blocks reads: @property rules and
+    theme layer declarations, following var() chains."""
+    readers = "".join(
+        block for block in blocks if not block.startswith(("@property",) + VARIABLE_LAYERS)
+    )
+    definitions = {}
+    for block in blocks:
+        if block.startswith(VARIABLE_LAYERS):
+            definitions.update(CUSTOM_PROPERTY_RE.findall(block))
+    used = set(VAR_USE_RE.findall(readers))
+    pending = list(used)
+    while pending:
+        for name in VAR_USE_RE.findall(definitions.get(pending.pop(), "")):
+            if name not in used:
+                used.add(name)
+                pending.append(name)
+
+    def declaration(match):
+        return match[0] if match[1] in used else ""
+
+    pruned = []
+    for block in blocks:
+        if block.startswith("@property"):
+            if block.split("{", 1)[0].split()[1] in used:
+                pruned.append(block)
+        elif block.startswith(VARIABLE_LAYERS):
+            pruned.append(CUSTOM_PROPERTY_DECLARATION_RE.sub(declaration, block))
+        else:
+            pruned.append(block)
+    return pruned
+
+
+def extract_critical(css, classes):
+    return "".join(prune_variables(extract_blocks(css, classes)))
+
+
+def build_pages():
+    """Map each page in PAGES to the contents of its critical CSS template."""
+    css = (settings.STATICFILES_DIRS[0] / "css" / "output.css").read_text()
+    pages = {}
+    for page in PAGES:
+        classes = used_classes("core/base.html", f"core/{page}.html")
+        critical = extract_critical(css, classes)
+        # verbatim keeps the template engine away from CSS braces; relative
+        # asset URLs are swapped for {% static %} so they resolve from any page.
+        critical_template = RELATIVE_URL_RE.sub(static_url, critical)
+        pages[page] = "{% load static %}{% verbatim %}" + critical_template + "{% endverbatim %}\n"
+    return pages
+
+
+class Command(BaseCommand):
+    help = "Extract per-page critical CSS from output.css into inlineable templates"
+
+    def handle(self, *args, **options):
+        out_dir = settings.BASE_DIR / "core" / "templates" / "core" / "critical"
+        out_dir.mkdir(exist_ok=True)
+
+        for page, content in build_pages().items():
+            (out_dir / f"{page}.css").write_text(content)
+            self.stdout.write(f"  {page}: {len(content)} bytes")
+
+        self.stdout.write(self.style.SUCCESS("Critical CSS built."))
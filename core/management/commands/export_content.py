@@ -0,0 +1,55 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from core.models import BlogPost, GalleryItem
+
+POST_FIELDS = (
+    "title", "slug", "body", "category__name", "tags", "header_image", "published",
+    "created_at", "updated_at",
+)
+GALLERY_FIELDS = (
+    "title", "description", "category", "media_type", "image", "youtube_url", "created_at",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Write blog posts and gallery items as JSON Lines, one object per line, "
+        "for import_content to load into another environment"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default="-", help="Output file (default: stdout)")
+        parser.add_argument("--type", choices=["all", "posts", "gallery"], default="all")
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        out = self.stdout if options["path"] == "-" else open(options["path"], "w", encoding="utf-8")
+        counts = {}
+        try:
+            if options["type"] in ("all", "posts"):
+                # values() + iterator(): rows stream through without model instances
+                # or body_rendered, which import_content recomputes.
+                rows = BlogPost.objects.order_by("pk").values(*POST_FIELDS)
+                counts["posts"] = self.write(out, "post", rows, options["chunk_size"])
+            if options["type"] in ("all", "gallery"):
+                # In display order; import_content appends them in file order.
+                rows = GalleryItem.objects.order_by("sort_order", "pk").values(*GALLERY_FIELDS)
+                counts["gallery items"] = self.write(out, "gallery", rows, options["chunk_size"])
+        finally:
+            if out is not self.stdout:
+                out.close()
+
+        summary = ", ".join(f"{count} {label}" for label, count in counts.items())
+        # Keep stdout clean when it's carrying the export.
+        (self.stderr if out is self.stdout else self.stdout).write(f"Exported {summary}.")
+
+    def write(self, out, kind, rows, chunk_size):
+        count = 0
+        for row in rows.iterator(chunk_size=chunk_size):
+            if kind == "post":
+                row["category"] = row.pop("category__name") or ""
+            out.write(json.dumps({"type": kind, **row}, cls=DjangoJSONEncoder) + "\n")
+            count += 1
+        return count
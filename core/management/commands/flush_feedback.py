@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.ingest import FeedbackBuffer
+
+
+class Command(BaseCommand):
+    help = "Insert any spooled feedback submissions (see FEEDBACK_BUFFERED)"
+
+    def handle(self, *args, **options):
+        buffer = FeedbackBuffer(
+            settings.FEEDBACK_SPOOL_DIR, batch_size=settings.FEEDBACK_FLUSH_BATCH_SIZE
+        )
+        count = buffer.flush()
+        self.stdout.write(self.style.SUCCESS(f"Flushed {count} feedback messages."))
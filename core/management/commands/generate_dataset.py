@@ -0,0 +1,154 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+from django.utils.text import slugify
+from core.models import (
+    BlogCategory, BlogPost, FeedbackCounts, FeedbackMessage, GalleryItem, PostTag, Tag, parse_tags,
+)
+from core.rendering import sanitize_html
+from core.slugs import assign_slugs
+
+WORDS = (
+    "tree forest render shader texture sculpt blender brush canvas palette "
+    "light shadow pixel vertex mesh rig animation sketch study concept color "
+    "moss bark leaf river stone mountain sunset fog lantern studio process "
+    "update devlog bug fix build release tool workflow idea experiment"
+).split()
+
+CATEGORIES = ["Dev Log", "Personal", "Interesting Finds"]
+BATCH_SIZE = 500
+
+
+def sentence(rng, low=6, high=16):
+    words = rng.choices(WORDS, k=rng.randint(low, high))
+    return " ".join(words).capitalize() + "."
+
+
+def paragraph(rng):
+    return " ".join(sentence(rng) for _ in range(rng.randint(3, 7)))
+
+
+def html_body(rng):
+    """A TinyMCE-like post body: headings, paragraphs, lists, links, images."""
+    parts = []
+    for _ in range(rng.randint(3, 8)):
+        kind = rng.random()
+        if kind < 0.15:
+            parts.append(f"<h2>{sentence(rng, 2, 5)}</h2>")
+        elif kind < 0.3:
+            items = "".join(f"<li>{sentence(rng, 3, 8)}</li>" for _ in range(rng.randint(2, 6)))
+            parts.append(f"<ul>{items}</ul>")
+        elif kind < 0.4:
+            parts.append(
+                f'<p><img src="https://r2.example.com/blog/{rng.getrandbits(64):016x}.jpg" '
+                f'alt="{sentence(rng, 2, 4)}"></p>'
+            )
+        elif kind < 0.5:
+            parts.append(f"<blockquote><p>{sentence(rng)}</p></blockquote>")
+        else:
+            link = f'<a href="https://example.com/{rng.choice(WORDS)}">{rng.choice(WORDS)}</a>'
+            parts.append(f"<p>{paragraph(rng)} <strong>{rng.choice(WORDS)}</strong> {link}</p>")
+    return "\n".join(parts)
+
+
+class Command(BaseCommand):
+    help = "Generate a large synthetic dataset for benchmarks and load tests"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=5000)
+        parser.add_argument("--gallery", type=int, default=1000)
+        parser.add_argument("--feedback", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--clear", action="store_true",
+            help="Delete existing posts, gallery items and feedback first",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+
+        if options["clear"]:
+            BlogPost.objects.all().delete()
+            GalleryItem.objects.all().delete()
+            FeedbackMessage.objects.all().delete()
+
+        categories = [BlogCategory.objects.get_or_create(name=name)[0] for name in CATEGORIES]
+        posts = []
+        for _ in range(options["posts"]):
+            title = sentence(rng, 2, 6).rstrip(".")
+            body = html_body(rng)
+            posts.append(BlogPost(
+                title=title,
+                body=body,
+                # Sanitize only: the full render would try to fetch the fake image URLs.
+                body_rendered=sanitize_html(body),
+                category=rng.choice(categories),
+                tags=", ".join(rng.sample(WORDS, rng.randint(0, 5))),
+                header_image=(
+                    f"https://r2.example.com/blog/{rng.getrandbits(64):016x}.jpg"
+                    if rng.random() < 0.6 else ""
+                ),
+                published=rng.random() < 0.9,
+            ))
+        # bulk_create skips save(), so allocate slugs for the whole batch up front.
+        assign_slugs(posts, "title")
+        BlogPost.objects.bulk_create(posts, batch_size=BATCH_SIZE)
+        self.stdout.write(f"  Posts: {len(posts)}")
+        self.link_tags(posts)
+        # Same for the maintained per-category counts.
+        for category in categories:
+            category.published_post_count = category.posts.filter(published=True).count()
+            category.save(update_fields=["published_post_count"])
+
+        offset = GalleryItem.objects.count()
+        items = []
+        for i in range(options["gallery"]):
+            is_video = rng.random() < 0.1
+            items.append(GalleryItem(
+                title=sentence(rng, 1, 4).rstrip("."),
+                description=sentence(rng) if rng.random() < 0.7 else "",
+                category=rng.choice(["2D", "3D"]),
+                media_type="youtube" if is_video else "image",
+                image="" if is_video else f"https://r2.example.com/gallery/{rng.getrandbits(64):016x}.jpg",
+                youtube_url=f"https://youtu.be/{rng.getrandbits(40):010x}" if is_video else "",
+                sort_order=offset + i,
+            ))
+        GalleryItem.objects.bulk_create(items, batch_size=BATCH_SIZE)
+        self.stdout.write(f"  Gallery items: {len(items)}")
+
+        messages = [
+            FeedbackMessage(
+                email=f"visitor{i}@example.com" if rng.random() < 0.4 else "",
+                subject=sentence(rng, 2, 6).rstrip("."),
+                body=paragraph(rng),
+                is_completed=rng.random() < 0.5,
+            )
+            for i in range(options["feedback"])
+        ]
+        FeedbackMessage.objects.bulk_create(messages, batch_size=BATCH_SIZE)
+        FeedbackCounts.rebuild()
+        self.stdout.write(f"  Feedback messages: {len(messages)}")
+
+        self.stdout.write(self.style.SUCCESS("Dataset generated."))
+
+    def link_tags(self, posts):
+        """bulk_create skips BlogPost.sync_tags(), so build tag_set directly."""
+        Tag.objects.bulk_create(
+            [Tag(slug=slugify(word), name=word) for word in WORDS], ignore_conflicts=True
+        )
+        tag_ids = dict(Tag.objects.values_list("slug", "pk"))
+        PostTag.objects.bulk_create(
+            (
+                PostTag(post_id=post.pk, tag_id=tag_ids[slug])
+                for post in posts
+                for slug in parse_tags(post.tags)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        counts = Tag.objects.annotate(
+            published=Count("posttag", filter=Q(posttag__post__published=True))
+        ).values_list("pk", "published")
+        for pk, count in counts:
+            Tag.objects.filter(pk=pk).update(post_count=count)
+        self.stdout.write(f"  Tags: {len(tag_ids)}")
@@ -0,0 +1,250 @@
+import json
+import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils.dateparse import parse_datetime
+from core.feeds import invalidate_feeds
+from core.models import BlogCategory, BlogPost, GalleryItem, PostTag, Tag, parse_tags
+from core.navigation import invalidate_category_nav
+from core.rendering import fetch_remote_image, render_body, sanitize_html
+from core.sitemaps import invalidate_sitemaps
+from core.slugs import assign_slugs
+from core.storage import storage_path_from_url
+
+# Keys each record type must have; lines missing one are counted as invalid.
+REQUIRED_KEYS = {
+    "post": ("title",),
+    "gallery": ("title", "category", "media_type"),
+}
+
+
+def copy_image(url, folder):
+    """This environment's URL for an image an import refers to.
+
+    Images already in this storage are kept. Others are fetched into
+    <folder>/imported under a path derived from the URL, so re-running an
+    import doesn't fetch them again. On failure the original URL is kept.
+    """
+    if not url.startswith(("http://", "https://")) or storage_path_from_url(url):
+        return url
+    path = fetch_remote_image(url, folder=f"{folder}/imported")
+    return default_storage.url(path) if path else url
+
+
+def prepare_post(record, copy_images):
+    """Header image and rendered body for one post. Runs in a worker thread."""
+    body = record.get("body", "")
+    if not copy_images:
+        return record.get("header_image", ""), sanitize_html(body)
+    return copy_image(record.get("header_image", ""), "blog"), render_body(body, fetch_remote=True)
+
+
+def prepare_gallery_item(record, copy_images):
+    image = record.get("image", "")
+    return copy_image(image, "gallery") if copy_images else image
+
+
+class Command(BaseCommand):
+    help = (
+        "Load blog posts and gallery items from JSON Lines written by "
+        "export_content, in batches. Posts whose slug already exists, and "
+        "gallery items with the same title and image or video as an existing "
+        "one, are skipped, so an interrupted import can be re-run; new gallery "
+        "items are appended after the existing ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="JSON Lines file, or - for stdin")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--workers", type=int, default=8, help="Threads copying images and rendering bodies"
+        )
+        parser.add_argument(
+            "--skip-images", action="store_true",
+            help="Keep image URLs as exported instead of copying them into this storage",
+        )
+
+    def handle(self, *args, **options):
+        self.copy_images = not options["skip_images"]
+        self.next_sort_order = (GalleryItem.objects.aggregate(top=Max("sort_order"))["top"] or 0) + 1
+        self.counts = Counter()
+        source = sys.stdin if options["path"] == "-" else open(options["path"], encoding="utf-8")
+        # Image fetches and uploads wait on the network, so threads are enough.
+        self.pool = ThreadPoolExecutor(options["workers"])
+        try:
+            for batch in self.read_batches(source, options["batch_size"]):
+                self.import_posts([record for record in batch if record["type"] == "post"])
+                self.import_gallery([record for record in batch if record["type"] == "gallery"])
+                self.stdout.write(
+                    f"  {self.counts['posts']} posts, {self.counts['gallery items']} gallery items"
+                )
+        finally:
+            self.pool.shutdown()
+            if source is not sys.stdin:
+                source.close()
+
+        # bulk_create() sends no signals, so clear what core.signals would have.
+        if self.counts["posts"] or self.counts["gallery items"]:
+            invalidate_feeds()
+            invalidate_sitemaps()
+            invalidate_category_nav()
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {self.counts['posts']} posts and {self.counts['gallery items']} gallery items; "
+            f"skipped {self.counts['existing']} existing entries and {self.counts['invalid']} invalid lines."
+        ))
+
+    def read_batches(self, source, batch_size):
+        batch = []
+        for number, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if record.get("type") not in REQUIRED_KEYS:
+                    raise ValueError(f"unknown type {record.get('type')!r}")
+                missing = [key for key in REQUIRED_KEYS[record["type"]] if not record.get(key)]
+                if missing:
+                    raise ValueError(f"missing {', '.join(missing)}")
+            except (ValueError, AttributeError) as exc:
+                self.stderr.write(f"  line {number}: {exc}")
+                self.counts["invalid"] += 1
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def import_posts(self, records):
+        wanted = {record["slug"] for record in records if record.get("slug")}
+        existing = set(BlogPost.objects.filter(slug__in=wanted).values_list("slug", flat=True))
+        fresh = []
+        for record in records:
+            slug = record.get("slug") or ""
+            if slug in existing:
+                self.counts["existing"] += 1
+                continue
+            if slug:
+                existing.add(slug)  # A repeat later in the file is skipped too.
+            fresh.append(record)
+        if not fresh:
+            return
+
+        categories = self.categories({record["category"] for record in fresh if record.get("category")})
+        prepared = self.pool.map(partial(prepare_post, copy_images=self.copy_images), fresh)
+        posts = [
+            BlogPost(
+                title=record["title"],
+                slug=record.get("slug") or "",
+                body=record.get("body", ""),
+                body_rendered=body_rendered,
+                category=categories.get(record.get("category")),
+                tags=record.get("tags", ""),
+                header_image=header_image,
+                published=record.get("published", False),
+            )
+            for record, (header_image, body_rendered) in zip(fresh, prepared)
+        ]
+        assign_slugs(posts, "title")
+
+        with transaction.atomic():
+            BlogPost.objects.bulk_create(posts)
+            self.keep_timestamps(BlogPost, posts, fresh, ["created_at", "updated_at"])
+            self.link_tags(posts)
+            self.count_categories(posts)
+        self.counts["posts"] += len(posts)
+
+    def import_gallery(self, records):
+        if not records:
+            return
+        images = self.pool.map(partial(prepare_gallery_item, copy_images=self.copy_images), records)
+        # Copied images keep the URL they got the first time, so the key matches on a re-run.
+        existing = set(
+            GalleryItem.objects.filter(title__in={record["title"] for record in records})
+            .values_list("title", "image", "youtube_url")
+        )
+        items = []
+        fresh = []
+        for record, image in zip(records, images):
+            key = (record["title"], image, record.get("youtube_url", ""))
+            if key in existing:
+                self.counts["existing"] += 1
+                continue
+            existing.add(key)
+            fresh.append(record)
+            items.append(GalleryItem(
+                title=record["title"],
+                description=record.get("description", ""),
+                category=record["category"],
+                media_type=record["media_type"],
+                image=image,
+                youtube_url=record.get("youtube_url", ""),
+                sort_order=self.next_sort_order,
+            ))
+            self.next_sort_order += 1
+        if not items:
+            return
+        with transaction.atomic():
+            GalleryItem.objects.bulk_create(items)
+            self.keep_timestamps(GalleryItem, items, fresh, ["created_at"])
+        self.counts["gallery items"] += len(items)
+
+    def keep_timestamps(self, model, objs, records, fields):
+        """bulk_create() stamps auto_now(_add) fields with the current time; put the exported ones back."""
+        dated = []
+        for obj, record in zip(objs, records):
+            values = {field: parse_datetime(record.get(field) or "") for field in fields}
+            if all(values.values()):
+                for field, value in values.items():
+                    setattr(obj, field, value)
+                dated.append(obj)
+        model.objects.bulk_update(dated, fields)
+
+    def categories(self, names):
+        found = {category.name: category for category in BlogCategory.objects.filter(name__in=names)}
+        missing = [BlogCategory(name=name) for name in names - found.keys()]
+        if missing:
+            assign_slugs(missing, "name")
+            BlogCategory.objects.bulk_create(missing, ignore_conflicts=True)
+            found = {category.name: category for category in BlogCategory.objects.filter(name__in=names)}
+        return found
+
+    def link_tags(self, posts):
+        """What BlogPost.sync_tags() does per post, for a whole batch."""
+        tags_by_post = {post.pk: parse_tags(post.tags) for post in posts}
+        names = {}
+        for tags in tags_by_post.values():
+            for slug, name in tags.items():
+                names.setdefault(slug, name)
+        if not names:
+            return
+        Tag.objects.bulk_create(
+            [Tag(slug=slug, name=name) for slug, name in names.items()], ignore_conflicts=True
+        )
+        tag_ids = dict(Tag.objects.filter(slug__in=names).values_list("slug", "pk"))
+        PostTag.objects.bulk_create(
+            PostTag(post_id=pk, tag_id=tag_ids[slug]) for pk, tags in tags_by_post.items() for slug in tags
+        )
+        published = Counter(
+            tag_ids[slug] for post in posts if post.published for slug in tags_by_post[post.pk]
+        )
+        self.add_counts(Tag, "post_count", published)
+
+    def count_categories(self, posts):
+        published = Counter(post.category_id for post in posts if post.published and post.category_id)
+        self.add_counts(BlogCategory, "published_post_count", published)
+
+    def add_counts(self, model, field, deltas):
+        # One UPDATE per distinct delta rather than per row.
+        by_delta = defaultdict(list)
+        for pk, delta in deltas.items():
+            by_delta[delta].append(pk)
+        for delta, pks in by_delta.items():
+            model.objects.filter(pk__in=pks).update(**{field: F(field) + delta})
@@ -0,0 +1,177 @@
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+from core.benchmarks import load_results, summarize, write_results
+from core.models import BlogPost
+
+PUBLIC_ENDPOINTS = ["home", "blog_list", "blog_list:page", "blog_list:htmx",
+                    "blog_detail", "gallery", "gallery:htmx", "about", "feedback"]
+ADMIN_ENDPOINTS = ["admin_blog", "admin_gallery", "admin_feedback", "admin_metrics"]
+
+
+def wsgi_environ(path, query="", cookie="", htmx=False):
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "HTTP_HOST": "localhost",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": BytesIO(),
+        "wsgi.errors": BytesIO(),
+    }
+    if cookie:
+        environ["HTTP_COOKIE"] = cookie
+    if htmx:
+        environ["HTTP_HX_REQUEST"] = "true"
+    return environ
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive public and admin endpoints through the WSGI app in-process and "
+        "report latency percentiles of the successful requests. Admin pages are "
+        "fetched as a throwaway loadtest-* user, deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--no-admin", action="store_true", help="Skip admin endpoints")
+        parser.add_argument("--output", help="JSON results path (default: benchmarks/)")
+        parser.add_argument("--compare", help="Previous results JSON to diff against")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and "localhost" not in settings.ALLOWED_HOSTS:
+            raise CommandError("Add localhost to ALLOWED_HOSTS to run the load test.")
+        # Without the manifest every {% static %} raises, so full pages would
+        # all be 500s and the numbers would measure error pages.
+        if isinstance(staticfiles_storage, ManifestFilesMixin) and not staticfiles_storage.exists(
+            staticfiles_storage.manifest_name
+        ):
+            raise CommandError("No static files manifest; run collectstatic first.")
+
+        # Per-request metric log lines would drown out the report.
+        logging.getLogger("core.middleware").setLevel(logging.WARNING)
+        app = WSGIHandler()
+        slugs = list(
+            BlogPost.objects.filter(published=True).values_list("slug", flat=True)[:100]
+        )
+        if not slugs:
+            raise CommandError("No published posts; run generate_dataset first.")
+
+        # name -> function of the request index returning (path, query, htmx)
+        targets = {
+            "home": lambda i: (reverse("core:home"), "", False),
+            "blog_list": lambda i: (reverse("core:blog_list"), "", False),
+            "blog_list:page": lambda i: (reverse("core:blog_list"), f"page={i % 20 + 1}", False),
+            "blog_list:htmx": lambda i: (reverse("core:blog_list"), "page=2", True),
+            "blog_detail": lambda i: (
+                reverse("core:blog_detail", args=[slugs[i % len(slugs)]]), "", False
+            ),
+            "gallery": lambda i: (reverse("core:gallery"), "", False),
+            "gallery:htmx": lambda i: (reverse("core:gallery"), "category=3D", True),
+            "about": lambda i: (reverse("core:about"), "", False),
+            "feedback": lambda i: (reverse("core:feedback"), "", False),
+        }
+        endpoints = list(PUBLIC_ENDPOINTS)
+
+        cookie = ""
+        user = None
+        if not options["no_admin"]:
+            user = User.objects.create_user(username=f"loadtest-{uuid.uuid4().hex[:12]}")
+            client = Client()
+            client.force_login(user)
+            session = client.cookies[settings.SESSION_COOKIE_NAME].value
+            cookie = f"{settings.SESSION_COOKIE_NAME}={session}"
+            for name in ADMIN_ENDPOINTS:
+                targets[name] = lambda i, name=name: (reverse(f"core:{name}"), "", False)
+            endpoints += ADMIN_ENDPOINTS
+
+        def run_one(name, i):
+            path, query, htmx = targets[name](i)
+            admin = name in ADMIN_ENDPOINTS
+            environ = wsgi_environ(path, query, cookie if admin else "", htmx)
+            statuses = []
+            start = time.perf_counter()
+            body = app(environ, lambda status, headers: statuses.append(status))
+            for _ in body:
+                pass
+            body.close()
+            elapsed = (time.perf_counter() - start) * 1000
+            return elapsed, statuses[0].startswith(("2", "3"))
+
+        results = {}
+        try:
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                for name in endpoints:
+                    for i in range(options["warmup"]):
+                        run_one(name, i)
+                    start = time.perf_counter()
+                    outcomes = list(pool.map(lambda i: run_one(name, i), range(options["requests"])))
+                    wall = time.perf_counter() - start
+                    # Failed requests are counted, not timed: error pages are
+                    # usually fast and would flatter the percentiles.
+                    samples = [elapsed for elapsed, ok in outcomes if ok]
+                    results[name] = {
+                        **summarize(samples),
+                        "errors": len(outcomes) - len(samples),
+                        "rps": round(len(samples) / wall, 1),
+                    }
+                    self.report(name, results[name])
+        finally:
+            connections.close_all()
+            if user is not None:
+                client.logout()
+                user.delete()
+
+        failed = [name for name, row in results.items() if row["errors"]]
+        if failed:
+            self.stdout.write(self.style.ERROR(
+                f"Errored requests on {', '.join(failed)}; their timings cover successes only."
+            ))
+
+        path = write_results(
+            "loadtest",
+            {
+                "config": {k: options[k] for k in ("requests", "concurrency", "warmup")},
+                "endpoints": results,
+            },
+            Path(options["output"]) if options["output"] else None,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Results written to {path}"))
+
+        if options["compare"]:
+            self.compare(load_results(options["compare"]), results)
+
+    def report(self, name, row):
+        line = (
+            f"  {name:<18} p50 {row['p50_ms']:>8.2f}ms  p95 {row['p95_ms']:>8.2f}ms  "
+            f"p99 {row['p99_ms']:>8.2f}ms  {row['rps']:>8.1f} req/s  errors {row['errors']}"
+        )
+        self.stdout.write(self.style.ERROR(line) if row["errors"] else line)
+
+    def compare(self, previous, current):
+        self.stdout.write(f"Compared with {previous.get('commit', '?')}:")
+        for name, row in current.items():
+            old = previous.get("endpoints", {}).get(name)
+            if not old:
+                continue
+            for key in ("p50_ms", "p95_ms"):
+                change = (row[key] - old[key]) / old[key] * 100 if old[key] else 0
+                line = f"  {name:<18} {key} {old[key]:>8.2f} -> {row[key]:>8.2f} ({change:+.0f}%)"
+                self.stdout.write(self.style.WARNING(line) if change > 10 else line)
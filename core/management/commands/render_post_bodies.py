@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from core.feeds import invalidate_feeds
+from core.models import BlogPost
+from core.rendering import render_body
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill in BlogPost.body_rendered for posts that don't have it yet, or "
+        "re-render every post with --all after the rendering pipeline changes. "
+        "With --fetch-remote, copy hot-linked body images into storage and "
+        "re-render the posts that still show them from elsewhere."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Re-render every post")
+        parser.add_argument(
+            "--fetch-remote", action="store_true",
+            help="Download hot-linked images (saving a post never does)",
+        )
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, **options):
+        posts = BlogPost.objects.order_by("pk").only("pk", "body")
+        if options["fetch_remote"] and not options["all"]:
+            # Rewritten images point at storage; these still point elsewhere.
+            posts = posts.filter(body_rendered__contains='src="http')
+        elif not options["all"]:
+            posts = posts.filter(body_rendered="")
+
+        batch, total = [], 0
+        # bulk_update leaves updated_at alone; a re-render isn't an edit.
+        for post in posts.iterator(chunk_size=options["batch_size"]):
+            post.body_rendered = render_body(post.body, fetch_remote=options["fetch_remote"])
+            batch.append(post)
+            if len(batch) >= options["batch_size"]:
+                BlogPost.objects.bulk_update(batch, ["body_rendered"])
+                total += len(batch)
+                batch = []
+        BlogPost.objects.bulk_update(batch, ["body_rendered"])
+        total += len(batch)
+        if total:
+            # Feeds embed body_rendered; bulk_update skips the save signals.
+            invalidate_feeds()
+
+        self.stdout.write(self.style.SUCCESS(f"Rendered {total} posts."))
@@ -0,0 +1,136 @@
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connections
+from core.feeds import invalidate_feeds
+from core.models import BlogPost, GalleryItem
+from core.sitemaps import invalidate_sitemaps
+from core.storage import storage_path_from_url, upload_image
+
+# (model, URL field, upload folder)
+TARGETS = [
+    (GalleryItem, "image", "gallery"),
+    (BlogPost, "header_image", "blog"),
+]
+
+
+def reprocess(path, folder, max_dimension, quality):
+    """Re-encode one stored image and upload the result. Runs in a worker."""
+    try:
+        with default_storage.open(path, "rb") as f:
+            return upload_image(f, folder=folder, max_dimension=max_dimension, quality=quality)
+    except Exception as exc:  # One bad file shouldn't stop the batch.
+        return exc
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-encode stored gallery and blog header images with the given "
+        "optimize_image settings, in parallel. Images are re-derived from the "
+        "stored JPEGs, so raising max_dimension cannot recover lost detail."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-dimension", type=int, default=1920)
+        parser.add_argument("--quality", type=int, default=85)
+        parser.add_argument("--workers", type=int, default=os.cpu_count())
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--max-writes-per-second", type=float, default=0,
+            help="Throttle storage uploads (0 = unthrottled)",
+        )
+        parser.add_argument(
+            "--checkpoint", default=str(settings.BASE_DIR / "spool" / "reprocess_media.json"),
+        )
+        parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+        parser.add_argument(
+            "--delete-old", action="store_true",
+            help="Delete the previous file once its row points at the new one",
+        )
+
+    def handle(self, *args, **options):
+        params = {"max_dimension": options["max_dimension"], "quality": options["quality"]}
+        checkpoint = self.load_checkpoint(options["checkpoint"], params, options["restart"])
+
+        # Workers are forked; don't let them inherit open database sockets.
+        connections.close_all()
+        pool = None
+        if options["workers"] > 1:
+            pool = ProcessPoolExecutor(
+                options["workers"], mp_context=multiprocessing.get_context("fork")
+            )
+        try:
+            for model, field, folder in TARGETS:
+                label = model._meta.label_lower
+                done = set(checkpoint["done"].setdefault(label, []))
+                rows = [
+                    (pk, url)
+                    for pk, url in model.objects.exclude(**{field: ""})
+                    .order_by("pk").values_list("pk", field)
+                    if pk not in done and storage_path_from_url(url)
+                ]
+                self.stdout.write(f"  {label}: {len(rows)} images to reprocess")
+
+                for start in range(0, len(rows), options["batch_size"]):
+                    batch = rows[start:start + options["batch_size"]]
+                    results = self.run_batch(batch, folder, params, pool, options)
+                    updated = [
+                        model(pk=pk, **{field: new_url})
+                        for (pk, _), new_url in zip(batch, results)
+                        if isinstance(new_url, str)
+                    ]
+                    model.objects.bulk_update(updated, [field])
+                    if updated:
+                        # bulk_update skips the post_save handlers that would do this.
+                        invalidate_feeds()
+                        invalidate_sitemaps()
+
+                    for (pk, old_url), new_url in zip(batch, results):
+                        if isinstance(new_url, Exception):
+                            self.stderr.write(f"    {label} {pk}: {new_url}")
+                            continue
+                        if options["delete_old"]:
+                            default_storage.delete(storage_path_from_url(old_url))
+                        checkpoint["done"][label].append(pk)
+                    self.save_checkpoint(options["checkpoint"], checkpoint)
+                    self.stdout.write(f"    {start + len(batch)}/{len(rows)}")
+        finally:
+            if pool:
+                pool.shutdown()
+
+        Path(options["checkpoint"]).unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS("Media reprocessed."))
+
+    def run_batch(self, batch, folder, params, pool, options):
+        jobs = []
+        interval = 1 / options["max_writes_per_second"] if options["max_writes_per_second"] else 0
+        for _, url in batch:
+            args = (storage_path_from_url(url), folder, params["max_dimension"], params["quality"])
+            jobs.append(pool.submit(reprocess, *args) if pool else reprocess(*args))
+            if interval:
+                time.sleep(interval)
+        return [job.result() for job in jobs] if pool else jobs
+
+    def load_checkpoint(self, path, params, restart):
+        if not restart and os.path.exists(path):
+            with open(path) as f:
+                checkpoint = json.load(f)
+            if checkpoint["params"] == params:
+                self.stdout.write(f"Resuming from {path}")
+                return checkpoint
+            self.stdout.write("Checkpoint was for different settings; starting over.")
+        return {"params": params, "done": {}}
+
+    def save_checkpoint(self, path, checkpoint):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp, path)
@@ -0,0 +1,100 @@
+import hashlib
+import re
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Google serves per-script WOFF2 subsets to modern browsers; we keep only latin.
+FONTS = {
+    "fonts/poor-story-latin.woff2": "Poor Story",
+    "fonts/stick-latin.woff2": "Stick",
+}
+FONTS_CSS_URL = "https://fonts.googleapis.com/css2?family={family}&display=swap"
+WOFF2_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+LATIN_BLOCK_RE = re.compile(r"/\* latin \*/\s*@font-face\s*{[^}]*?url\((?P<url>[^)]+\.woff2)\)")
+WOFF2_MAGIC = b"wOF2"
+# sha256sum-format list of every vendored file, relative to static/.
+CHECKSUMS = "SHA256SUMS"
+
+
+def fetch(url):
+    request = urllib.request.Request(url, headers={"User-Agent": WOFF2_USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def read_checksums(static_dir):
+    path = static_dir / CHECKSUMS
+    if not path.exists():
+        return {}
+    sums = {}
+    for line in path.read_text().splitlines():
+        digest, name = line.split(maxsplit=1)
+        sums[name.lstrip("*")] = digest
+    return sums
+
+
+def write_checksums(static_dir, sums):
+    lines = [f"{digest}  {name}\n" for name, digest in sorted(sums.items())]
+    (static_dir / CHECKSUMS).write_text("".join(lines))
+
+
+class Command(BaseCommand):
+    help = (
+        "Download the latin WOFF2 font subsets into static/fonts/ and record "
+        "their checksums in static/SHA256SUMS, for committing. Vendored files "
+        "are served from the repo; this is not part of the deploy. With "
+        "--check, verify every vendored file against SHA256SUMS instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true", help="Re-download files that already exist"
+        )
+        parser.add_argument(
+            "--check", action="store_true", help="Only verify files against SHA256SUMS"
+        )
+
+    def handle(self, *args, **options):
+        static_dir = settings.STATICFILES_DIRS[0]
+        sums = read_checksums(static_dir)
+        if options["check"]:
+            self.check(static_dir, sums)
+            return
+
+        for path, family in FONTS.items():
+            dest = static_dir / path
+            if dest.exists() and not options["force"]:
+                self.stdout.write(f"  Exists: {path}")
+                continue
+            try:
+                css = fetch(FONTS_CSS_URL.format(family=family.replace(" ", "+"))).decode()
+                match = LATIN_BLOCK_RE.search(css)
+                if not match:
+                    raise CommandError(f"No latin subset found for {family}")
+                data = fetch(match.group("url"))
+            except OSError as exc:
+                raise CommandError(f"Could not download {family}: {exc}")
+            if not data.startswith(WOFF2_MAGIC):
+                raise CommandError(f"{family} did not download as WOFF2")
+
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_bytes(data)
+            sums[path] = hashlib.sha256(data).hexdigest()
+            self.stdout.write(f"  Saved: {path} ({len(data)} bytes, sha256 {sums[path]})")
+
+        write_checksums(static_dir, sums)
+        self.stdout.write(self.style.SUCCESS("Fonts vendored; commit static/fonts/ and SHA256SUMS."))
+
+    def check(self, static_dir, sums):
+        for name, digest in sums.items():
+            path = static_dir / name
+            if not path.exists():
+                raise CommandError(f"{name} is listed in {CHECKSUMS} but missing")
+            if hashlib.sha256(path.read_bytes()).hexdigest() != digest:
+                raise CommandError(f"{name} does not match its checksum")
+        self.stdout.write(self.style.SUCCESS(f"{len(sums)} vendored files verified."))
@@ -0,0 +1,219 @@
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.encoding import filepath_to_uri
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from storages.backends.s3 import S3Storage
+
+# Stored media never changes in place: uploads get fresh uuid names and
+# variants are named after their width.
+MEDIA_MAX_AGE = 365 * 24 * 60 * 60
+COPY_BUFFER = 64 * 1024
+# A cache hit only rewrites the file's atime (its LRU position) this often.
+TOUCH_INTERVAL = 60
+# Eviction frees down to this share of the cap, so it isn't rerun on every miss.
+EVICT_TO = 0.9
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class ProxiedS3Storage(S3Storage):
+    """S3/R2 storage whose URLs point at serve_media instead of the bucket.
+
+    Used when MEDIA_CACHE_DIR is set, so images are read through the local
+    MediaCache. remote_url() still gives the bucket URL.
+    """
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        return settings.MEDIA_URL + filepath_to_uri(name)
+
+    def remote_url(self, name):
+        return super().url(name)
+
+
+class MediaCache:
+    """On-disk read-through cache of remote storage, evicting least recently used files.
+
+    Files live under directory at their storage names; a file's atime is its
+    last use, and its mtime (which serve_media's validators use) stays the
+    time it was fetched. Misses are fetched to a temporary file and renamed into place,
+    so readers never see half a file. After each miss, if the cache holds
+    more than max_bytes, the oldest files are deleted. A file evicted while
+    it's being served stays readable through the open handle.
+    """
+
+    def __init__(self, directory, max_bytes, storage=default_storage):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.storage = storage
+
+    def open(self, name):
+        local = self.directory / name
+        try:
+            f = open(local, "rb")
+        except FileNotFoundError:
+            self.fetch(name, local)
+            f = open(local, "rb")
+        else:
+            stat = os.fstat(f.fileno())
+            now = time.time()
+            if now - stat.st_atime > TOUCH_INTERVAL:
+                os.utime(local, (now, stat.st_mtime))
+        return f
+
+    def fetch(self, name, local):
+        local.parent.mkdir(parents=True, exist_ok=True)
+        with self.storage.open(name, "rb") as src:
+            with tempfile.NamedTemporaryFile(dir=self.directory, prefix=".fetch-", delete=False) as tmp:
+                try:
+                    shutil.copyfileobj(src, tmp, COPY_BUFFER)
+                except BaseException:
+                    os.unlink(tmp.name)
+                    raise
+        os.replace(tmp.name, local)
+        self.evict()
+
+    def evict(self):
+        files = []
+        total = 0
+        for root, _, names in os.walk(self.directory):
+            for filename in names:
+                if filename.startswith(".fetch-"):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_atime, stat.st_size, path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(files):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= self.max_bytes * EVICT_TO:
+                break
+
+
+class FileRange:
+    """length bytes of f from start, for FileResponse.
+
+    fileno() lets the WSGI server's file wrapper sendfile() straight from the
+    file: gunicorn sends Content-Length bytes from the current position.
+    Without one, read() stops at the end of the range.
+    """
+
+    def __init__(self, f, start, length):
+        f.seek(start)
+        self.file = f
+        self.remaining = length
+
+    def read(self, size=-1):
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def open_media(path):
+    """An open file holding the stored media at path, or Http404."""
+    name = posixpath.normpath(path).lstrip("/")
+    if name.startswith("..") or name == ".":
+        raise Http404
+    try:
+        try:
+            local = default_storage.path(name)
+        except NotImplementedError:
+            if not settings.MEDIA_CACHE_DIR:
+                raise Http404
+            cache = MediaCache(
+                settings.MEDIA_CACHE_DIR, settings.MEDIA_CACHE_MAX_BYTES, default_storage
+            )
+            return cache.open(name)
+        return open(local, "rb")
+    except (FileNotFoundError, IsADirectoryError):
+        raise Http404
+
+
+def byte_range(header, size):
+    """(start, length) for a single-range Range header, None to send it all,
+    or False if the range can't be satisfied."""
+    match = RANGE_RE.match(header.replace(" ", ""))
+    if not match or match.groups() == ("", ""):
+        return None  # Malformed or multiple ranges: ignored, as RFC 9110 allows.
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        return False
+    return start, end - start + 1
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve stored media with long cache headers, validators and byte ranges."""
+    f = open_media(path)
+    stat = os.fstat(f.fileno())
+    size = stat.st_size
+    etag = f'"{int(stat.st_mtime):x}-{size:x}"'
+    headers = {
+        "Cache-Control": f"public, max-age={MEDIA_MAX_AGE}, immutable",
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Last-Modified": http_date(stat.st_mtime),
+    }
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is not None:
+        f.close()
+        for header, value in headers.items():
+            response.headers.setdefault(header, value)
+        return response
+
+    span = (0, size)
+    status = 200
+    if_range = request.headers.get("If-Range")
+    if "Range" in request.headers and (
+        not if_range or if_range == etag or parse_http_date_safe(if_range) == int(stat.st_mtime)
+    ):
+        requested = byte_range(request.headers["Range"], size)
+        if requested is False:
+            f.close()
+            response = HttpResponse(status=416)
+            response.headers["Content-Range"] = f"bytes */{size}"
+            return response
+        if requested:
+            span = requested
+            status = 206
+            headers["Content-Range"] = f"bytes {span[0]}-{sum(span) - 1}/{size}"
+
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    response = FileResponse(
+        FileRange(f, *span), status=status, content_type=content_type, headers=headers
+    )
+    response.headers["Content-Length"] = span[1]
+    return response
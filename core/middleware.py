@@ -0,0 +1,114 @@
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from core.metrics import start_metrics, stop_metrics
+from core.models import RequestMetric
+from core.routers import replica_reads
+
+logger = logging.getLogger(__name__)
+
+
+def pool_wait_ms(alias="default"):
+    """Cumulative ms this process has waited on the connection pool, or None."""
+    pool = getattr(connections[alias], "pool", None)
+    if pool is None:
+        return None
+    return pool.get_stats().get("requests_wait_ms", 0)
+
+
+class RequestMetricsMiddleware:
+    """Time each request's DB work, template rendering and total duration.
+
+    Figures go out as a Server-Timing header and one log line per request. A
+    REQUEST_METRICS_SAMPLE_RATE share of requests is also stored as
+    RequestMetric rows for the /admin-metrics/ page.
+
+    The pool only keeps process-wide counters, so with several threads per
+    worker the db-pool figure is approximate.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pool_before = pool_wait_ms()
+        start = time.perf_counter()
+        metrics, token = start_metrics()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            stop_metrics(token)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        timings = [
+            f'db;dur={metrics.db_ms:.1f};desc="{metrics.queries} queries"',
+            f"tpl;dur={metrics.template_ms:.1f}",
+            f"total;dur={total_ms:.1f}",
+        ]
+        if pool_before is not None:
+            timings.append(f"db-pool;dur={pool_wait_ms() - pool_before}")
+        response["Server-Timing"] = ", ".join(timings)
+
+        match = request.resolver_match
+        view_name = match.view_name if match else ""
+        logger.info(
+            "request method=%s path=%s view=%s status=%s queries=%d "
+            "db_ms=%.1f tpl_ms=%.1f total_ms=%.1f",
+            request.method, request.path, view_name, response.status_code,
+            metrics.queries, metrics.db_ms, metrics.template_ms, total_ms,
+        )
+
+        rate = settings.REQUEST_METRICS_SAMPLE_RATE
+        if rate and random.random() < rate:
+            RequestMetric.objects.create(
+                method=request.method,
+                path=request.path[:200],
+                view_name=view_name,
+                status_code=response.status_code,
+                query_count=metrics.queries,
+                db_ms=metrics.db_ms,
+                template_ms=metrics.template_ms,
+                total_ms=total_ms,
+            )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Let anonymous reads use the replica; keep everyone else on the primary.
+
+    Logged-in users always hit the primary. After any write, the client gets
+    a short-lived cookie that keeps it on the primary until the replica has
+    caught up (read-your-writes).
+    """
+
+    cookie_name = "primary_sticky"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        use_replica = (
+            request.method in ("GET", "HEAD")
+            and self.cookie_name not in request.COOKIES
+            and not request.user.is_authenticated
+        )
+        with replica_reads(use_replica):
+            response = self.get_response(request)
+
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            response.set_cookie(
+                self.cookie_name,
+                "1",
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+                secure=request.is_secure(),
+            )
+        return response
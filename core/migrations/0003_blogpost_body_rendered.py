@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_requestmetric'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='body_rendered',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+from django.db.models import Count, Q
+from django.utils.text import slugify
+
+
+def populate_tags(apps, schema_editor):
+    BlogPost = apps.get_model("core", "BlogPost")
+    Tag = apps.get_model("core", "Tag")
+    PostTag = apps.get_model("core", "PostTag")
+
+    tag_ids = {}
+    links = []
+    posts = BlogPost.objects.exclude(tags="").values_list("pk", "tags")
+    for post_id, value in posts.iterator(chunk_size=2000):
+        seen = set()
+        for name in value.split(","):
+            name = name.strip()[:100]
+            slug = slugify(name)[:100]
+            if not slug or slug in seen:
+                continue
+            seen.add(slug)
+            if slug not in tag_ids:
+                tag_ids[slug] = Tag.objects.create(name=name, slug=slug).pk
+            links.append(PostTag(post_id=post_id, tag_id=tag_ids[slug]))
+    PostTag.objects.bulk_create(links, batch_size=1000)
+
+    # A one-off GROUP BY; from here on BlogPost.save() keeps counts by delta.
+    counts = Tag.objects.annotate(
+        published=Count("posttag", filter=Q(posttag__post__published=True))
+    ).values_list("pk", "published")
+    for pk, count in counts:
+        Tag.objects.filter(pk=pk).update(post_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_tag_posttag'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:22
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_published_posts(apps, schema_editor):
+    BlogCategory = apps.get_model("core", "BlogCategory")
+    counts = BlogCategory.objects.annotate(
+        published=Count("posts", filter=Q(posts__published=True))
+    ).values_list("pk", "published")
+    for pk, count in counts:
+        BlogCategory.objects.filter(pk=pk).update(published_post_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_populate_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogcategory',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_published_posts, migrations.RunPython.noop),
+    ]
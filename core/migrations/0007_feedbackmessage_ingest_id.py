@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_blogcategory_published_post_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedbackmessage',
+            name='ingest_id',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_feedbackmessage_ingest_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedbackmessage',
+            name='is_spam',
+            field=models.BooleanField(default=False),
+        ),
+    ]
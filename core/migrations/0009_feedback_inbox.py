@@ -0,0 +1,46 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:32
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_feedback(apps, schema_editor):
+    FeedbackMessage = apps.get_model("core", "FeedbackMessage")
+    FeedbackCounts = apps.get_model("core", "FeedbackCounts")
+    totals = FeedbackMessage.objects.aggregate(
+        pending=Count("pk", filter=Q(is_spam=False, is_completed=False)),
+        completed=Count("pk", filter=Q(is_spam=False, is_completed=True)),
+        spam=Count("pk", filter=Q(is_spam=True)),
+    )
+    FeedbackCounts.objects.create(pk=1, **totals)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_feedbackmessage_is_spam'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackCounts',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pending', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('spam', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'feedback counts',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedbackmessage',
+            index=models.Index(fields=['is_spam', '-id'], name='feedback_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedbackmessage',
+            index=models.Index(fields=['is_spam', 'is_completed', '-id'], name='feedback_status_idx'),
+        ),
+        migrations.RunPython(count_feedback, migrations.RunPython.noop),
+    ]
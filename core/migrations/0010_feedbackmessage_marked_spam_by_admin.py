@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-19 12:43
+
+from django.db import migrations, models
+
+
+def keep_admin_marks(apps, schema_editor):
+    # Until now only the admin spam toggle set is_spam on stored messages.
+    FeedbackMessage = apps.get_model("core", "FeedbackMessage")
+    FeedbackMessage.objects.filter(is_spam=True).update(marked_spam_by_admin=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_feedback_inbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedbackmessage',
+            name='marked_spam_by_admin',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(keep_admin_marks, migrations.RunPython.noop),
+    ]
@@ -1,40 +1,44 @@
 import re
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Q
 from django.utils.text import slugify
+from core.rendering import render_body
+from core.slugs import save_with_slug
 
 
 class BlogCategory(models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True, blank=True)
+    # Maintained by BlogPost.save() and the pre_delete receiver in core.signals.
+    published_post_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name_plural = "blog categories"
         ordering = ["name"]
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug = slugify(self.name)
-            slug = base_slug
-            counter = 1
-            while BlogCategory.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
+        save_with_slug(self, "name", lambda: super(BlogCategory, self).save(*args, **kwargs))
 
     def __str__(self):
         return self.name
 
 
 class BlogPost(models.Model):
+    # blog/<slug>/ paths that core.urls routes elsewhere; never allocated to a post.
+    RESERVED_SLUGS = ("feed",)
+
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
     body = models.TextField()
+    # body post-processed by core.rendering at save time; what blog_detail emits.
+    body_rendered = models.TextField(blank=True, editable=False)
     category = models.ForeignKey(
         BlogCategory, on_delete=models.SET_NULL, null=True, related_name="posts"
     )
+    # Comma-separated, as typed in the editor; tag_set is the indexed copy.
     tags = models.CharField(max_length=500, blank=True)
+    tag_set = models.ManyToManyField("Tag", through="PostTag", related_name="posts", blank=True)
     header_image = models.URLField(max_length=500, blank=True)
     published = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -43,21 +47,130 @@ class BlogPost(models.Model):
     class Meta:
         ordering = ["-created_at"]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_body = instance.__dict__.get("body")
+        instance._loaded_published = instance.__dict__.get("published")
+        instance._loaded_tags = instance.__dict__.get("tags")
+        instance._loaded_category_id = instance.__dict__.get("category_id")
+        return instance
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while BlogPost.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if self._state.adding:
+            was_published, old_category_id = False, None
+        elif hasattr(self, "_loaded_category_id") and self._loaded_published is not None:
+            was_published, old_category_id = self._loaded_published, self._loaded_category_id
+        else:
+            # Not loaded through the ORM (or published was deferred): ask the database.
+            was_published, old_category_id = BlogPost.objects.filter(pk=self.pk).values_list(
+                "published", "category_id"
+            ).first() or (False, None)
+        if update_fields is None or "body" in update_fields:
+            # Rendering can touch storage, so skip it when the body is unchanged.
+            if self.body != getattr(self, "_loaded_body", None) or not self.body_rendered:
+                self.body_rendered = render_body(self.body)
+                self._loaded_body = self.body
+                if update_fields is not None:
+                    kwargs["update_fields"] = {*update_fields, "body_rendered"}
+
+        def write():
+            with transaction.atomic():
+                super(BlogPost, self).save(*args, **kwargs)
+                if update_fields is None or {"tags", "published"} & set(update_fields):
+                    if self.tags != getattr(self, "_loaded_tags", None) or self.published != was_published:
+                        self.sync_tags(was_published)
+                self.sync_category_counts(was_published, old_category_id)
+
+        save_with_slug(self, "title", write)
+        self._loaded_published = self.published
+        self._loaded_tags = self.tags
+        self._loaded_category_id = self.category_id
+
+    def sync_category_counts(self, was_published, old_category_id):
+        """Move this post between BlogCategory.published_post_count totals."""
+        before = old_category_id if was_published else None
+        after = self.category_id if self.published else None
+        if before == after:
+            return
+        if before:
+            BlogCategory.objects.filter(pk=before).update(
+                published_post_count=F("published_post_count") - 1
+            )
+        if after:
+            BlogCategory.objects.filter(pk=after).update(
+                published_post_count=F("published_post_count") + 1
+            )
+
+    def sync_tags(self, was_published):
+        """Mirror the tags field into tag_set and adjust Tag.post_count by delta."""
+        wanted = parse_tags(self.tags)
+        existing = dict(PostTag.objects.filter(post=self).values_list("tag__slug", "tag_id"))
+
+        tags = dict(Tag.objects.filter(slug__in=wanted).values_list("slug", "pk"))
+        missing = [Tag(slug=slug, name=name) for slug, name in wanted.items() if slug not in tags]
+        if missing:
+            # Another save may create the same tag concurrently.
+            Tag.objects.bulk_create(missing, ignore_conflicts=True)
+            tags = dict(Tag.objects.filter(slug__in=wanted).values_list("slug", "pk"))
+
+        added = [tags[slug] for slug in wanted if slug not in existing]
+        removed = [pk for slug, pk in existing.items() if slug not in wanted]
+        PostTag.objects.filter(post=self, tag_id__in=removed).delete()
+        PostTag.objects.bulk_create(PostTag(post=self, tag_id=pk) for pk in added)
+
+        # post_count only counts published posts.
+        if was_published and self.published:
+            increment, decrement = added, removed
+        else:
+            increment = list(tags.values()) if self.published else []
+            decrement = list(existing.values()) if was_published else []
+        Tag.objects.filter(pk__in=increment).update(post_count=F("post_count") + 1)
+        Tag.objects.filter(pk__in=decrement).update(post_count=F("post_count") - 1)
 
     def __str__(self):
         return self.title
 
 
+def parse_tags(value):
+    """Split a comma-separated tags field into {slug: name}, first spelling wins."""
+    tags = {}
+    for name in value.split(","):
+        name = name.strip()[:100]
+        slug = slugify(name)[:100]
+        if slug and slug not in tags:
+            tags[slug] = name
+    return tags
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+    # Published posts carrying this tag, maintained by BlogPost.sync_tags().
+    post_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class PostTag(models.Model):
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
+
+    class Meta:
+        # Leads with tag, so it also serves the tag page's lookup.
+        constraints = [
+            models.UniqueConstraint(fields=["tag", "post"], name="unique_post_tag"),
+        ]
+
+    def __str__(self):
+        return f"{self.post} / {self.tag}"
+
+
 class GalleryItem(models.Model):
     CATEGORY_CHOICES = [("2D", "2D"), ("3D", "3D")]
     MEDIA_TYPE_CHOICES = [("image", "Image"), ("youtube", "YouTube")]
@@ -89,23 +202,168 @@ class GalleryItem(models.Model):
         return self.title
 
 
+# The admin inbox tabs. Every message is in exactly one of them.
+FEEDBACK_STATUSES = {
+    "pending": Q(is_spam=False, is_completed=False),
+    "completed": Q(is_spam=False, is_completed=True),
+    "spam": Q(is_spam=True),
+}
+
+
+def feedback_status(is_spam, is_completed):
+    if is_spam:
+        return "spam"
+    return "completed" if is_completed else "pending"
+
+
+class FeedbackMessageQuerySet(models.QuerySet):
+    def mark_completed(self):
+        """Complete the pending messages among these in one UPDATE."""
+        with transaction.atomic():
+            count = self.filter(FEEDBACK_STATUSES["pending"]).update(is_completed=True)
+            FeedbackCounts.adjust(pending=-count, completed=count)
+        return count
+
+    def delete(self):
+        # One DELETE per status, so each count moves by exactly what was removed.
+        total = 0
+        with transaction.atomic():
+            for status, condition in FEEDBACK_STATUSES.items():
+                deleted, _ = super(FeedbackMessageQuerySet, self.filter(condition)).delete()
+                FeedbackCounts.adjust(**{status: -deleted})
+                total += deleted
+        return total, {self.model._meta.label: total}
+
+
 class FeedbackMessage(models.Model):
     email = models.EmailField(blank=True, default="")
     subject = models.CharField(max_length=200)
     body = models.TextField()
     is_completed = models.BooleanField(default=False)
+    # Set by core.spam's checks or an admin.
+    is_spam = models.BooleanField(default=False)
+    # Only an admin's marks train core.spam's classifier as spam, so its own
+    # guesses never become examples.
+    marked_spam_by_admin = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set on messages that went through core.ingest, so replaying its spool
+    # after a crash can't insert the same message twice.
+    ingest_id = models.UUIDField(null=True, blank=True, unique=True, editable=False)
+
+    objects = FeedbackMessageQuerySet.as_manager()
 
     class Meta:
         ordering = ["-created_at"]
+        # The admin inbox pages through one tab at a time, newest id first.
+        indexes = [
+            models.Index(fields=["is_spam", "-id"], name="feedback_inbox_idx"),
+            models.Index(fields=["is_spam", "is_completed", "-id"], name="feedback_status_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = instance.__dict__
+        if "is_spam" in loaded and "is_completed" in loaded:
+            instance._loaded_status = instance.status
+        return instance
+
+    @property
+    def status(self):
+        return feedback_status(self.is_spam, self.is_completed)
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            before = None
+        elif hasattr(self, "_loaded_status"):
+            before = self._loaded_status
+        else:
+            row = FeedbackMessage.objects.filter(pk=self.pk).values_list("is_spam", "is_completed").first()
+            before = feedback_status(*row) if row else None
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if before != self.status:
+                deltas = {self.status: 1}
+                if before:
+                    deltas[before] = -1
+                FeedbackCounts.adjust(**deltas)
+        self._loaded_status = self.status
+
+    def delete(self, *args, **kwargs):
+        status = getattr(self, "_loaded_status", self.status)
+        with transaction.atomic():
+            deleted, per_model = super().delete(*args, **kwargs)
+            FeedbackCounts.adjust(**{status: -deleted})
+        return deleted, per_model
 
     def __str__(self):
         return self.subject
 
 
+class FeedbackCounts(models.Model):
+    """How many messages each admin inbox tab holds, in a single row.
+
+    FeedbackMessage and its queryset move these as messages change, so the
+    inbox never counts the table. rebuild() recounts after writes that skip
+    them, such as bulk_create().
+    """
+
+    pending = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    spam = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "feedback counts"
+
+    @classmethod
+    def load(cls):
+        return cls.objects.filter(pk=1).first() or cls.rebuild()
+
+    @classmethod
+    def adjust(cls, **deltas):
+        updates = {status: F(status) + delta for status, delta in deltas.items() if delta}
+        if updates and not cls.objects.filter(pk=1).update(**updates):
+            cls.rebuild()
+
+    @classmethod
+    def rebuild(cls):
+        totals = FeedbackMessage.objects.aggregate(**{
+            status: Count("pk", filter=condition) for status, condition in FEEDBACK_STATUSES.items()
+        })
+        counts, _ = cls.objects.update_or_create(pk=1, defaults=totals)
+        return counts
+
+    @property
+    def inbox(self):
+        return self.pending + self.completed
+
+    def __str__(self):
+        return f"{self.pending} pending, {self.completed} completed, {self.spam} spam"
+
+
 class SiteSetting(models.Model):
     key = models.CharField(max_length=100, unique=True)
     value = models.TextField(blank=True)
 
     def __str__(self):
         return self.key
+
+
+class RequestMetric(models.Model):
+    """A sampled request timing recorded by RequestMetricsMiddleware."""
+
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=200)
+    view_name = models.CharField(max_length=100, blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    query_count = models.PositiveIntegerField()
+    db_ms = models.FloatField()
+    template_ms = models.FloatField()
+    total_ms = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.method} {self.path}"
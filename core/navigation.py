@@ -0,0 +1,40 @@
+import uuid
+
+from django.core.cache import cache
+from core.models import BlogCategory
+from core.routers import PRIMARY_DB
+
+# The category nav fragment is cached under this version; bumping it is
+# cheaper than finding every cached variant, and old ones time out.
+NAV_VERSION_KEY = "category_nav:version"
+NAV_TIMEOUT = 60 * 60 * 24
+
+
+def category_nav_version():
+    return cache.get_or_set(NAV_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def nav_categories(version):
+    """The categories the nav links to, cached with the fragment under version.
+
+    Read from the primary: a lagging replica's list would stay cached after
+    the invalidation it missed.
+    """
+    return cache.get_or_set(
+        f"category_nav:{version}:categories",
+        lambda: list(BlogCategory.objects.using(PRIMARY_DB).filter(published_post_count__gt=0)),
+        NAV_TIMEOUT,
+    )
+
+
+def nav_category(slug, categories):
+    """slug if the nav has a link for it, else None.
+
+    The fragment is cached per current category, so arbitrary ?category=
+    values must not each get an entry of their own.
+    """
+    return slug if any(category.slug == slug for category in categories) else None
+
+
+def invalidate_category_nav():
+    cache.set(NAV_VERSION_KEY, uuid.uuid4().hex, None)
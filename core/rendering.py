@@ -0,0 +1,198 @@
+import hashlib
+import logging
+from html import escape
+from html.parser import HTMLParser
+from io import BytesIO
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from core.storage import optimize_image, responsive_variants, storage_path_from_url
+
+logger = logging.getLogger(__name__)
+
+# Widths of the downsized copies offered in each body image's srcset. The post
+# column is max-w-3xl (768px), so 1536 covers it on 2x screens.
+VARIANT_WIDTHS = (480, 768, 1536)
+IMAGE_SIZES = "(min-width: 768px) 768px, 100vw"
+
+# Hot-linked images are copied into storage, within reason.
+REMOTE_TIMEOUT = 10
+REMOTE_MAX_BYTES = 20 * 1024 * 1024
+
+# What the TinyMCE toolbar (lists, link, image, code) can produce. Anything
+# else is dropped; the tags in DROP_CONTENT lose their contents too.
+ALLOWED_TAGS = {
+    "a", "b", "blockquote", "br", "code", "div", "em", "figcaption", "figure",
+    "h1", "h2", "h3", "h4", "h5", "h6", "hr", "i", "img", "li", "ol", "p",
+    "pre", "s", "span", "strike", "strong", "sub", "sup", "table", "tbody",
+    "td", "th", "thead", "tr", "u", "ul",
+}
+ALLOWED_ATTRS = {
+    "a": {"href", "title", "target"},
+    "img": {"src", "alt", "title", "width", "height"},
+    "td": {"colspan", "rowspan"},
+    "th": {"colspan", "rowspan"},
+    "ol": {"start"},
+}
+URL_ATTRS = {"href", "src"}
+URL_SCHEMES = {"", "http", "https", "mailto"}
+VOID_TAGS = {"br", "hr", "img"}
+DROP_CONTENT = {"script", "style", "iframe", "object", "embed", "noscript", "template", "textarea", "svg", "math"}
+
+
+class _Sanitizer(HTMLParser):
+    """Rebuild HTML from an allowlist of tags and attributes.
+
+    If given, rewrite_image turns each kept <img>'s attributes into its tag.
+    """
+
+    def __init__(self, rewrite_image=None):
+        super().__init__(convert_charrefs=True)
+        self.rewrite_image = rewrite_image
+        self.out = []
+        self.open_tags = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT:
+            self.dropping += 1
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRS.get(tag, set())
+        kept = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRS and not safe_url(value):
+                continue
+            if name == "target" and value != "_blank":
+                continue
+            kept.append((name, value))
+        if tag == "a" and ("target", "_blank") in kept:
+            kept.append(("rel", "noopener noreferrer"))
+        if tag == "img" and self.rewrite_image:
+            self.out.append(self.rewrite_image(kept))
+        else:
+            self.out.append("<" + tag + "".join(f' {name}="{escape(value)}"' for name, value in kept) + ">")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in DROP_CONTENT:
+            self.dropping -= 1
+        elif not self.dropping and tag in ALLOWED_TAGS and tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT:
+            self.dropping = max(self.dropping - 1, 0)
+            return
+        if self.dropping or tag not in self.open_tags:
+            return
+        # Close anything left open inside this tag so the output stays balanced.
+        while self.open_tags:
+            closing = self.open_tags.pop()
+            self.out.append(f"</{closing}>")
+            if closing == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.out.append(escape(data, quote=False))
+
+    def close(self):
+        super().close()
+        self.out.extend(f"</{tag}>" for tag in reversed(self.open_tags))
+        self.open_tags = []
+        return "".join(self.out)
+
+
+def safe_url(value):
+    # Browsers ignore whitespace and control characters inside a scheme.
+    cleaned = "".join(ch for ch in value if ch > " " and ch != "\x7f")
+    try:
+        return urlsplit(cleaned).scheme.lower() in URL_SCHEMES
+    except ValueError:
+        return False
+
+
+def sanitize_html(html):
+    """Strip TinyMCE HTML down to ALLOWED_TAGS and ALLOWED_ATTRS."""
+    sanitizer = _Sanitizer()
+    sanitizer.feed(html)
+    return sanitizer.close()
+
+
+def remote_image_path(url, folder="blog/remote"):
+    """Where fetch_remote_image keeps its copy of url, derived from the URL."""
+    return f"{folder}/{hashlib.sha256(url.encode()).hexdigest()[:32]}.jpg"
+
+
+def fetch_remote_image(url, folder="blog/remote"):
+    """Copy a hot-linked image into storage. Returns the storage path, or None.
+
+    The path is derived from the URL, so re-saving a post doesn't fetch again.
+    """
+    path = remote_image_path(url, folder)
+    if default_storage.exists(path):
+        return path
+    try:
+        with urlopen(Request(url, headers={"User-Agent": "treefel"}), timeout=REMOTE_TIMEOUT) as response:
+            data = response.read(REMOTE_MAX_BYTES + 1)
+        if len(data) > REMOTE_MAX_BYTES:
+            raise ValueError("image too large")
+        return default_storage.save(path, ContentFile(optimize_image(BytesIO(data)).read()))
+    except Exception as exc:
+        logger.warning("Could not fetch image %s: %s", url, exc)
+        return None
+
+
+def rewrite_image(attrs, fetch_remote=False):
+    """Render one sanitized <img> as a lazy-loaded, dimensioned, responsive image.
+
+    Hot-linked images use the stored copy if there is one; only with
+    fetch_remote are missing copies downloaded.
+    """
+    attrs = dict(attrs)
+    src = attrs.get("src") or ""
+    attrs.setdefault("loading", "lazy")
+    attrs.setdefault("decoding", "async")
+
+    path = storage_path_from_url(src)
+    if path is None and src.startswith(("http://", "https://")):
+        if fetch_remote:
+            path = fetch_remote_image(src)
+        elif default_storage.exists(remote_image_path(src)):
+            path = remote_image_path(src)
+    if path:
+        try:
+            (width, height), candidates = responsive_variants(path, VARIANT_WIDTHS)
+        except Exception as exc:
+            logger.warning("Could not resize body image %s: %s", src, exc)
+        else:
+            attrs["src"] = candidates[-1][0]
+            if len(candidates) > 1:
+                attrs["srcset"] = ", ".join(f"{url} {w}w" for url, w in candidates)
+                attrs["sizes"] = IMAGE_SIZES
+            # Keep sizes set in the editor; otherwise reserve the intrinsic box.
+            if not (attrs.get("width") and attrs.get("height")):
+                attrs["width"], attrs["height"] = str(width), str(height)
+
+    rendered = " ".join(f'{name}="{escape(value)}"' for name, value in attrs.items())
+    return f"<img {rendered}>"
+
+
+def render_body(html, fetch_remote=False):
+    """Post-process TinyMCE HTML once, at save time, for blog_detail to emit as-is.
+
+    This is the only place post HTML is made safe: templates output
+    body_rendered with |safe and never filter per request. Saving a post
+    never waits on other sites; render_post_bodies --fetch-remote copies
+    hot-linked images into storage afterwards.
+    """
+    sanitizer = _Sanitizer(rewrite_image=lambda attrs: rewrite_image(attrs, fetch_remote))
+    sanitizer.feed(html)
+    return sanitizer.close()
@@ -0,0 +1,36 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# The database alias writes go to. Caches that outlive a request are built
+# from it, since a lagging replica would keep stale data cached.
+PRIMARY_DB = "default"
+
+# Only ReplicaRoutingMiddleware turns this on, so management commands, the
+# shell and anything outside a request always read from the primary.
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    token = _read_from_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Send reads to the replica when the current request allows it."""
+
+    primary = PRIMARY_DB
+    replica = "replica"
+
+    def db_for_read(self, model, **hints):
+        return self.replica if _read_from_replica.get() else self.primary
+
+    def db_for_write(self, model, **hints):
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from core.feeds import invalidate_feeds
+from core.models import BlogCategory, BlogPost, GalleryItem, Tag
+from core.navigation import invalidate_category_nav
+from core.sitemaps import invalidate_sitemaps
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def blog_post_changed(sender, instance, **kwargs):
+    # Drafts never appear in feeds or sitemaps, so editing one leaves them cached.
+    if instance.published or getattr(instance, "_loaded_published", False):
+        # After commit, or a request could rebuild them from the old rows under
+        # the new generation.
+        transaction.on_commit(invalidate_feeds)
+        transaction.on_commit(invalidate_sitemaps)
+        transaction.on_commit(invalidate_category_nav)
+
+
+@receiver(pre_delete, sender=BlogPost)
+def blog_post_deleting(sender, instance, **kwargs):
+    # Its PostTag rows are about to cascade away; take it out of the counts first.
+    if getattr(instance, "_loaded_published", instance.published):
+        Tag.objects.filter(posttag__post=instance).update(post_count=F("post_count") - 1)
+        category_id = getattr(instance, "_loaded_category_id", instance.category_id)
+        if category_id:
+            BlogCategory.objects.filter(pk=category_id).update(
+                published_post_count=F("published_post_count") - 1
+            )
+
+
+@receiver(post_save, sender=BlogCategory)
+@receiver(post_delete, sender=BlogCategory)
+def blog_category_changed(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_feeds)
+    transaction.on_commit(invalidate_category_nav)
+
+
+@receiver(post_save, sender=GalleryItem)
+@receiver(post_delete, sender=GalleryItem)
+def gallery_item_changed(sender, instance, **kwargs):
+    # The gallery page's lastmod comes from its newest item.
+    transaction.on_commit(invalidate_sitemaps)
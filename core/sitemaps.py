@@ -0,0 +1,119 @@
+import uuid
+from itertools import chain
+from xml.sax.saxutils import escape
+
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from core.models import BlogPost, GalleryItem
+from core.routers import PRIMARY_DB
+
+# The sitemap protocol caps a single file at 50,000 URLs.
+SITEMAP_LIMIT = 50_000
+ITERATOR_CHUNK = 2000
+# Content is cached per generation; invalidate_sitemaps() starts a new one
+# and entries from old generations age out.
+GENERATION_KEY = "sitemap:generation"
+CACHE_TIMEOUT = 60 * 60 * 24
+STATIC_PAGES = ["core:home", "core:blog_list", "core:gallery", "core:about", "core:feedback"]
+
+URLSET_OPEN = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+INDEX_OPEN = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+
+
+def url_entry(loc, lastmod=None):
+    lastmod = f"<lastmod>{lastmod.date().isoformat()}</lastmod>" if lastmod else ""
+    return f"<url><loc>{escape(loc)}</loc>{lastmod}</url>\n"
+
+
+# Everything here ends up cached for CACHE_TIMEOUT, so it is read from the
+# primary: a lagging replica's rows would outlive the invalidation.
+def published_posts():
+    return BlogPost.objects.using(PRIMARY_DB).filter(published=True)
+
+
+def page_urls(request):
+    post_lastmod = published_posts().aggregate(latest=Max("updated_at"))["latest"]
+    gallery_lastmod = GalleryItem.objects.using(PRIMARY_DB).aggregate(latest=Max("created_at"))["latest"]
+    lastmods = {"core:home": post_lastmod, "core:blog_list": post_lastmod, "core:gallery": gallery_lastmod}
+    for name in STATIC_PAGES:
+        yield url_entry(request.build_absolute_uri(reverse(name)), lastmods.get(name))
+
+
+def post_urls(request, page=None):
+    posts = published_posts().order_by("pk").values_list("slug", "updated_at")
+    if page is not None:
+        posts = posts[(page - 1) * SITEMAP_LIMIT:page * SITEMAP_LIMIT]
+    # values_list + iterator() keeps memory flat however many posts there are.
+    for slug, updated_at in posts.iterator(chunk_size=ITERATOR_CHUNK):
+        yield url_entry(request.build_absolute_uri(reverse("core:blog_detail", args=[slug])), updated_at)
+
+
+def urlset(entries):
+    yield URLSET_OPEN
+    yield from entries
+    yield "</urlset>\n"
+
+
+def cached_xml(key, build):
+    """Stream build() on a miss, caching the output once it has all been sent."""
+    generation = cache.get_or_set(GENERATION_KEY, uuid.uuid4().hex, None)
+    key = f"sitemap:{generation}:{key}"
+
+    content = cache.get(key)
+    if content is not None:
+        return HttpResponse(content, content_type="application/xml")
+
+    def stream():
+        parts = []
+        for part in build():
+            parts.append(part)
+            yield part
+        cache.set(key, "".join(parts), CACHE_TIMEOUT)
+
+    return StreamingHttpResponse(stream(), content_type="application/xml")
+
+
+def sitemap(request):
+    """Every URL in one file, or a sitemap index once posts outgrow the limit."""
+
+    def build():
+        post_count = published_posts().count()
+        if post_count + len(STATIC_PAGES) <= SITEMAP_LIMIT:
+            yield from urlset(chain(page_urls(request), post_urls(request)))
+            return
+        yield INDEX_OPEN
+        yield _index_entry(request, "pages", 1)
+        for page in range(1, (post_count - 1) // SITEMAP_LIMIT + 2):
+            yield _index_entry(request, "posts", page)
+        yield "</sitemapindex>\n"
+
+    return cached_xml(f"{request.get_host()}:index", build)
+
+
+def sitemap_section(request, section, page):
+    if section == "pages" and page == 1:
+        return cached_xml(f"{request.get_host()}:pages", lambda: urlset(page_urls(request)))
+    if section == "posts" and page >= 1:
+        return cached_xml(
+            f"{request.get_host()}:posts:{page}", lambda: urlset(post_urls(request, page))
+        )
+    raise Http404("No such sitemap.")
+
+
+def invalidate_sitemaps():
+    cache.set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def _index_entry(request, section, page):
+    loc = request.build_absolute_uri(
+        reverse("core:sitemap_section", kwargs={"section": section, "page": page})
+    )
+    return f"<sitemap><loc>{escape(loc)}</loc></sitemap>\n"
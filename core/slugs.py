@@ -0,0 +1,109 @@
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Room kept for a "-N" suffix when searching, so truncated candidates still
+# fall under the searched prefix.
+SUFFIX_ROOM = 8
+# Distinct bases per prefix query on the bulk path.
+PREFIX_BATCH = 200
+# A concurrent save can take the slug just allocated; retry this many times.
+SLUG_ATTEMPTS = 5
+
+
+def _candidate(base, n, max_length):
+    suffix = f"-{n}"
+    return base[:max_length - len(suffix)] + suffix
+
+
+def unique_slugs(queryset, values, max_length, reserved=()):
+    """Free slugs for values: slugify(value), then value-1, value-2, ...
+
+    Existing slugs are found with one prefix query per PREFIX_BATCH distinct
+    bases, so a run of identical titles costs the same as one. Slugs handed
+    out earlier in the list, and any in reserved, count as taken.
+    """
+    # A title with nothing sluggable would otherwise search the whole table.
+    bases = [slugify(value)[:max_length] or "untitled" for value in values]
+    prefixes = sorted({base[:max_length - SUFFIX_ROOM] for base in bases})
+    taken = set(reserved)
+    for start in range(0, len(prefixes), PREFIX_BATCH):
+        batch = prefixes[start:start + PREFIX_BATCH]
+        condition = reduce(or_, (Q(slug__startswith=prefix) for prefix in batch))
+        taken.update(queryset.filter(condition).order_by().values_list("slug", flat=True))
+
+    # Highest "-N" in use after each head; only a starting point, since the
+    # loop below still checks every candidate against taken.
+    suffixes = {}
+    for slug in taken:
+        head, _, n = slug.rpartition("-")
+        if n.isdigit():
+            suffixes[head] = max(suffixes.get(head, 0), int(n))
+
+    slugs = []
+    for base in bases:
+        slug = base
+        if base in taken:
+            heads = {base[:max_length - digits - 1] for digits in range(1, SUFFIX_ROOM)}
+            n = max(suffixes.get(head, 0) for head in heads) + 1
+            while _candidate(base, n, max_length) in taken:
+                n += 1
+            slug = _candidate(base, n, max_length)
+            suffixes[base] = max(suffixes.get(base, 0), n)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def reserved_slugs(model):
+    """Slugs a model's URLs already use for something else, from its RESERVED_SLUGS."""
+    return frozenset(getattr(model, "RESERVED_SLUGS", ()))
+
+
+def assign_slugs(instances, source):
+    """Fill in blank slugs on unsaved instances before a bulk_create().
+
+    Slugs already set on instances, and the model's reserved ones, count as taken. bulk_create() doesn't
+    retry, so a concurrent writer taking one of these slugs fails the batch
+    with IntegrityError.
+    """
+    pending = [instance for instance in instances if not instance.slug]
+    if not pending:
+        return
+    model = type(pending[0])
+    max_length = model._meta.get_field("slug").max_length
+    slugs = unique_slugs(
+        model._default_manager.all(),
+        [getattr(instance, source) for instance in pending],
+        max_length,
+        reserved=reserved_slugs(model) | {instance.slug for instance in instances if instance.slug},
+    )
+    for instance, slug in zip(pending, slugs):
+        instance.slug = slug
+
+
+def save_with_slug(instance, source, save):
+    """Run save(), first allocating instance.slug from source if it's blank.
+
+    If another save takes the same slug between allocating and inserting,
+    the unique constraint fails and a fresh slug is allocated.
+    """
+    if instance.slug:
+        return save()
+    model = type(instance)
+    max_length = model._meta.get_field("slug").max_length
+    others = model._default_manager.exclude(pk=instance.pk) if instance.pk else model._default_manager.all()
+    for attempt in range(SLUG_ATTEMPTS):
+        instance.slug = unique_slugs(
+            others, [getattr(instance, source)], max_length, reserved=reserved_slugs(model)
+        )[0]
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            if attempt == SLUG_ATTEMPTS - 1 or not others.filter(slug=instance.slug).exists():
+                instance.slug = ""
+                raise
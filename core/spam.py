@@ -0,0 +1,186 @@
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import close_old_connections
+from core.models import FeedbackMessage
+
+logger = logging.getLogger(__name__)
+
+# Heuristics: visitors leaving feedback rarely paste more than a couple of links,
+# and never this many.
+MAX_LINKS = 3
+LINK_FLOOD = 10
+LINK_RE = re.compile(r"https?://|www\.|\[url|<a\s", re.IGNORECASE)
+TOKEN_RE = re.compile(r"[a-z0-9$€£']{2,30}")
+MAX_TOKENS = 400
+
+# Identical messages inside this window are flagged as resubmissions or floods.
+DUPLICATE_WINDOW = 60 * 60
+# Naive Bayes: spam when P(spam | tokens) is above this.
+SPAM_THRESHOLD = 0.95
+# Above this the model is sure enough to discard the message unseen.
+DROP_THRESHOLD = 0.999
+# Reasons from spam_reason() obvious enough to drop before the database; a
+# dropped duplicate's original is already stored. Every other hit is saved
+# with is_spam=True, so a false positive waits in the spam tab.
+DROP_REASONS = {"link-flood", "duplicate", "bayes-certain"}
+# Each class needs a few examples before the model is trusted.
+MIN_TRAINING_DOCS = 5
+TRAINING_SAMPLE = 5000
+MODEL_CACHE_KEY = "spam:model"
+# Each process re-reads the shared model at most this often.
+MODEL_REFRESH_SECONDS = 60
+# Admin spam marks are batched: the model is rebuilt in the background this
+# many seconds after the first mark of a burst.
+RETRAIN_DELAY = 30
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())[:MAX_TOKENS]
+
+
+class NaiveBayes:
+    """Multinomial naive Bayes over word tokens with Laplace smoothing."""
+
+    def __init__(self, spam_counts=None, ham_counts=None, spam_docs=0, ham_docs=0):
+        self.spam_counts = Counter(spam_counts or {})
+        self.ham_counts = Counter(ham_counts or {})
+        self.spam_docs = spam_docs
+        self.ham_docs = ham_docs
+        self._totals()
+
+    def _totals(self):
+        self.spam_total = sum(self.spam_counts.values())
+        self.ham_total = sum(self.ham_counts.values())
+        self.vocabulary = len(self.spam_counts.keys() | self.ham_counts.keys()) or 1
+
+    @classmethod
+    def train(cls, spam_texts, ham_texts):
+        model = cls()
+        for text in spam_texts:
+            model.spam_counts.update(tokenize(text))
+            model.spam_docs += 1
+        for text in ham_texts:
+            model.ham_counts.update(tokenize(text))
+            model.ham_docs += 1
+        model._totals()
+        return model
+
+    @property
+    def ready(self):
+        return self.spam_docs >= MIN_TRAINING_DOCS and self.ham_docs >= MIN_TRAINING_DOCS
+
+    def spam_probability(self, tokens):
+        log_spam = math.log(self.spam_docs / (self.spam_docs + self.ham_docs))
+        log_ham = math.log(self.ham_docs / (self.spam_docs + self.ham_docs))
+        spam_denominator = self.spam_total + self.vocabulary
+        ham_denominator = self.ham_total + self.vocabulary
+        for token in tokens:
+            log_spam += math.log((self.spam_counts.get(token, 0) + 1) / spam_denominator)
+            log_ham += math.log((self.ham_counts.get(token, 0) + 1) / ham_denominator)
+        # 1 / (1 + e^(ham - spam)), clamped so long messages can't overflow.
+        return 1 / (1 + math.exp(max(min(log_ham - log_spam, 700), -700)))
+
+    def to_dict(self):
+        return {
+            "spam_counts": dict(self.spam_counts),
+            "ham_counts": dict(self.ham_counts),
+            "spam_docs": self.spam_docs,
+            "ham_docs": self.ham_docs,
+        }
+
+
+_model = None
+_model_loaded_at = 0.0
+
+
+def current_model():
+    global _model, _model_loaded_at
+    if time.monotonic() - _model_loaded_at > MODEL_REFRESH_SECONDS:
+        data = cache.get(MODEL_CACHE_KEY)
+        _model = NaiveBayes(**data) if data else None
+        _model_loaded_at = time.monotonic()
+    return _model
+
+
+def train_model():
+    """Rebuild the shared model from admin-marked spam and the rest of the inbox.
+
+    Messages spam_reason() quarantined and no admin has looked at are left out.
+    """
+
+    def texts(queryset):
+        rows = queryset.order_by("-created_at").values_list("subject", "body")[:TRAINING_SAMPLE]
+        return [f"{subject} {body}" for subject, body in rows]
+
+    model = NaiveBayes.train(
+        texts(FeedbackMessage.objects.filter(marked_spam_by_admin=True)),
+        texts(FeedbackMessage.objects.filter(is_spam=False)),
+    )
+    cache.set(MODEL_CACHE_KEY, model.to_dict(), None)
+    global _model_loaded_at
+    _model_loaded_at = 0.0  # This process picks it up on the next check.
+    return model
+
+
+_retrain_timer = None
+_retrain_lock = threading.Lock()
+
+
+def schedule_training():
+    """Retrain in a background thread soon, once for a burst of admin marks."""
+    global _retrain_timer
+    with _retrain_lock:
+        if _retrain_timer is not None:
+            return
+        _retrain_timer = threading.Timer(RETRAIN_DELAY, _train_scheduled)
+        _retrain_timer.daemon = True
+        _retrain_timer.start()
+
+
+def _train_scheduled():
+    global _retrain_timer
+    with _retrain_lock:
+        # Marks from here on schedule another run, which will include them.
+        _retrain_timer = None
+    try:
+        train_model()
+    except Exception:
+        logger.exception("Spam model training failed")
+    finally:
+        close_old_connections()
+
+
+def spam_reason(subject, body):
+    """Why a submission looks like spam, or None. Runs before anything touches the database.
+
+    Only reasons in DROP_REASONS mean the message should be discarded.
+    """
+    text = f"{subject} {body}"
+    links = len(LINK_RE.findall(text))
+    if links > LINK_FLOOD:
+        return "link-flood"
+    if links > MAX_LINKS:
+        return "links"
+    if subject.isupper() and len(subject) > 10:
+        return "shouting"
+
+    model = current_model()
+    if model and model.ready:
+        probability = model.spam_probability(tokenize(text))
+        if probability > DROP_THRESHOLD:
+            return "bayes-certain"
+        if probability > SPAM_THRESHOLD:
+            return "bayes"
+
+    normalized = " ".join(text.lower().split())
+    digest = hashlib.sha1(normalized.encode(), usedforsecurity=False).hexdigest()
+    if not cache.add(f"spam:seen:{digest}", 1, DUPLICATE_WINDOW):
+        return "duplicate"
+    return None
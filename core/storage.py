@@ -5,23 +5,92 @@ from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 
 
-def optimize_image(file_obj, max_dimension=1920, quality=85):
-    """Resize and compress an image. Returns a BytesIO with JPEG data."""
+def decode_image(file_obj, max_dimension=1920):
+    """Open and decode an image as RGB, the first stage of optimize_image()."""
     img = Image.open(file_obj)
-    img = img.convert("RGB")
+    # JPEGs can be decoded at 1/2, 1/4 or 1/8 scale, so a huge render never
+    # sits in memory at full size; draft() keeps at least max_dimension.
+    img.draft("RGB", (max_dimension, max_dimension))
+    return img.convert("RGB")
 
+
+def resize_image(img, max_dimension=1920, resample=Image.LANCZOS):
+    """Shrink img in place to fit max_dimension; smaller images are left alone."""
     if max(img.size) > max_dimension:
-        img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+        img.thumbnail((max_dimension, max_dimension), resample)
+    return img
+
 
+def encode_jpeg(img, quality=85):
+    """A BytesIO of img as an optimized JPEG, rewound to the start."""
     output = BytesIO()
     img.save(output, format="JPEG", quality=quality, optimize=True)
     output.seek(0)
     return output
 
 
-def upload_image(file_obj, folder="uploads"):
+def optimize_image(file_obj, max_dimension=1920, quality=85, resample=Image.LANCZOS):
+    """Resize and compress an image. Returns a BytesIO with JPEG data.
+
+    See the benchmark_images command for how the defaults trade off, and
+    how long each stage takes.
+    """
+    img = decode_image(file_obj, max_dimension)
+    img = resize_image(img, max_dimension, resample)
+    return encode_jpeg(img, quality)
+
+
+def upload_image(file_obj, folder="uploads", **optimize_options):
     """Optimize and upload an image to storage. Returns the URL."""
-    optimized = optimize_image(file_obj)
+    optimized = optimize_image(file_obj, **optimize_options)
     filename = f"{folder}/{uuid.uuid4().hex}.jpg"
     path = default_storage.save(filename, ContentFile(optimized.read()))
     return default_storage.url(path)
+
+
+def storage_path_from_url(url):
+    """Map a URL returned by upload_image back to its storage path.
+
+    Returns None for URLs that don't point into default_storage (e.g. images
+    hot-linked from elsewhere).
+    """
+    # Signed S3 URLs carry a query string; the path part is stable.
+    bases = [default_storage.url("")]
+    if hasattr(default_storage, "remote_url"):
+        # Stored before media was proxied (core.media.ProxiedS3Storage).
+        bases.append(default_storage.remote_url(""))
+    url = url.split("?")[0]
+    for base in bases:
+        base = base.split("?")[0]
+        if url and url.startswith(base):
+            return url[len(base):] or None
+    return None
+
+
+def responsive_variants(path, widths, quality=85):
+    """Write downsized JPEG copies of a stored image next to the original.
+
+    Variants are named ``<stem>-<width>w.jpg`` and reused if they already
+    exist, so calling this again for the same image is cheap. Returns the
+    original's ``(width, height)`` and a list of ``(url, width)`` candidates
+    for a srcset, smallest first and ending with the original.
+    """
+    with default_storage.open(path, "rb") as f:
+        img = Image.open(f)
+        size = img.size
+        stem = path.rsplit(".", 1)[0]
+        candidates = []
+        for width in sorted(widths):
+            if width >= size[0]:
+                break
+            variant = f"{stem}-{width}w.jpg"
+            if not default_storage.exists(variant):
+                f.seek(0)
+                resized = Image.open(f).convert("RGB")
+                resized.thumbnail((width, size[1]), Image.LANCZOS)
+                output = BytesIO()
+                resized.save(output, format="JPEG", quality=quality, optimize=True)
+                default_storage.save(variant, ContentFile(output.getvalue()))
+            candidates.append((default_storage.url(variant), width))
+    candidates.append((default_storage.url(path), size[0]))
+    return size, candidates
@@ -0,0 +1,51 @@
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.http import urlencode
+
+register = template.Library()
+
+# Latin WOFF2 subsets committed under static/fonts/ (see vendor_assets).
+FONTS = {
+    "Poor Story": "fonts/poor-story-latin.woff2",
+    "Stick": "fonts/stick-latin.woff2",
+}
+LATIN_RANGE = (
+    "U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, U+0304, "
+    "U+0308, U+0329, U+2000-206F, U+20AC, U+2122, U+2191, U+2193, U+2212, U+2215, U+FEFF, U+FFFD"
+)
+# Where fonts that haven't been vendored yet still come from.
+GOOGLE_FONTS_CSS = "https://fonts.googleapis.com/css2"
+
+
+@register.simple_tag
+def vendored_fonts():
+    """Preload links and @font-face rules for the fonts present in static/.
+
+    A font whose file hasn't been committed yet isn't referenced, which
+    would fail the manifest lookup; it is loaded from Google Fonts instead.
+    """
+    present = {family: static(path) for family, path in FONTS.items() if finders.find(path)}
+    missing = [family for family in FONTS if family not in present]
+    google = ""
+    if missing:
+        query = urlencode([("family", family) for family in missing] + [("display", "swap")])
+        google = format_html(
+            '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>\n'
+            '<link rel="stylesheet" href="{}?{}">',
+            GOOGLE_FONTS_CSS, query,
+        )
+    if not present:
+        return google
+    preloads = format_html_join(
+        "\n", '<link rel="preload" href="{}" as="font" type="font/woff2" crossorigin>',
+        ((url,) for url in present.values()),
+    )
+    faces = format_html_join(
+        "",
+        '@font-face{{font-family:"{}";font-style:normal;font-weight:400;font-display:swap;'
+        'src:url("{}") format("woff2");unicode-range:{}}}',
+        ((family, url, LATIN_RANGE) for family, url in present.items()),
+    )
+    return format_html("{}\n<style>{}</style>{}", preloads, faces, google)
@@ -0,0 +1,37 @@
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+from django.conf import settings
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+
+
+class VendoredAssetsTest(TestCase):
+    def test_committed_files_match_their_checksums(self):
+        call_command("vendor_assets", check=True, stdout=StringIO())
+
+    def render_fonts(self):
+        return Template("{% load assets %}{% vendored_fonts %}").render(Context())
+
+    def test_missing_fonts_come_from_google_fonts(self):
+        with tempfile.TemporaryDirectory() as static_dir:
+            with override_settings(STATICFILES_DIRS=[Path(static_dir)]):
+                html = self.render_fonts()
+        self.assertIn(
+            'href="https://fonts.googleapis.com/css2?family=Poor+Story&amp;family=Stick&amp;display=swap"',
+            html,
+        )
+        self.assertNotIn("preload", html)
+
+    def test_present_fonts_are_preloaded_and_declared(self):
+        with tempfile.TemporaryDirectory() as static_dir:
+            os.mkdir(os.path.join(static_dir, "fonts"))
+            Path(static_dir, "fonts", "stick-latin.woff2").write_bytes(b"wOF2")
+            with override_settings(STATICFILES_DIRS=[Path(static_dir)]):
+                html = self.render_fonts()
+        self.assertIn(f'href="{settings.STATIC_URL}fonts/stick-latin.woff2"', html)
+        self.assertIn('font-family:"Stick"', html)
+        self.assertNotIn('font-family:"Poor Story"', html)
+        self.assertIn("css2?family=Poor+Story&amp;display=swap", html)
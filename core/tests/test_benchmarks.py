@@ -0,0 +1,92 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from core.benchmarks import percentile, summarize
+from core.models import BlogPost, FeedbackMessage, GalleryItem
+
+
+class PercentileTest(TestCase):
+    def test_nearest_rank(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 95), 95)
+        self.assertEqual(percentile(samples, 99), 99)
+
+    def test_empty_samples(self):
+        self.assertEqual(summarize([])["p99_ms"], 0.0)
+
+
+class GenerateDatasetCommandTest(TestCase):
+    def test_generates_requested_counts(self):
+        call_command(
+            "generate_dataset", posts=30, gallery=10, feedback=5, stdout=StringIO()
+        )
+        self.assertEqual(BlogPost.objects.count(), 30)
+        self.assertEqual(GalleryItem.objects.count(), 10)
+        self.assertEqual(FeedbackMessage.objects.count(), 5)
+        self.assertIn("<p>", BlogPost.objects.first().body)
+        self.assertIn("<p>", BlogPost.objects.first().body_rendered)
+
+    def test_repeat_runs_keep_slugs_unique(self):
+        call_command("generate_dataset", posts=20, gallery=0, feedback=0, stdout=StringIO())
+        call_command("generate_dataset", posts=20, gallery=0, feedback=0, stdout=StringIO())
+        self.assertEqual(BlogPost.objects.values("slug").distinct().count(), 40)
+
+
+class BenchmarkRenderingCommandTest(TestCase):
+    def test_writes_both_cases(self):
+        output = StringIO()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "rendering.json"
+            call_command("benchmark_rendering", posts=10, repeat=1, output=str(path), stdout=output)
+            results = json.loads(path.read_text())
+        self.assertEqual(set(results["cases"]), {"precomputed", "template_filter"})
+        self.assertIn("Sanitizing per request adds", output.getvalue())
+
+
+class BenchmarkImagesCommandTest(TestCase):
+    def test_times_each_stage(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "images.json"
+            call_command(
+                "benchmark_images", sizes="400x300", formats="PNG", filters="bilinear",
+                qualities="80", max_dimension=200, repeat=1, output=str(path), stdout=StringIO(),
+            )
+            results = json.loads(path.read_text())
+        self.assertEqual(len(results["cases"]), 2)  # With and without alpha.
+        case = results["cases"][0]
+        self.assertEqual(set(case["stages"]), {"decode", "resize", "encode", "write", "total"})
+        self.assertGreater(case["output_bytes"], 0)
+
+class LoadtestCommandTest(TransactionTestCase):
+    # Worker threads have their own connections, so the data must be committed.
+
+    def test_smoke(self):
+        call_command("generate_dataset", posts=5, gallery=3, feedback=2, stdout=StringIO())
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "loadtest.json"
+            call_command(
+                "loadtest", requests=2, concurrency=2, warmup=0, output=str(path), stdout=StringIO()
+            )
+            results = json.loads(path.read_text())
+        self.assertIn("admin_blog", results["endpoints"])
+        for name, row in results["endpoints"].items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(row["errors"], 0)
+                self.assertEqual(row["count"], 2)
+        self.assertFalse(User.objects.exists())
+
+    def test_refuses_to_run_without_static_manifest(self):
+        storages = {
+            **settings.STORAGES,
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"},
+        }
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                override_settings(STORAGES=storages, STATIC_ROOT=tmpdir):
+            with self.assertRaisesMessage(CommandError, "collectstatic"):
+                call_command("loadtest", requests=1, stdout=StringIO())
@@ -0,0 +1,162 @@
+import json
+import os
+import tempfile
+import time
+from io import BytesIO
+from PIL import Image
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from core import chunked_uploads
+from core.chunked_uploads import ChunkedUpload, remove_expired
+
+
+def jpeg_bytes(size=(300, 200)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color="green").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class RecordingStream(BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super().read(size)
+
+
+class ChunkedUploadTestCase(TestCase):
+    def setUp(self):
+        chunk_dir = tempfile.TemporaryDirectory()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(chunk_dir.cleanup)
+        self.addCleanup(media_root.cleanup)
+        dirs = override_settings(UPLOAD_CHUNK_DIR=chunk_dir.name, MEDIA_ROOT=media_root.name)
+        dirs.enable()
+        self.addCleanup(dirs.disable)
+        self.chunk_dir = chunk_dir.name
+        self.media_root = media_root.name
+
+
+class ChunkedUploadModuleTest(ChunkedUploadTestCase):
+    def test_copies_in_fixed_size_pieces(self):
+        data = os.urandom(5 * chunked_uploads.COPY_BUFFER + 10)
+        upload = ChunkedUpload.create(self.chunk_dir, "gallery", "image/jpeg", len(data), owner=1)
+        stream = RecordingStream(data)
+        self.assertEqual(upload.append(0, stream, len(data)), len(data))
+        self.assertLessEqual(max(stream.reads), chunked_uploads.COPY_BUFFER)
+        with open(upload.finishing, "rb") as f:
+            self.assertEqual(f.read(), data)
+
+    def test_removes_stale_uploads(self):
+        stale = ChunkedUpload.create(self.chunk_dir, "gallery", "image/jpeg", 10, owner=1)
+        fresh = ChunkedUpload.create(self.chunk_dir, "gallery", "image/jpeg", 10, owner=1)
+        remove_expired(self.chunk_dir, now=time.time() + chunked_uploads.UPLOAD_EXPIRY + 1)
+        self.assertFalse(stale.part.exists() or fresh.part.exists())
+
+    def test_last_append_claims_the_file(self):
+        upload = ChunkedUpload.create(self.chunk_dir, "gallery", "image/jpeg", 10, owner=1)
+        self.assertEqual(upload.append(0, BytesIO(b"x" * 10), 10), 10)
+        self.assertTrue(upload.finishing.exists())
+        self.assertEqual(upload.offset, 10)
+        with self.assertRaises(chunked_uploads.UploadError):
+            upload.append(10, BytesIO(b""), 0)
+
+    def test_rejects_ids_that_are_not_ours(self):
+        with self.assertRaises(chunked_uploads.UploadError):
+            ChunkedUpload(self.chunk_dir, "../../etc/passwd")
+
+
+class ChunkedUploadViewTest(ChunkedUploadTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="treefel", password="testpass123")
+        self.client.force_login(self.user)
+        self.data = jpeg_bytes()
+
+    def start(self, **data):
+        data = {"folder": "gallery", "content_type": "image/jpeg", "size": len(self.data), **data}
+        return self.client.post(
+            reverse("core:chunked_upload_start"), json.dumps(data), content_type="application/json"
+        )
+
+    def put(self, url, offset, chunk):
+        return self.client.generic(
+            "PUT", url, chunk, content_type="application/octet-stream", HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_chunks_assemble_into_an_image(self):
+        response = self.start()
+        self.assertEqual(response.status_code, 201)
+        url = response.json()["url"]
+        half = len(self.data) // 2
+        self.assertEqual(self.put(url, 0, self.data[:half]).json()["offset"], half)
+        self.assertEqual(self.client.get(url).json()["offset"], half)
+
+        response = self.put(url, half, self.data[half:])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["url"].endswith(".jpg"))
+        self.assertEqual(len(os.listdir(os.path.join(self.media_root, "gallery"))), 1)
+        self.assertEqual(os.listdir(self.chunk_dir), [])
+
+    def test_resumes_after_a_cut_off_chunk(self):
+        url = self.start().json()["url"]
+        # The connection dropped after 100 bytes of this chunk.
+        upload = ChunkedUpload(self.chunk_dir, url.rstrip("/").rsplit("/", 1)[1])
+        upload.append(0, BytesIO(self.data[:100]), 500)
+        offset = self.client.get(url).json()["offset"]
+        self.assertEqual(offset, 100)
+        self.assertIn("url", self.put(url, offset, self.data[offset:]).json())
+
+    def test_wrong_offset_reports_the_right_one(self):
+        url = self.start().json()["url"]
+        self.put(url, 0, self.data[:100])
+        response = self.put(url, 0, self.data[:100])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["offset"], 100)
+
+    def test_finished_upload_is_processed_once(self):
+        url = self.start().json()["url"]
+        self.assertIn("url", self.put(url, 0, self.data).json())
+        self.assertEqual(self.put(url, len(self.data), b"").status_code, 400)
+        self.assertEqual(len(os.listdir(os.path.join(self.media_root, "gallery"))), 1)
+
+    def test_empty_chunk(self):
+        url = self.start().json()["url"]
+        self.assertEqual(self.put(url, 0, b"").status_code, 400)
+        self.assertEqual(self.client.get(url).json()["offset"], 0)
+
+    def test_chunk_past_the_end(self):
+        url = self.start().json()["url"]
+        self.assertEqual(self.put(url, 0, self.data + b"extra").status_code, 400)
+
+    def test_not_an_image(self):
+        self.data = b"x" * 1000
+        url = self.start().json()["url"]
+        self.assertEqual(self.put(url, 0, self.data).status_code, 400)
+        self.assertEqual(os.listdir(self.chunk_dir), [])
+
+    def test_other_users_cannot_touch_it(self):
+        url = self.start().json()["url"]
+        other = User.objects.create_user(username="other", password="testpass123")
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.put(url, 0, self.data).status_code, 404)
+
+    def test_discard(self):
+        url = self.start().json()["url"]
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.get(url).status_code, 400)
+
+    def test_malformed_start_request(self):
+        response = self.client.post(
+            reverse("core:chunked_upload_start"), "{not json", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "Malformed request.")
+
+    def test_validates_the_upload(self):
+        self.assertEqual(self.start(content_type="video/mp4").status_code, 400)
+        self.assertEqual(os.listdir(self.chunk_dir), [])
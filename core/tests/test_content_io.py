@@ -0,0 +1,178 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from core.models import BlogCategory, BlogPost, GalleryItem, Tag
+
+
+class ContentIOTestCase(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, "content.jsonl")
+
+    def write_lines(self, *records):
+        with open(self.path, "w") as f:
+            for record in records:
+                f.write((record if isinstance(record, str) else json.dumps(record)) + "\n")
+
+    def import_content(self, **options):
+        options.setdefault("skip_images", True)
+        call_command("import_content", self.path, stdout=StringIO(), stderr=StringIO(), **options)
+
+
+class ExportContentTest(ContentIOTestCase):
+    def test_one_json_object_per_line(self):
+        category = BlogCategory.objects.create(name="Dev Log")
+        BlogPost.objects.create(
+            title="First", body="<p>Hi</p>", category=category, tags="art", published=True
+        )
+        GalleryItem.objects.create(title="Moss", category="2D", media_type="image", image="https://x/a.jpg")
+        call_command("export_content", self.path, stdout=StringIO())
+
+        with open(self.path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record["type"] for record in records], ["post", "gallery"])
+        self.assertEqual(records[0]["slug"], "first")
+        self.assertEqual(records[0]["category"], "Dev Log")
+        self.assertNotIn("body_rendered", records[0])
+        self.assertEqual(records[1]["image"], "https://x/a.jpg")
+
+    def test_stdout(self):
+        BlogPost.objects.create(title="First", body="b")
+        out = StringIO()
+        call_command("export_content", type="posts", stdout=out, stderr=StringIO())
+        self.assertEqual(json.loads(out.getvalue())["title"], "First")
+
+
+class ImportContentTest(ContentIOTestCase):
+    def post(self, title, **fields):
+        return {"type": "post", "title": title, "body": "<p>Body</p>", **fields}
+
+    def test_round_trip(self):
+        category = BlogCategory.objects.create(name="Dev Log")
+        post = BlogPost.objects.create(
+            title="First", body="<p>Hi</p>", category=category, tags="Art, Moss", published=True
+        )
+        created = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        BlogPost.objects.filter(pk=post.pk).update(created_at=created)
+        GalleryItem.objects.create(title="Moss", category="2D", media_type="image", image="https://x/a.jpg")
+        call_command("export_content", self.path, stdout=StringIO())
+        BlogPost.objects.all().delete()
+        GalleryItem.objects.all().delete()
+        BlogCategory.objects.all().delete()
+        Tag.objects.all().delete()
+
+        self.import_content()
+        post = BlogPost.objects.get()
+        self.assertEqual((post.slug, post.category.name, post.created_at), ("first", "Dev Log", created))
+        self.assertEqual(post.body_rendered, "<p>Hi</p>")
+        self.assertEqual(sorted(post.tag_set.values_list("slug", "post_count")), [("art", 1), ("moss", 1)])
+        self.assertEqual(post.category.published_post_count, 1)
+        self.assertEqual(GalleryItem.objects.get().title, "Moss")
+
+    def test_rerun_skips_existing_posts(self):
+        self.write_lines(self.post("First", slug="first"))
+        self.import_content()
+        self.import_content()
+        self.assertEqual(BlogPost.objects.count(), 1)
+
+    def test_allocates_slugs_around_existing_and_explicit_ones(self):
+        BlogPost.objects.create(title="Dev Log", body="b")
+        self.write_lines(
+            self.post("Dev Log", slug="dev-log-1"), self.post("Dev Log"), self.post("Dev Log")
+        )
+        self.import_content()
+        self.assertEqual(
+            sorted(BlogPost.objects.values_list("slug", flat=True)),
+            ["dev-log", "dev-log-1", "dev-log-2", "dev-log-3"],
+        )
+
+    def test_queries_do_not_grow_with_the_batch(self):
+        def queries_for(count):
+            BlogPost.objects.all().delete()
+            self.write_lines(*(
+                self.post(f"Post {i}", tags="art, moss", category="Dev Log", published=True)
+                for i in range(count)
+            ))
+            with CaptureQueriesContext(connection) as context:
+                self.import_content()
+            return len(context)
+
+        queries_for(1)  # Creates the category and tags.
+        self.assertEqual(queries_for(5), queries_for(50))
+
+    def test_invalid_lines_are_reported_and_skipped(self):
+        self.write_lines("not json", {"type": "page", "title": "?"}, self.post("Fine"))
+        err = StringIO()
+        call_command("import_content", self.path, skip_images=True, stdout=StringIO(), stderr=err)
+        self.assertEqual(BlogPost.objects.count(), 1)
+        self.assertIn("line 1", err.getvalue())
+        self.assertIn("line 2", err.getvalue())
+
+    def test_lines_missing_required_keys_are_invalid(self):
+        self.write_lines(
+            {"type": "post", "body": "<p>No title</p>"},
+            {"type": "gallery", "title": "A", "media_type": "image"},
+            self.post("Fine"),
+        )
+        err = StringIO()
+        out = StringIO()
+        call_command("import_content", self.path, skip_images=True, stdout=out, stderr=err)
+        self.assertEqual(BlogPost.objects.count(), 1)
+        self.assertFalse(GalleryItem.objects.exists())
+        self.assertIn("line 2: missing category", err.getvalue())
+        self.assertIn("2 invalid lines", out.getvalue())
+
+    def test_rerun_skips_existing_gallery_items(self):
+        self.write_lines(
+            {"type": "gallery", "title": "A", "category": "3D", "media_type": "image",
+             "image": "https://x/a.jpg"},
+            {"type": "gallery", "title": "A", "category": "3D", "media_type": "image",
+             "image": "https://x/other.jpg"},
+            {"type": "gallery", "title": "B", "category": "2D", "media_type": "youtube",
+             "youtube_url": "https://youtu.be/abc"},
+        )
+        self.import_content()
+        self.import_content()
+        self.assertEqual(GalleryItem.objects.count(), 3)
+
+    def test_gallery_items_append_after_existing(self):
+        GalleryItem.objects.create(title="Old", category="2D", media_type="image", sort_order=10)
+        self.write_lines(
+            {"type": "gallery", "title": "A", "category": "3D", "media_type": "image", "image": ""},
+            {"type": "gallery", "title": "B", "category": "2D", "media_type": "youtube",
+             "youtube_url": "https://youtu.be/abc"},
+        )
+        self.import_content()
+        self.assertEqual(
+            list(GalleryItem.objects.order_by("sort_order").values_list("title", flat=True)),
+            ["Old", "A", "B"],
+        )
+
+    @patch(
+        "core.management.commands.import_content.fetch_remote_image",
+        return_value="gallery/imported/abc.jpg",
+    )
+    def test_remote_images_are_copied(self, mock_fetch):
+        self.write_lines(
+            {"type": "gallery", "title": "A", "category": "3D", "media_type": "image",
+             "image": "https://other-env.example.com/gallery/a.jpg"},
+        )
+        self.import_content(skip_images=False)
+        mock_fetch.assert_called_once_with(
+            "https://other-env.example.com/gallery/a.jpg", folder="gallery/imported"
+        )
+        self.assertTrue(GalleryItem.objects.get().image.endswith("gallery/imported/abc.jpg"))
+
+    @patch("core.management.commands.import_content.fetch_remote_image", return_value=None)
+    def test_failed_copy_keeps_the_original_url(self, mock_fetch):
+        self.write_lines(self.post("First", header_image="https://other-env.example.com/blog/a.jpg"))
+        self.import_content(skip_images=False)
+        self.assertEqual(BlogPost.objects.get().header_image, "https://other-env.example.com/blog/a.jpg")
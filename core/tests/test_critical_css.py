@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.test import TestCase
+from django.urls import reverse
+from core.management.commands.build_critical_css import PAGES, build_pages
+
+# Inlined CSS plus the HTML around it should fit in the first TCP round trip
+# (~14 KB on the wire). Uncompressed, so growth shows up before gzip hides it.
+CRITICAL_CSS_BUDGET = 14 * 1024
+
+
+class CriticalCssTest(TestCase):
+    def test_critical_css_within_budget(self):
+        for page in PAGES:
+            with self.subTest(page=page):
+                css = render_to_string(f"core/critical/{page}.css")
+                self.assertLess(len(css.encode()), CRITICAL_CSS_BUDGET)
+
+    def test_committed_critical_css_is_up_to_date(self):
+        critical_dir = settings.BASE_DIR / "core" / "templates" / "core" / "critical"
+        for page, content in build_pages().items():
+            with self.subTest(page=page):
+                self.assertEqual(
+                    (critical_dir / f"{page}.css").read_text(), content,
+                    "Run manage.py build_critical_css and commit the result.",
+                )
+
+    def test_public_page_inlines_css_and_loads_stylesheet_async(self):
+        response = self.client.get(reverse("core:about"))
+        self.assertContains(response, "<style>")
+        self.assertContains(response, 'rel="preload"')
+        self.assertContains(response, "<noscript>")
+
+    def test_other_pages_keep_blocking_stylesheet(self):
+        response = self.client.get(reverse("login"))
+        self.assertNotContains(response, "<style>")
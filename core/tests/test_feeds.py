@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from core.feeds import GENERATION_KEY
+from core.models import BlogCategory, BlogPost
+
+
+class BlogFeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.category = BlogCategory.objects.create(name="Dev Log")
+        self.post = BlogPost.objects.create(
+            title="Published Post",
+            body="<p>Content</p>",
+            category=self.category,
+            published=True,
+        )
+        BlogPost.objects.create(title="Draft Post", body="<p>Draft</p>", published=False)
+
+    def test_rss_and_atom_list_published_posts(self):
+        rss = self.client.get(reverse("core:blog_feed"))
+        atom = self.client.get(reverse("core:blog_feed_atom"))
+        self.assertEqual(rss["Content-Type"], "application/rss+xml; charset=utf-8")
+        self.assertEqual(atom["Content-Type"], "application/atom+xml; charset=utf-8")
+        for response in (rss, atom):
+            self.assertContains(response, "Published Post")
+            self.assertNotContains(response, "Draft Post")
+            self.assertContains(response, reverse("core:blog_detail", kwargs={"slug": self.post.slug}))
+
+    def test_category_feed(self):
+        BlogPost.objects.create(title="Elsewhere", body="<p>x</p>", published=True)
+        url = reverse("core:blog_category_feed", kwargs={"slug": self.category.slug})
+        response = self.client.get(url)
+        self.assertContains(response, "Published Post")
+        self.assertNotContains(response, "Elsewhere")
+        missing = reverse("core:blog_category_feed", kwargs={"slug": "nope"})
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+    def test_conditional_requests(self):
+        response = self.client.get(reverse("core:blog_feed"))
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+        self.assertEqual(
+            self.client.get(reverse("core:blog_feed"), HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+        self.assertEqual(
+            self.client.get(reverse("core:blog_feed"), HTTP_IF_MODIFIED_SINCE=last_modified).status_code,
+            304,
+        )
+
+    def test_cached_until_a_published_post_changes(self):
+        self.client.get(reverse("core:blog_feed"))
+        with self.assertNumQueries(0):
+            self.client.get(reverse("core:blog_feed"))
+
+        # Draft edits don't touch the feed.
+        BlogPost.objects.create(title="Another Draft", body="<p>x</p>", published=False)
+        with self.assertNumQueries(0):
+            self.client.get(reverse("core:blog_feed"))
+
+        self.post.title = "Renamed Post"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+        self.assertContains(self.client.get(reverse("core:blog_feed")), "Renamed Post")
+
+    def test_invalidated_only_once_the_save_commits(self):
+        generation = cache.get_or_set(GENERATION_KEY, "old", None)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+            # A request now would still be building under the old generation.
+            self.assertEqual(cache.get(GENERATION_KEY), generation)
+        self.assertNotEqual(cache.get(GENERATION_KEY), generation)
+
+    def test_unpublishing_drops_post_from_feed(self):
+        self.client.get(reverse("core:blog_feed"))
+        post = BlogPost.objects.get(pk=self.post.pk)
+        post.published = False
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        self.assertNotContains(self.client.get(reverse("core:blog_feed")), "Published Post")
+
+    def test_build_finishing_after_invalidation_is_not_served(self):
+        # Simulate a request that read the old generation, then lost a race
+        # with a publish: its entry must not be what later requests see.
+        stale_generation = cache.get_or_set(GENERATION_KEY, "old", None)
+        self.post.title = "Renamed Post"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+        key = f"feed:{stale_generation}:PostsFeed:testserver:"
+        cache.set(key, {"content": b"stale", "content_type": "text/plain",
+                        "etag": '"stale"', "last_modified": "Thu, 01 Jan 1970 00:00:00 GMT"})
+        self.assertContains(self.client.get(reverse("core:blog_feed")), "Renamed Post")
@@ -0,0 +1,74 @@
+import json
+import tempfile
+from pathlib import Path
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from core import ingest
+from core.ingest import FeedbackBuffer
+from core.models import FeedbackCounts, FeedbackMessage
+
+
+class FeedbackBufferTest(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.dir = Path(tmpdir.name)
+        self.buffer = FeedbackBuffer(self.dir, batch_size=100)
+
+    def test_enqueue_spools_without_touching_the_database(self):
+        with self.assertNumQueries(0):
+            self.buffer.enqueue({"subject": "Hi", "body": "Nice", "email": ""})
+        record = json.loads((self.dir / "feedback.jsonl").read_text())
+        self.assertEqual(record["subject"], "Hi")
+        self.assertFalse(FeedbackMessage.objects.exists())
+
+    def test_flush_bulk_inserts_and_empties_the_spool(self):
+        for i in range(3):
+            self.buffer.enqueue({"subject": f"Hi {i}", "body": "Nice"})
+        self.assertEqual(self.buffer.flush(), 3)
+        self.assertEqual(FeedbackMessage.objects.count(), 3)
+        self.assertEqual(FeedbackCounts.load().pending, 3)
+        self.assertEqual(list(self.dir.glob("*.jsonl")) + list(self.dir.glob("*.flushing")), [])
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_quarantined_messages_count_as_spam(self):
+        self.buffer.enqueue({"subject": "Hi", "body": "Nice"})
+        self.buffer.enqueue({"subject": "DEALS", "body": "Nice", "is_spam": True})
+        self.buffer.flush()
+        counts = FeedbackCounts.load()
+        self.assertEqual((counts.pending, counts.spam), (1, 1))
+        self.assertTrue(FeedbackMessage.objects.get(subject="DEALS").is_spam)
+
+    def test_replaying_a_half_flushed_batch_inserts_nothing_twice(self):
+        self.buffer.enqueue({"subject": "Once", "body": "Nice"})
+        leftover = (self.dir / "feedback.jsonl").read_bytes()
+        self.buffer.flush()
+        # As if the process died after inserting but before deleting the batch.
+        (self.dir / "crashed.flushing").write_bytes(leftover)
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(FeedbackMessage.objects.filter(subject="Once").count(), 1)
+        self.assertEqual(FeedbackCounts.load().pending, 1)
+
+    def test_counts_only_rows_actually_inserted(self):
+        self.buffer.enqueue({"subject": "Twice", "body": "Nice"})
+        spool = self.dir / "feedback.jsonl"
+        spool.write_bytes(spool.read_bytes() * 2)
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(FeedbackMessage.objects.count(), 1)
+        self.assertEqual(FeedbackCounts.load().pending, 1)
+
+
+class BufferedFeedbackViewTest(TestCase):
+    def test_post_is_spooled_and_flushed_later(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with override_settings(FEEDBACK_BUFFERED=True, FEEDBACK_SPOOL_DIR=tmpdir):
+                buffer = FeedbackBuffer(tmpdir)
+                ingest._buffer = buffer
+                self.addCleanup(setattr, ingest, "_buffer", None)
+                response = self.client.post(
+                    reverse("core:feedback"), {"subject": "Hi", "body": "Great work", "honeypot": ""}
+                )
+                self.assertContains(response, "Thank you")
+                self.assertFalse(FeedbackMessage.objects.exists())
+                buffer.flush()
+        self.assertTrue(FeedbackMessage.objects.filter(subject="Hi").exists())
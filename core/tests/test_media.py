@@ -0,0 +1,150 @@
+import os
+import tempfile
+import time
+from unittest.mock import patch
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase, override_settings
+from core import media
+from core.media import MediaCache, ProxiedS3Storage, byte_range
+from core.storage import storage_path_from_url
+
+DATA = bytes(range(256)) * 4
+
+
+def temporary_directory(test):
+    tmpdir = tempfile.TemporaryDirectory()
+    test.addCleanup(tmpdir.cleanup)
+    return tmpdir.name
+
+
+class ServeMediaTest(TestCase):
+    def setUp(self):
+        self.media_root = temporary_directory(self)
+        settings = override_settings(MEDIA_ROOT=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        os.makedirs(os.path.join(self.media_root, "gallery"))
+        with open(os.path.join(self.media_root, "gallery", "a.jpg"), "wb") as f:
+            f.write(DATA)
+
+    def get(self, path="/media/gallery/a.jpg", **headers):
+        return self.client.get(path, headers=headers)
+
+    def test_whole_file_with_long_cache_headers(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.getvalue(), DATA)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response["Content-Length"], str(len(DATA)))
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+    def test_byte_range(self):
+        response = self.get(Range="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.getvalue(), DATA[10:20])
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(DATA)}")
+        self.assertEqual(response["Content-Length"], "10")
+
+    def test_suffix_and_open_ended_ranges(self):
+        self.assertEqual(self.get(Range="bytes=-5").getvalue(), DATA[-5:])
+        self.assertEqual(self.get(Range="bytes=1000-").getvalue(), DATA[1000:])
+
+    def test_unsatisfiable_range(self):
+        response = self.get(Range=f"bytes={len(DATA)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(DATA)}")
+
+    def test_stale_if_range_gets_the_whole_file(self):
+        response = self.get(Range="bytes=0-9", **{"If-Range": '"stale"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.getvalue(), DATA)
+
+    def test_not_modified(self):
+        etag = self.get()["ETag"]
+        response = self.get(**{"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_missing_and_outside_paths(self):
+        self.assertEqual(self.get("/media/gallery/nope.jpg").status_code, 404)
+        self.assertEqual(self.get("/media/gallery").status_code, 404)
+        self.assertIn(self.get("/media/../settings.py").status_code, (400, 404))
+
+    def test_storage_urls_point_here(self):
+        self.assertEqual(FileSystemStorage().url("gallery/a.jpg"), "/media/gallery/a.jpg")
+
+
+class RangeHeaderTest(TestCase):
+    def test_parsing(self):
+        self.assertEqual(byte_range("bytes=0-99", 1000), (0, 100))
+        self.assertEqual(byte_range("bytes=900-2000", 1000), (900, 100))
+        self.assertEqual(byte_range("bytes=-100", 1000), (900, 100))
+        self.assertIsNone(byte_range("bytes=0-1,5-6", 1000))
+        self.assertIsNone(byte_range("items=0-1", 1000))
+        self.assertFalse(byte_range("bytes=5-1", 1000))
+
+
+class MediaCacheTest(TestCase):
+    def setUp(self):
+        self.remote = FileSystemStorage(location=temporary_directory(self))
+        self.cache_dir = temporary_directory(self)
+        for name in ("gallery/a.jpg", "gallery/b.jpg", "gallery/c.jpg"):
+            self.remote.save(name, ContentFile(DATA))
+
+    def test_reads_through_once(self):
+        cache = MediaCache(self.cache_dir, 10 * len(DATA), self.remote)
+        with patch.object(self.remote, "open", wraps=self.remote.open) as remote_open:
+            for _ in range(3):
+                with cache.open("gallery/a.jpg") as f:
+                    self.assertEqual(f.read(), DATA)
+        remote_open.assert_called_once()
+
+    def test_evicts_least_recently_used(self):
+        # Room for two and a half files.
+        cache = MediaCache(self.cache_dir, 5 * len(DATA) // 2, self.remote)
+        cache.open("gallery/a.jpg").close()
+        cache.open("gallery/b.jpg").close()
+        # a.jpg was used more recently than b.jpg.
+        past = time.time() - 3600
+        os.utime(os.path.join(self.cache_dir, "gallery/b.jpg"), (past, past))
+        cache.open("gallery/c.jpg").close()
+        self.assertEqual(sorted(os.listdir(os.path.join(self.cache_dir, "gallery"))), ["a.jpg", "c.jpg"])
+
+    def test_missing_remote_file_is_not_cached(self):
+        cache = MediaCache(self.cache_dir, len(DATA), self.remote)
+        with self.assertRaises(FileNotFoundError):
+            cache.open("gallery/nope.jpg")
+        self.assertEqual([names for _, _, names in os.walk(self.cache_dir) if names], [])
+
+    def test_served_through_the_cache_when_storage_is_remote(self):
+        class RemoteOnly:
+            def path(self, name):
+                raise NotImplementedError
+
+            def open(self_, name, mode):
+                return self.remote.open(name, mode)
+
+        with patch.object(media, "default_storage", RemoteOnly()), \
+                self.settings(MEDIA_CACHE_DIR=self.cache_dir, MEDIA_CACHE_MAX_BYTES=len(DATA) * 10):
+            response = self.client.get("/media/gallery/a.jpg", headers={"Range": "bytes=0-3"})
+            self.assertEqual(response.getvalue(), DATA[:4])
+            self.assertTrue(os.path.exists(os.path.join(self.cache_dir, "gallery/a.jpg")))
+            with self.settings(MEDIA_CACHE_DIR=""):
+                self.assertEqual(self.client.get("/media/gallery/a.jpg").status_code, 404)
+
+
+class ProxiedS3StorageTest(TestCase):
+    def test_urls_go_through_this_site_and_old_bucket_urls_still_map(self):
+        storage = ProxiedS3Storage(
+            access_key="key", secret_key="secret", bucket_name="media",
+            custom_domain="media.example.com",
+        )
+        self.assertEqual(storage.url("gallery/a b.jpg"), "/media/gallery/a%20b.jpg")
+        with patch("core.storage.default_storage", storage):
+            self.assertEqual(storage_path_from_url("/media/gallery/a.jpg"), "gallery/a.jpg")
+            self.assertEqual(
+                storage_path_from_url("https://media.example.com/gallery/a.jpg"), "gallery/a.jpg"
+            )
+            self.assertIsNone(storage_path_from_url("https://elsewhere.com/gallery/a.jpg"))
@@ -0,0 +1,57 @@
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from core.models import BlogCategory, BlogPost, RequestMetric
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+    def test_server_timing_reports_db_template_and_total(self):
+        response = self.client.get(reverse("core:home"))
+        timing = response["Server-Timing"]
+        self.assertIn('desc="2 queries"', timing)
+        self.assertIn("tpl;dur=", timing)
+        self.assertIn("total;dur=", timing)
+
+    def test_template_time_is_recorded(self):
+        category = BlogCategory.objects.create(name="Dev Log")
+        BlogPost.objects.create(title="Post", body="body", category=category, published=True)
+        response = self.client.get(reverse("core:blog_list"))
+        tpl = response["Server-Timing"].split("tpl;dur=")[1].split(",")[0]
+        self.assertGreater(float(tpl), 0)
+
+    def test_no_pool_timing_without_pool(self):
+        response = self.client.get(reverse("core:about"))
+        self.assertNotIn("db-pool", response["Server-Timing"])
+
+    @patch("core.middleware.pool_wait_ms", side_effect=[120, 135])
+    def test_reports_pool_wait_for_request(self, mock_wait):
+        response = self.client.get(reverse("core:about"))
+        self.assertIn("db-pool;dur=15", response["Server-Timing"])
+
+    def test_no_rows_stored_when_sampling_off(self):
+        self.client.get(reverse("core:about"))
+        self.assertEqual(RequestMetric.objects.count(), 0)
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=1)
+    def test_sampled_request_is_stored(self):
+        self.client.get(reverse("core:home"))
+        metric = RequestMetric.objects.get()
+        self.assertEqual(metric.view_name, "core:home")
+        self.assertEqual(metric.query_count, 2)
+
+
+class AdminMetricsViewTest(TestCase):
+    def test_admin_metrics_requires_login(self):
+        response = self.client.get(reverse("core:admin_metrics"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_admin_metrics_shows_summary(self):
+        User.objects.create_user(username="treefel", password="testpass123")
+        self.client.login(username="treefel", password="testpass123")
+        RequestMetric.objects.create(
+            method="GET", path="/blog/", view_name="core:blog_list", status_code=200,
+            query_count=3, db_ms=1.5, template_ms=4.0, total_ms=8.0,
+        )
+        response = self.client.get(reverse("core:admin_metrics"))
+        self.assertContains(response, "core:blog_list")
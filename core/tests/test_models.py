@@ -1,5 +1,7 @@
 from django.test import TestCase
-from core.models import BlogCategory, BlogPost, GalleryItem, FeedbackMessage, SiteSetting
+from core.models import (
+    BlogCategory, BlogPost, GalleryItem, FeedbackCounts, FeedbackMessage, SiteSetting,
+)
 
 
 class BlogCategoryModelTest(TestCase):
@@ -57,6 +59,40 @@ class BlogPostModelTest(TestCase):
         self.assertEqual(posts[0], p2)
 
 
+class CategoryPostCountTest(TestCase):
+    def setUp(self):
+        self.dev_log = BlogCategory.objects.create(name="Dev Log")
+        self.personal = BlogCategory.objects.create(name="Personal")
+
+    def counts(self):
+        return [
+            BlogCategory.objects.get(pk=cat.pk).published_post_count
+            for cat in (self.dev_log, self.personal)
+        ]
+
+    def test_counts_follow_publish_move_and_delete(self):
+        post = BlogPost.objects.create(title="Post", body="body", category=self.dev_log)
+        self.assertEqual(self.counts(), [0, 0])
+
+        post.published = True
+        post.save()
+        self.assertEqual(self.counts(), [1, 0])
+
+        post.category = self.personal
+        post.save()
+        self.assertEqual(self.counts(), [0, 1])
+
+        post = BlogPost.objects.get(pk=post.pk)
+        post.published = False
+        post.save()
+        self.assertEqual(self.counts(), [0, 0])
+
+        BlogPost.objects.create(title="Live", body="body", category=self.dev_log, published=True)
+        self.assertEqual(self.counts(), [1, 0])
+        BlogPost.objects.filter(category=self.dev_log).delete()
+        self.assertEqual(self.counts(), [0, 0])
+
+
 class GalleryItemModelTest(TestCase):
     def test_create_image_item(self):
         item = GalleryItem.objects.create(
@@ -121,6 +157,62 @@ class FeedbackMessageModelTest(TestCase):
         self.assertEqual(str(msg), "Test")
 
 
+class FeedbackCountsTest(TestCase):
+    def assertCounts(self, pending, completed, spam):
+        counts = FeedbackCounts.load()
+        self.assertEqual((counts.pending, counts.completed, counts.spam), (pending, completed, spam))
+
+    def test_create_and_status_changes(self):
+        msg = FeedbackMessage.objects.create(subject="Hi", body="b")
+        self.assertCounts(1, 0, 0)
+        msg.is_completed = True
+        msg.save(update_fields=["is_completed"])
+        self.assertCounts(0, 1, 0)
+        msg = FeedbackMessage.objects.get(pk=msg.pk)
+        msg.is_spam = True
+        msg.save()
+        self.assertCounts(0, 0, 1)
+
+    def test_unchanged_save_leaves_counts(self):
+        msg = FeedbackMessage.objects.create(subject="Hi", body="b")
+        msg.subject = "Hello"
+        msg.save()
+        self.assertCounts(1, 0, 0)
+
+    def test_instance_delete(self):
+        msg = FeedbackMessage.objects.create(subject="Hi", body="b", is_completed=True)
+        msg.delete()
+        self.assertCounts(0, 0, 0)
+
+    def test_queryset_mark_completed(self):
+        FeedbackMessage.objects.create(subject="A", body="b")
+        FeedbackMessage.objects.create(subject="B", body="b", is_completed=True)
+        FeedbackMessage.objects.create(subject="C", body="b", is_spam=True)
+        self.assertEqual(FeedbackMessage.objects.all().mark_completed(), 1)
+        self.assertCounts(0, 2, 1)
+        self.assertFalse(FeedbackMessage.objects.get(subject="C").is_completed)
+
+    def test_queryset_delete(self):
+        FeedbackMessage.objects.create(subject="A", body="b")
+        FeedbackMessage.objects.create(subject="B", body="b", is_completed=True)
+        FeedbackMessage.objects.create(subject="C", body="b", is_spam=True)
+        deleted, _ = FeedbackMessage.objects.exclude(subject="A").delete()
+        self.assertEqual(deleted, 2)
+        self.assertCounts(1, 0, 0)
+
+    def test_rebuild_after_bulk_create(self):
+        FeedbackMessage.objects.bulk_create(
+            FeedbackMessage(subject=f"M{i}", body="b", is_completed=i % 2 == 0) for i in range(5)
+        )
+        FeedbackCounts.rebuild()
+        self.assertCounts(2, 3, 0)
+
+    def test_missing_row_is_recounted(self):
+        FeedbackCounts.objects.all().delete()
+        FeedbackMessage.objects.create(subject="Hi", body="b")
+        self.assertCounts(1, 0, 0)
+
+
 class SiteSettingModelTest(TestCase):
     def test_create_setting(self):
         setting = SiteSetting.objects.create(
@@ -0,0 +1,337 @@
+import json
+import tempfile
+import time
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from core import urls as core_urls
+from core.models import (
+    BlogCategory, BlogPost, FeedbackCounts, FeedbackMessage, GalleryItem, PostTag, SiteSetting, Tag,
+)
+
+POST_COUNT = 3000
+GALLERY_COUNT = 1500
+FEEDBACK_COUNT = 1000
+
+# (queries, render-time budget in ms) per URL name and variant. Logged-in
+# requests include the session and user lookups. Lower these when a view gets
+# cheaper; raising one needs a reason in the commit message.
+BUDGETS = {
+    "home": (2, 250),
+    "blog_list:miss": (3, 250),
+    "blog_list": (2, 250),
+    "blog_list:htmx": (2, 250),
+    "blog_list:category": (2, 250),
+    "blog_detail": (2, 250),
+    "blog_tag": (2, 250),
+    "blog_tag:htmx": (2, 250),
+    "blog_feed:miss": (1, 250),
+    "blog_feed": (0, 250),
+    "blog_feed_atom": (0, 250),
+    "blog_category_feed:miss": (2, 250),
+    "blog_category_feed": (0, 250),
+    "blog_category_feed_atom": (0, 250),
+    "gallery": (1, 800),
+    "gallery:htmx": (1, 800),
+    "gallery:category": (1, 800),
+    "about": (0, 250),
+    "sitemap:miss": (4, 1000),
+    "sitemap": (0, 250),
+    "sitemap_section:miss": (1, 1000),
+    "sitemap_section": (0, 250),
+    "feedback": (1, 250),
+    # The insert and its FeedbackCounts update share a transaction.
+    "feedback:post": (5, 250),
+    # Paginated and column-limited; the page count costs one COUNT.
+    "admin_blog": (5, 250),
+    "admin_blog:htmx": (4, 250),
+    "admin_blog_create": (3, 250),
+    "admin_blog_edit": (4, 250),
+    "admin_blog_delete": (6, 250),
+    # The insert runs in a savepoint so a slug taken concurrently can be retried.
+    "admin_blog_category_create": (7, 250),
+    "admin_blog_category_delete": (5, 250),
+    "admin_gallery": (4, 250),
+    "admin_gallery:htmx": (4, 250),
+    "admin_gallery_create": (2, 250),
+    "admin_gallery_edit": (3, 250),
+    "admin_gallery_delete": (4, 250),
+    "admin_gallery_reorder": (5, 250),
+    # Keyset pages: the cost no longer grows with the inbox.
+    "admin_feedback": (5, 250),
+    "admin_feedback:htmx": (3, 250),
+    "admin_feedback:older": (3, 250),
+    "admin_feedback:search": (3, 500),
+    # The update and its FeedbackCounts move share a transaction.
+    "admin_feedback_toggle": (7, 250),
+    # One UPDATE for the batch, then one for the counts.
+    "admin_feedback_bulk": (6, 250),
+    # One DELETE per status so the counts stay exact.
+    "admin_feedback_bulk:delete": (9, 250),
+    # As toggle; retraining happens later, off the request.
+    "admin_feedback_spam": (7, 1000),
+    "admin_feedback_welcome": (4, 250),
+    "admin_metrics": (4, 250),
+    "tinymce_upload": (2, 250),
+    "upload_start": (2, 250),
+    # Token-authenticated, like the presigned URL it stands in for.
+    "upload_receive": (0, 250),
+    "upload_complete": (2, 250),
+    "chunked_upload_start": (2, 250),
+    "chunked_upload": (2, 250),
+    "chunked_upload:complete": (2, 250),
+}
+
+
+class QueryBudgetTest(TestCase):
+    """Pin query counts and render time for every view against a large dataset."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="treefel", password="testpass123")
+        cls.categories = [
+            BlogCategory.objects.create(name=name)
+            for name in ("Dev Log", "Personal", "Interesting Finds")
+        ]
+        # bulk_create skips save(), so slugs are set up front.
+        BlogPost.objects.bulk_create(
+            BlogPost(
+                title=f"Post {i}",
+                slug=f"post-{i}",
+                body=f"<p>{'Lorem ipsum dolor sit amet. ' * 40}</p>",
+                category=cls.categories[i % 3],
+                tags="django,art,devlog",
+                published=i % 10 != 0,
+            )
+            for i in range(POST_COUNT)
+        )
+        for category in cls.categories:
+            category.published_post_count = category.posts.filter(published=True).count()
+            category.save(update_fields=["published_post_count"])
+        tags = [Tag.objects.create(name=name, slug=name) for name in ("django", "art", "devlog")]
+        PostTag.objects.bulk_create(
+            PostTag(post=post, tag=tag) for post in BlogPost.objects.all() for tag in tags
+        )
+        Tag.objects.update(post_count=BlogPost.objects.filter(published=True).count())
+        GalleryItem.objects.bulk_create(
+            GalleryItem(
+                title=f"Art {i}",
+                description="A piece",
+                category="2D" if i % 2 else "3D",
+                media_type="image",
+                image=f"https://r2.example.com/gallery/{i}.jpg",
+                sort_order=i,
+            )
+            for i in range(GALLERY_COUNT)
+        )
+        FeedbackMessage.objects.bulk_create(
+            FeedbackMessage(subject=f"Hello {i}", body="Nice site!", is_completed=i % 2 == 0)
+            for i in range(FEEDBACK_COUNT)
+        )
+        FeedbackCounts.rebuild()
+        SiteSetting.objects.create(key="feedback_welcome", value="Drop a message!")
+        cls.post = BlogPost.objects.filter(published=True).first()
+        cls.items = list(GalleryItem.objects.all()[:3])
+        cls.message = FeedbackMessage.objects.first()
+
+    def setUp(self):
+        cache.clear()
+
+    def assertWithinBudget(self, key, request, *args, **kwargs):
+        queries, budget_ms = BUDGETS[key]
+        with self.assertNumQueries(queries):
+            start = time.perf_counter()
+            response = request(*args, **kwargs)
+            if response.streaming:
+                # Streamed bodies do their queries as they're consumed.
+                response.getvalue()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        self.assertLess(response.status_code, 400)
+        self.assertLess(elapsed_ms, budget_ms, f"{key} took {elapsed_ms:.0f}ms")
+        return response
+
+    def test_every_url_has_a_budget(self):
+        names = {pattern.name for pattern in core_urls.urlpatterns}
+        budgeted = {key.split(":")[0] for key in BUDGETS}
+        self.assertEqual(names - budgeted, set())
+
+    def test_public_views(self):
+        get = self.client.get
+        self.assertWithinBudget("home", get, reverse("core:home"))
+        self.assertWithinBudget("blog_list:miss", get, reverse("core:blog_list"))
+        self.assertWithinBudget("blog_list", get, reverse("core:blog_list"))
+        self.assertWithinBudget(
+            "blog_list:htmx", get, reverse("core:blog_list") + "?page=5", HTTP_HX_REQUEST="true"
+        )
+        self.assertWithinBudget(
+            "blog_list:category", get,
+            reverse("core:blog_list") + f"?category={self.categories[0].slug}",
+        )
+        self.assertWithinBudget(
+            "blog_detail", get, reverse("core:blog_detail", kwargs={"slug": self.post.slug})
+        )
+        self.assertWithinBudget("blog_tag", get, reverse("core:blog_tag", kwargs={"slug": "art"}))
+        self.assertWithinBudget(
+            "blog_tag:htmx", get, reverse("core:blog_tag", kwargs={"slug": "art"}) + "?page=3",
+            HTTP_HX_REQUEST="true",
+        )
+        self.assertWithinBudget("blog_feed:miss", get, reverse("core:blog_feed"))
+        self.assertWithinBudget("blog_feed", get, reverse("core:blog_feed"))
+        get(reverse("core:blog_feed_atom"))
+        self.assertWithinBudget("blog_feed_atom", get, reverse("core:blog_feed_atom"))
+        category = {"slug": self.categories[0].slug}
+        self.assertWithinBudget(
+            "blog_category_feed:miss", get, reverse("core:blog_category_feed", kwargs=category)
+        )
+        self.assertWithinBudget(
+            "blog_category_feed", get, reverse("core:blog_category_feed", kwargs=category)
+        )
+        get(reverse("core:blog_category_feed_atom", kwargs=category))
+        self.assertWithinBudget(
+            "blog_category_feed_atom", get, reverse("core:blog_category_feed_atom", kwargs=category)
+        )
+        self.assertWithinBudget("gallery", get, reverse("core:gallery"))
+        self.assertWithinBudget("gallery:htmx", get, reverse("core:gallery"), HTTP_HX_REQUEST="true")
+        self.assertWithinBudget("gallery:category", get, reverse("core:gallery") + "?category=2D")
+        self.assertWithinBudget("about", get, reverse("core:about"))
+        self.assertWithinBudget("sitemap:miss", get, reverse("core:sitemap"))
+        self.assertWithinBudget("sitemap", get, reverse("core:sitemap"))
+        posts_sitemap = reverse("core:sitemap_section", kwargs={"section": "posts", "page": 1})
+        self.assertWithinBudget("sitemap_section:miss", get, posts_sitemap)
+        self.assertWithinBudget("sitemap_section", get, posts_sitemap)
+        self.assertWithinBudget("feedback", get, reverse("core:feedback"))
+        self.assertWithinBudget(
+            "feedback:post", self.client.post, reverse("core:feedback"),
+            {"subject": "Hi", "body": "Great work", "honeypot": ""},
+        )
+
+    def test_admin_list_views(self):
+        self.client.force_login(self.user)
+        get = self.client.get
+        self.assertWithinBudget("admin_blog", get, reverse("core:admin_blog"))
+        self.assertWithinBudget(
+            "admin_blog:htmx", get, reverse("core:admin_blog") + "?page=40", HTTP_HX_REQUEST="true"
+        )
+        self.assertWithinBudget("admin_blog_create", get, reverse("core:admin_blog_create"))
+        self.assertWithinBudget(
+            "admin_blog_edit", get, reverse("core:admin_blog_edit", kwargs={"pk": self.post.pk})
+        )
+        self.assertWithinBudget("admin_gallery", get, reverse("core:admin_gallery"))
+        self.assertWithinBudget(
+            "admin_gallery:htmx", get, reverse("core:admin_gallery") + "?page=20", HTTP_HX_REQUEST="true"
+        )
+        self.assertWithinBudget("admin_gallery_create", get, reverse("core:admin_gallery_create"))
+        self.assertWithinBudget(
+            "admin_gallery_edit", get,
+            reverse("core:admin_gallery_edit", kwargs={"pk": self.items[0].pk}),
+        )
+        self.assertWithinBudget("admin_feedback", get, reverse("core:admin_feedback"))
+        self.assertWithinBudget(
+            "admin_feedback:htmx", get, reverse("core:admin_feedback") + "?filter=new",
+            HTTP_HX_REQUEST="true",
+        )
+        self.assertWithinBudget(
+            "admin_feedback:older", get,
+            reverse("core:admin_feedback") + f"?before={self.message.pk}", HTTP_HX_REQUEST="true",
+        )
+        self.assertWithinBudget(
+            "admin_feedback:search", get, reverse("core:admin_feedback") + "?q=Hello+99",
+            HTTP_HX_REQUEST="true",
+        )
+        self.assertWithinBudget("admin_metrics", get, reverse("core:admin_metrics"))
+
+    def test_admin_write_views(self):
+        self.client.force_login(self.user)
+        post = self.client.post
+        self.assertWithinBudget(
+            "admin_blog_category_create", post,
+            reverse("core:admin_blog_category_create"), {"name": "New Category"},
+        )
+        self.assertWithinBudget(
+            "admin_blog_category_delete", post,
+            reverse("core:admin_blog_category_delete", kwargs={"pk": self.categories[2].pk}),
+        )
+        self.assertWithinBudget(
+            "admin_blog_delete", post,
+            reverse("core:admin_blog_delete", kwargs={"pk": self.post.pk}),
+        )
+        self.assertWithinBudget(
+            "admin_gallery_delete", post,
+            reverse("core:admin_gallery_delete", kwargs={"pk": self.items[0].pk}),
+        )
+        self.assertWithinBudget(
+            "admin_gallery_reorder", post, reverse("core:admin_gallery_reorder"),
+            data=json.dumps({"order": [item.pk for item in reversed(self.items)]}),
+            content_type="application/json",
+        )
+        self.assertWithinBudget(
+            "admin_feedback_toggle", post,
+            reverse("core:admin_feedback_toggle", kwargs={"pk": self.message.pk}),
+            HTTP_HX_REQUEST="true",
+        )
+        with patch("core.views.schedule_training"):
+            self.assertWithinBudget(
+                "admin_feedback_spam", post,
+                reverse("core:admin_feedback_spam", kwargs={"pk": self.message.pk}),
+                HTTP_HX_REQUEST="true",
+            )
+        ids = list(FeedbackMessage.objects.values_list("pk", flat=True)[:50])
+        self.assertWithinBudget(
+            "admin_feedback_bulk", post, reverse("core:admin_feedback_bulk"),
+            {"action": "complete", "ids": ids},
+        )
+        self.assertWithinBudget(
+            "admin_feedback_bulk:delete", post, reverse("core:admin_feedback_bulk"),
+            {"action": "delete", "ids": ids},
+        )
+        self.assertWithinBudget(
+            "admin_feedback_welcome", post, reverse("core:admin_feedback_welcome"),
+            {"welcome_message": "Hi there"},
+        )
+
+    @patch("core.views.upload_image", return_value="https://r2.example.com/blog/a.jpg")
+    def test_upload_view(self, mock_upload):
+        self.client.force_login(self.user)
+        self.assertWithinBudget(
+            "tinymce_upload", self.client.post, reverse("core:tinymce_upload"),
+            {"file": SimpleUploadedFile("a.png", b"png", content_type="image/png")},
+        )
+
+    @patch("core.views.finish_upload", return_value="https://r2.example.com/gallery/a.jpg")
+    @patch("core.views.receive_upload")
+    def test_direct_upload_views(self, mock_receive, mock_finish):
+        self.client.force_login(self.user)
+        response = self.assertWithinBudget(
+            "upload_start", self.client.post, reverse("core:upload_start"),
+            json.dumps({"folder": "gallery", "content_type": "image/png", "size": 3}),
+            content_type="application/json",
+        )
+        upload = response.json()
+        self.assertWithinBudget(
+            "upload_receive", self.client.generic, "PUT", upload["url"], b"png",
+        )
+        self.assertWithinBudget(
+            "upload_complete", self.client.post, reverse("core:upload_complete"),
+            json.dumps({"token": upload["token"]}), content_type="application/json",
+        )
+
+    @patch("core.chunked_uploads.process_upload", return_value="https://r2.example.com/gallery/a.jpg")
+    def test_chunked_upload_views(self, mock_process):
+        self.client.force_login(self.user)
+        with tempfile.TemporaryDirectory() as chunk_dir, self.settings(UPLOAD_CHUNK_DIR=chunk_dir):
+            response = self.assertWithinBudget(
+                "chunked_upload_start", self.client.post, reverse("core:chunked_upload_start"),
+                json.dumps({"folder": "gallery", "content_type": "image/jpeg", "size": 6}),
+                content_type="application/json",
+            )
+            url = response.json()["url"]
+            self.assertWithinBudget(
+                "chunked_upload", self.client.generic, "PUT", url, b"abc", HTTP_UPLOAD_OFFSET="0",
+            )
+            self.assertWithinBudget(
+                "chunked_upload:complete", self.client.generic, "PUT", url, b"def",
+                HTTP_UPLOAD_OFFSET="3",
+            )
@@ -0,0 +1,65 @@
+import tempfile
+from multiprocessing import get_context
+from unittest.mock import patch
+from django.core.cache import cache, caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from core.models import FeedbackMessage
+from core.ratelimit import SlidingWindow
+
+
+def hammer(n):
+    # Runs in a forked process against the shared file cache.
+    cache = caches.create_connection("default")
+    for _ in range(n):
+        cache.add("counter", 0)
+        cache.incr("counter")
+
+
+class SlidingWindowTest(TestCase):
+    @patch("core.ratelimit.time.time", return_value=1000 * 60)
+    def test_allows_up_to_limit_per_window(self, mock_time):
+        limiter = SlidingWindow("test", 3, 60)
+        self.assertEqual([limiter.allow("a") for _ in range(4)], [True, True, True, False])
+        self.assertTrue(limiter.allow("b"))
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        limiter = SlidingWindow("weighted", 4, 60)
+        with patch("core.ratelimit.time.time", return_value=1000 * 60 + 59):
+            for _ in range(4):
+                limiter.allow("a")
+        # A quarter of the way into the next window, 3 of those 4 still count.
+        with patch("core.ratelimit.time.time", return_value=1001 * 60 + 15):
+            self.assertEqual([limiter.allow("a") for _ in range(2)], [True, False])
+
+    def test_from_rate(self):
+        limiter = SlidingWindow.from_rate("x", "5/m")
+        self.assertEqual((limiter.limit, limiter.window), (5, 60))
+
+
+class LockingFileBasedCacheTest(TestCase):
+    def test_incr_is_atomic_across_processes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            backend = {"BACKEND": "core.cache.LockingFileBasedCache", "LOCATION": tmpdir}
+            with override_settings(CACHES={"default": backend}):
+                context = get_context("fork")
+                workers = [context.Process(target=hammer, args=(50,)) for _ in range(4)]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                self.assertEqual(caches.create_connection("default").get("counter"), 200)
+
+
+class FeedbackRateLimitTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_sixth_post_in_a_minute_is_rejected_before_saving(self):
+        for n in range(5):
+            data = {"subject": "Hi", "body": f"Great work {n}", "honeypot": ""}
+            self.assertEqual(self.client.post(reverse("core:feedback"), data).status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse("core:feedback"), {"subject": "Hi", "body": "More", "honeypot": ""})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(FeedbackMessage.objects.count(), 5)
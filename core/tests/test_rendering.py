@@ -0,0 +1,128 @@
+import tempfile
+from io import BytesIO, StringIO
+from unittest.mock import patch
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+from core.models import BlogPost
+from core.rendering import render_body, sanitize_html
+
+
+def png_bytes(size):
+    buffer = BytesIO()
+    Image.new("RGB", size, color="blue").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class RenderBodyTest(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        storage = override_settings(STORAGES={
+            "default": {
+                "BACKEND": "django.core.files.storage.FileSystemStorage",
+                "OPTIONS": {"location": tmpdir.name, "base_url": "/media/"},
+            },
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+        })
+        storage.enable()
+        self.addCleanup(storage.disable)
+
+    def test_stored_image_gets_dimensions_and_srcset(self):
+        default_storage.save("blog/art.jpg", ContentFile(png_bytes((2000, 1000))))
+        html = render_body('<p><img src="/media/blog/art.jpg" alt="Art"></p>')
+        self.assertIn('loading="lazy"', html)
+        self.assertIn('width="2000" height="1000"', html)
+        self.assertIn("/media/blog/art-480w.jpg 480w", html)
+        self.assertIn("/media/blog/art.jpg 2000w", html)
+        self.assertIn('alt="Art"', html)
+        with default_storage.open("blog/art-768w.jpg") as f:
+            self.assertEqual(Image.open(f).size, (768, 384))
+
+    def test_small_image_has_no_srcset(self):
+        default_storage.save("blog/small.jpg", ContentFile(png_bytes((300, 200))))
+        html = render_body('<img src="/media/blog/small.jpg">')
+        self.assertNotIn("srcset", html)
+        self.assertIn('width="300" height="200"', html)
+
+    @patch("core.rendering.urlopen")
+    def test_hotlinked_image_is_copied_once(self, mock_urlopen):
+        mock_urlopen.return_value.__enter__.return_value.read.return_value = png_bytes((1000, 500))
+        body = '<img src="https://example.com/big.png">'
+        first = render_body(body, fetch_remote=True)
+        second = render_body(body, fetch_remote=True)
+        self.assertEqual(mock_urlopen.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertIn('src="/media/blog/remote/', first)
+        self.assertIn('width="1000" height="500"', first)
+        # Once copied, rendering without fetching uses the copy too.
+        self.assertEqual(render_body(body), first)
+
+    @patch("core.rendering.urlopen", side_effect=OSError("offline"))
+    def test_unreachable_image_is_only_made_lazy(self, mock_urlopen):
+        with self.assertLogs("core.rendering", "WARNING"):
+            html = render_body('<img src="https://example.com/gone.png" alt="x">', fetch_remote=True)
+        self.assertEqual(html, '<img src="https://example.com/gone.png" alt="x" loading="lazy" decoding="async">')
+
+    def test_angle_bracket_inside_attribute(self):
+        default_storage.save("blog/small.jpg", ContentFile(png_bytes((300, 200))))
+        html = render_body('<p><img alt="a > b" src="/media/blog/small.jpg"> after</p>')
+        self.assertEqual(
+            html,
+            '<p><img alt="a &gt; b" src="/media/blog/small.jpg" loading="lazy" '
+            'decoding="async" width="300" height="200"> after</p>',
+        )
+
+    @patch("core.rendering.urlopen")
+    def test_saving_a_post_never_fetches(self, mock_urlopen):
+        mock_urlopen.return_value.__enter__.return_value.read.return_value = png_bytes((1000, 500))
+        post = BlogPost.objects.create(title="Post", body='<img src="https://example.com/big.png">')
+        mock_urlopen.assert_not_called()
+        self.assertIn('src="https://example.com/big.png"', post.body_rendered)
+
+        call_command("render_post_bodies", fetch_remote=True, stdout=StringIO())
+        mock_urlopen.assert_called_once()
+        post.refresh_from_db()
+        self.assertIn('src="/media/blog/remote/', post.body_rendered)
+
+    def test_post_save_renders_only_when_body_changes(self):
+        post = BlogPost.objects.create(title="Post", body='<p>Hi</p><img src="/static/a.png">')
+        self.assertIn('loading="lazy"', post.body_rendered)
+        post = BlogPost.objects.get(pk=post.pk)
+        with patch("core.models.render_body", return_value="<p>Changed</p>") as mock_render:
+            post.title = "Renamed"
+            post.save()
+            mock_render.assert_not_called()
+            post.body = "<p>Changed</p>"
+            post.save()
+            mock_render.assert_called_once_with("<p>Changed</p>")
+
+
+class SanitizeHtmlTest(TestCase):
+    def test_strips_scripts_and_event_handlers(self):
+        html = sanitize_html('<p onclick="x()">Hi<script>alert(1)</script></p><img src="/a.png" onerror="x()">')
+        self.assertEqual(html, '<p>Hi</p><img src="/a.png">')
+
+    def test_drops_javascript_urls(self):
+        for href in ("javascript:alert(1)", "JaVaScRiPt:alert(1)", "java\tscript:alert(1)", "&#106;avascript:1"):
+            self.assertEqual(sanitize_html(f'<a href="{href}">x</a>'), "<a>x</a>")
+        self.assertEqual(
+            sanitize_html('<a href="https://example.com" target="_blank">x</a>'),
+            '<a href="https://example.com" target="_blank" rel="noopener noreferrer">x</a>',
+        )
+
+    def test_unknown_tags_keep_text_and_output_is_balanced(self):
+        self.assertEqual(sanitize_html("<marquee>hey</marquee>"), "hey")
+        self.assertEqual(sanitize_html("<p><strong>open"), "<p><strong>open</strong></p>")
+        self.assertEqual(sanitize_html("<p>a &lt;b&gt; &amp; c</p>"), "<p>a &lt;b&gt; &amp; c</p>")
+
+
+class RenderPostBodiesCommandTest(TestCase):
+    def test_backfills_missing_rendered_bodies(self):
+        BlogPost.objects.bulk_create([
+            BlogPost(title="Old", slug="old", body="<p>Old<script>x</script></p>"),
+        ])
+        call_command("render_post_bodies", stdout=StringIO())
+        self.assertEqual(BlogPost.objects.get(slug="old").body_rendered, "<p>Old</p>")
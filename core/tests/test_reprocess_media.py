@@ -0,0 +1,89 @@
+import json
+import tempfile
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest.mock import patch
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+from core.models import BlogPost, GalleryItem
+from core.storage import storage_path_from_url, upload_image
+
+
+class ReprocessMediaTest(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmp = Path(tmpdir.name)
+        storage = override_settings(STORAGES={
+            "default": {
+                "BACKEND": "django.core.files.storage.FileSystemStorage",
+                "OPTIONS": {"location": str(self.tmp / "media"), "base_url": "/media/"},
+            },
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+        })
+        storage.enable()
+        self.addCleanup(storage.disable)
+        self.checkpoint = str(self.tmp / "checkpoint.json")
+
+    def _upload(self, size=(1200, 800)):
+        buffer = BytesIO()
+        Image.new("RGB", size, color="green").save(buffer, format="PNG")
+        buffer.seek(0)
+        return upload_image(buffer, folder="gallery")
+
+    def _run(self, **options):
+        call_command(
+            "reprocess_media", workers=1, checkpoint=self.checkpoint,
+            stdout=StringIO(), **options
+        )
+
+    def test_reprocesses_stored_images_and_skips_external(self):
+        item = GalleryItem.objects.create(title="Art", image=self._upload())
+        external = GalleryItem.objects.create(title="Elsewhere", image="https://example.com/a.jpg")
+        post = BlogPost.objects.create(title="Post", body="<p>Hi</p>", header_image=self._upload())
+        post_updated_at = post.updated_at
+
+        self._run(max_dimension=600, delete_old=True)
+
+        item.refresh_from_db()
+        external.refresh_from_db()
+        post.refresh_from_db()
+        with default_storage.open(storage_path_from_url(item.image)) as f:
+            self.assertEqual(Image.open(f).size, (600, 400))
+        self.assertTrue(post.header_image.startswith("/media/blog/"))
+        self.assertEqual(post.updated_at, post_updated_at)
+        self.assertEqual(external.image, "https://example.com/a.jpg")
+        self.assertEqual(len(list((self.tmp / "media" / "gallery").iterdir())), 1)
+        self.assertFalse(Path(self.checkpoint).exists())
+
+    def test_resumes_from_checkpoint(self):
+        done = GalleryItem.objects.create(title="Done", image=self._upload())
+        todo = GalleryItem.objects.create(title="Todo", image=self._upload())
+        done_url, todo_url = done.image, todo.image
+        Path(self.checkpoint).write_text(json.dumps({
+            "params": {"max_dimension": 1920, "quality": 85},
+            "done": {"core.galleryitem": [done.pk]},
+        }))
+
+        self._run()
+
+        done.refresh_from_db()
+        todo.refresh_from_db()
+        self.assertEqual(done.image, done_url)
+        self.assertNotEqual(todo.image, todo_url)
+
+    def test_nothing_to_do(self):
+        self._run()
+        self.assertFalse(Path(self.checkpoint).exists())
+
+    def test_invalidates_feeds_and_sitemaps(self):
+        BlogPost.objects.create(
+            title="Post", body="<p>Hi</p>", header_image=self._upload(), published=True
+        )
+        with patch("core.management.commands.reprocess_media.invalidate_feeds") as feeds, \
+                patch("core.management.commands.reprocess_media.invalidate_sitemaps") as sitemaps:
+            self._run()
+        feeds.assert_called()
+        sitemaps.assert_called()
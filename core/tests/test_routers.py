@@ -0,0 +1,127 @@
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.middleware import ReplicaRoutingMiddleware
+from core.models import BlogPost
+from core.routers import PrimaryReplicaRouter, replica_reads
+
+
+class PrimaryReplicaRouterTest(TestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_use_primary_outside_requests(self):
+        self.assertEqual(self.router.db_for_read(BlogPost), "default")
+
+    def test_reads_use_replica_when_enabled(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(BlogPost), "replica")
+
+    def test_writes_always_use_primary(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_write(BlogPost), "default")
+
+
+class ReplicaRoutingMiddlewareTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+        self.routed_to = None
+
+    def _view(self, request):
+        self.routed_to = self.router.db_for_read(BlogPost)
+        return HttpResponse()
+
+    def _call(self, request, user=None):
+        request.user = user or AnonymousUser()
+        return ReplicaRoutingMiddleware(self._view)(request)
+
+    def test_anonymous_get_reads_from_replica(self):
+        self._call(self.factory.get("/blog/"))
+        self.assertEqual(self.routed_to, "replica")
+
+    def test_authenticated_get_reads_from_primary(self):
+        user = User.objects.create_user(username="treefel", password="testpass123")
+        self._call(self.factory.get("/blog/"), user=user)
+        self.assertEqual(self.routed_to, "default")
+
+    def test_post_reads_from_primary_and_sets_sticky_cookie(self):
+        response = self._call(self.factory.post("/feedback/"))
+        self.assertEqual(self.routed_to, "default")
+        self.assertIn(ReplicaRoutingMiddleware.cookie_name, response.cookies)
+
+    def test_sticky_cookie_keeps_reads_on_primary(self):
+        request = self.factory.get("/blog/")
+        request.COOKIES[ReplicaRoutingMiddleware.cookie_name] = "1"
+        self._call(request)
+        self.assertEqual(self.routed_to, "default")
+
+    def test_context_reset_after_request(self):
+        self._call(self.factory.get("/blog/"))
+        self.assertEqual(self.router.db_for_read(BlogPost), "default")
+
+
+@override_settings(DATABASE_ROUTERS=["core.routers.PrimaryReplicaRouter"])
+class ReplicaDatabaseTest(TestCase):
+    """Whole requests against a real replica alias (a mirror of the test database)."""
+
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()  # Rate-limit counters are per client IP.
+        # Under SQLite the mirror is a second connection to the same in-memory
+        # database; let it see this test's uncommitted rows instead of locking.
+        replica = connections["replica"]
+        if replica.vendor == "sqlite":
+            with replica.cursor() as cursor:
+                cursor.execute("PRAGMA read_uncommitted = 1")
+
+    def _queries(self, method, url, **kwargs):
+        with CaptureQueriesContext(connections["default"]) as primary, \
+                CaptureQueriesContext(connections["replica"]) as replica:
+            method(url, **kwargs)
+        return primary.captured_queries, replica.captured_queries
+
+    def test_anonymous_get_reads_from_replica(self):
+        # The first request caches the category nav, which is read from the primary.
+        primary, replica = self._queries(self.client.get, reverse("core:blog_list"))
+        self.assertTrue(primary)
+        primary, replica = self._queries(self.client.get, reverse("core:blog_list"))
+        self.assertTrue(replica)
+        self.assertEqual(primary, [])
+
+    def test_authenticated_get_reads_from_primary(self):
+        user = User.objects.create_user(username="treefel", password="testpass123")
+        self.client.force_login(user)
+        primary, replica = self._queries(self.client.get, reverse("core:blog_list"))
+        self.assertTrue(primary)
+        self.assertEqual(replica, [])
+
+    def test_cached_feed_is_built_from_primary(self):
+        primary, replica = self._queries(self.client.get, reverse("core:blog_feed"))
+        self.assertTrue(primary)
+        self.assertEqual(replica, [])
+
+    def test_cached_sitemap_is_built_from_primary(self):
+        def read_streaming(url):
+            # The sitemap's queries run as its body is read; a server may do
+            # that while the request still allows replica reads.
+            response = self.client.get(url)
+            with replica_reads():
+                b"".join(response.streaming_content)
+
+        primary, replica = self._queries(read_streaming, reverse("core:sitemap"))
+        self.assertTrue(primary)
+        self.assertEqual(replica, [])
+
+    def test_writes_use_primary(self):
+        primary, replica = self._queries(
+            self.client.post, reverse("core:feedback"),
+            data={"subject": "Hello", "body": "Lovely gallery, thanks for sharing it."},
+        )
+        self.assertEqual(replica, [])
+        self.assertTrue(any(q["sql"].startswith("INSERT") for q in primary))
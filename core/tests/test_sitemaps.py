@@ -0,0 +1,67 @@
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from core.models import BlogPost, GalleryItem
+
+
+class SitemapTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.posts = [
+            BlogPost.objects.create(title=f"Post {i}", body="<p>x</p>", published=True)
+            for i in range(3)
+        ]
+        self.draft = BlogPost.objects.create(title="Draft", body="<p>x</p>", published=False)
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response["Content-Type"], "application/xml")
+        body = response.getvalue() if response.streaming else response.content
+        return body.decode()
+
+    def test_lists_pages_and_published_posts(self):
+        xml = self.get(reverse("core:sitemap"))
+        self.assertIn("<urlset", xml)
+        self.assertIn("http://testserver/gallery/", xml)
+        for post in self.posts:
+            self.assertIn(f"http://testserver/blog/{post.slug}/", xml)
+            self.assertIn(f"<lastmod>{post.updated_at.date().isoformat()}</lastmod>", xml)
+        self.assertNotIn(self.draft.slug, xml)
+
+    @patch("core.sitemaps.SITEMAP_LIMIT", 2)
+    def test_splits_into_an_index_above_the_limit(self):
+        xml = self.get(reverse("core:sitemap"))
+        self.assertIn("<sitemapindex", xml)
+        self.assertIn("http://testserver/sitemap-pages-1.xml", xml)
+        self.assertIn("http://testserver/sitemap-posts-2.xml", xml)
+        self.assertNotIn("sitemap-posts-3.xml", xml)
+
+        second = self.get(reverse("core:sitemap_section", kwargs={"section": "posts", "page": 2}))
+        self.assertIn(self.posts[2].slug, second)
+        self.assertNotIn(self.posts[0].slug, second)
+        self.assertEqual(
+            self.client.get(reverse("core:sitemap_section", kwargs={"section": "nope", "page": 1})).status_code,
+            404,
+        )
+
+    def test_cached_until_content_changes(self):
+        self.get(reverse("core:sitemap"))
+        with self.assertNumQueries(0):
+            self.get(reverse("core:sitemap"))
+
+        self.draft.title = "Still a draft"
+        self.draft.save()
+        with self.assertNumQueries(0):
+            self.get(reverse("core:sitemap"))
+
+        self.draft.published = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.save()
+        self.assertIn(self.draft.slug, self.get(reverse("core:sitemap")))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            GalleryItem.objects.create(title="Art", category="2D", media_type="image")
+        with self.assertNumQueries(4):
+            self.get(reverse("core:sitemap"))
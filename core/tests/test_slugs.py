@@ -0,0 +1,78 @@
+from unittest.mock import patch
+from django.test import TestCase
+from core import slugs
+from core.models import BlogCategory, BlogPost
+from core.slugs import assign_slugs, unique_slugs
+
+
+class UniqueSlugsTest(TestCase):
+    def test_repeated_titles_get_increasing_suffixes(self):
+        posts = [BlogPost.objects.create(title="Dev Log", body="b") for _ in range(3)]
+        self.assertEqual([post.slug for post in posts], ["dev-log", "dev-log-1", "dev-log-2"])
+
+    def test_one_lookup_however_many_collisions(self):
+        for _ in range(10):
+            BlogPost.objects.create(title="Dev Log", body="b")
+        with self.assertNumQueries(1):
+            slug = unique_slugs(BlogPost.objects.all(), ["Dev Log"], 200)[0]
+        self.assertEqual(slug, "dev-log-10")
+
+    def test_continues_past_the_highest_suffix(self):
+        BlogPost.objects.create(title="Dev Log", body="b", slug="dev-log")
+        BlogPost.objects.create(title="Dev Log", body="b", slug="dev-log-7")
+        self.assertEqual(BlogPost.objects.create(title="Dev Log", body="b").slug, "dev-log-8")
+
+    def test_similar_prefixes_do_not_collide(self):
+        BlogPost.objects.create(title="Dev Log Extra", body="b")
+        self.assertEqual(BlogPost.objects.create(title="Dev Log", body="b").slug, "dev-log")
+
+    def test_long_titles_make_room_for_the_suffix(self):
+        first = BlogPost.objects.create(title="x" * 200, body="b")
+        second = BlogPost.objects.create(title="x" * 200, body="b")
+        self.assertEqual(len(first.slug), 200)
+        self.assertEqual(second.slug, "x" * 198 + "-1")
+
+    def test_unsluggable_title(self):
+        self.assertEqual(BlogPost.objects.create(title="!!!", body="b").slug, "untitled")
+
+    def test_reserved_slugs_are_skipped(self):
+        post = BlogPost(title="Feed", body="b")
+        assign_slugs([post], "title")
+        self.assertEqual(post.slug, "feed-1")
+        self.assertEqual(BlogPost.objects.create(title="Feed", body="b").slug, "feed-1")
+
+    def test_explicit_slug_is_kept(self):
+        post = BlogPost.objects.create(title="Dev Log", body="b", slug="custom")
+        self.assertEqual(post.slug, "custom")
+
+    def test_categories(self):
+        BlogCategory.objects.create(name="Art", slug="art-and-more")
+        self.assertEqual(BlogCategory.objects.create(name="Art & More").slug, "art-more")
+        self.assertEqual(BlogCategory.objects.create(name="Art-and-more").slug, "art-and-more-1")
+
+
+class SlugRaceTest(TestCase):
+    def test_retries_when_the_slug_is_taken_concurrently(self):
+        BlogPost.objects.create(title="Dev Log", body="b")
+        real = slugs.unique_slugs
+        # The first allocation misses the existing row, as if it was just inserted.
+        answers = iter([["dev-log"]])
+        with patch.object(
+            slugs, "unique_slugs", side_effect=lambda *args, **kwargs: next(answers, None) or real(*args, **kwargs)
+        ):
+            post = BlogPost.objects.create(title="Dev Log", body="b")
+        self.assertEqual(post.slug, "dev-log-1")
+        self.assertEqual(BlogPost.objects.count(), 2)
+
+
+class AssignSlugsTest(TestCase):
+    def test_bulk_allocation_in_one_query(self):
+        BlogPost.objects.create(title="Dev Log", body="b")
+        posts = [BlogPost(title=title, body="b") for title in ["Dev Log", "Dev Log", "Sketches"]]
+        posts.append(BlogPost(title="Dev Log", body="b", slug="kept"))
+        with self.assertNumQueries(1):
+            assign_slugs(posts, "title")
+        self.assertEqual(
+            [post.slug for post in posts], ["dev-log-1", "dev-log-2", "sketches", "kept"]
+        )
+        BlogPost.objects.bulk_create(posts)
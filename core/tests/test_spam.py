@@ -0,0 +1,169 @@
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from core import spam
+from core.models import FeedbackMessage
+
+
+class SpamTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reset_model()
+        self.addCleanup(self.reset_model)
+
+    @staticmethod
+    def reset_model():
+        spam._model = None
+        spam._model_loaded_at = 0.0
+        spam._retrain_timer = None
+
+
+class HeuristicTest(SpamTestCase):
+    def test_plain_message_passes(self):
+        self.assertIsNone(spam.spam_reason("Hello", "Love the art style!"))
+
+    def test_too_many_links(self):
+        body = " ".join(f"https://example.com/{n}" for n in range(spam.MAX_LINKS + 1))
+        self.assertEqual(spam.spam_reason("Deals", body), "links")
+
+    def test_link_flood(self):
+        body = " ".join(f"https://example.com/{n}" for n in range(spam.LINK_FLOOD + 1))
+        self.assertEqual(spam.spam_reason("Deals", body), "link-flood")
+
+    def test_a_few_links_are_fine(self):
+        self.assertIsNone(spam.spam_reason("Bug", "See https://example.com/a and https://example.com/b"))
+
+    def test_shouting_subject(self):
+        self.assertEqual(spam.spam_reason("BUY CHEAP FOLLOWERS", "now"), "shouting")
+
+    def test_duplicate_ignores_case_and_whitespace(self):
+        self.assertIsNone(spam.spam_reason("Hello", "Nice  site"))
+        self.assertEqual(spam.spam_reason("hello", "nice site\n"), "duplicate")
+
+
+class NaiveBayesTest(SpamTestCase):
+    def make_messages(self):
+        for n in range(spam.MIN_TRAINING_DOCS):
+            FeedbackMessage.objects.create(
+                subject="Casino bonus", body=f"Free casino crypto bonus offer {n}",
+                is_spam=True, marked_spam_by_admin=True,
+            )
+            FeedbackMessage.objects.create(
+                subject="Gallery", body=f"The new sketches look great, number {n}",
+            )
+
+    def test_untrained_model_is_not_ready(self):
+        model = spam.NaiveBayes.train(["casino"], ["sketches"])
+        self.assertFalse(model.ready)
+
+    def test_scores_by_training_data(self):
+        self.make_messages()
+        model = spam.train_model()
+        self.assertTrue(model.ready)
+        self.assertGreater(model.spam_probability(spam.tokenize("casino crypto bonus")), 0.95)
+        self.assertLess(model.spam_probability(spam.tokenize("great sketches")), 0.05)
+
+    def test_quarantined_messages_are_not_training_examples(self):
+        self.make_messages()
+        FeedbackMessage.objects.create(subject="Hello", body="Nice site", is_spam=True)
+        model = spam.train_model()
+        self.assertEqual((model.spam_docs, model.ham_docs), (spam.MIN_TRAINING_DOCS,) * 2)
+
+    def test_trained_model_flags_submissions(self):
+        self.make_messages()
+        spam.train_model()
+        self.assertEqual(spam.spam_reason("Hi", "Claim your casino crypto bonus"), "bayes")
+        self.assertIsNone(spam.spam_reason("Hi", "The sketches are great"))
+
+    def test_model_round_trips_through_cache(self):
+        self.make_messages()
+        trained = spam.train_model()
+        loaded = spam.current_model()
+        self.assertEqual(loaded.to_dict(), trained.to_dict())
+
+
+class FeedbackSpamViewTest(SpamTestCase):
+    def test_heuristic_hit_is_quarantined(self):
+        body = " ".join(f"https://example.com/{n}" for n in range(5))
+        response = self.client.post(
+            reverse("core:feedback"),
+            {"subject": "Deals", "body": body, "honeypot": ""},
+            HTTP_HX_REQUEST="true",
+        )
+        self.assertContains(response, "Thank you")
+        self.assertTrue(FeedbackMessage.objects.get().is_spam)
+
+    def test_obvious_spam_never_reaches_the_database(self):
+        body = " ".join(f"https://example.com/{n}" for n in range(spam.LINK_FLOOD + 1))
+        response = self.client.post(
+            reverse("core:feedback"), {"subject": "Deals", "body": body, "honeypot": ""}
+        )
+        self.assertContains(response, "Thank you")
+        self.assertEqual(FeedbackMessage.objects.count(), 0)
+
+    def test_resubmission_is_saved_once(self):
+        data = {"subject": "Hello", "body": "Nice site!", "honeypot": ""}
+        self.client.post(reverse("core:feedback"), data)
+        self.client.post(reverse("core:feedback"), data)
+        self.assertFalse(FeedbackMessage.objects.get().is_spam)
+
+    @patch("core.views.spam_reason", return_value="bayes-certain")
+    def test_certain_spam_is_dropped_but_looks_accepted(self, mock_reason):
+        response = self.client.post(
+            reverse("core:feedback"), {"subject": "Hi", "body": "Casino bonus", "honeypot": ""}
+        )
+        self.assertContains(response, "Thank you")
+        self.assertEqual(FeedbackMessage.objects.count(), 0)
+
+
+class AdminFeedbackSpamTest(SpamTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="admin", password="testpass123")
+        self.client.login(username="admin", password="testpass123")
+        self.msg = FeedbackMessage.objects.create(subject="Cheap pills", body="Buy now")
+
+    def test_marking_spam_moves_it_to_the_spam_tab(self):
+        self.client.post(reverse("core:admin_feedback_spam", kwargs={"pk": self.msg.pk}))
+        self.msg.refresh_from_db()
+        self.assertTrue(self.msg.is_spam and self.msg.marked_spam_by_admin)
+
+        response = self.client.get(reverse("core:admin_feedback"))
+        self.assertNotContains(response, "Cheap pills")
+        response = self.client.get(reverse("core:admin_feedback") + "?filter=spam")
+        self.assertContains(response, "Cheap pills")
+
+    @patch("core.spam.threading.Timer")
+    def test_a_burst_of_marks_schedules_one_retrain(self, mock_timer):
+        other = FeedbackMessage.objects.create(subject="Casino", body="Bonus")
+        self.client.post(reverse("core:admin_feedback_spam", kwargs={"pk": self.msg.pk}))
+        self.client.post(reverse("core:admin_feedback_spam", kwargs={"pk": other.pk}))
+        mock_timer.assert_called_once_with(spam.RETRAIN_DELAY, spam._train_scheduled)
+        mock_timer.return_value.start.assert_called_once()
+        self.assertIsNone(cache.get(spam.MODEL_CACHE_KEY))
+
+        spam._train_scheduled()
+        self.assertEqual(cache.get(spam.MODEL_CACHE_KEY)["spam_docs"], 2)
+        self.assertIsNone(spam._retrain_timer)
+
+    def test_unmarking_a_quarantined_message(self):
+        msg = FeedbackMessage.objects.create(subject="HELLO THERE FRIEND", body="Hi", is_spam=True)
+        self.client.post(reverse("core:admin_feedback_spam", kwargs={"pk": msg.pk}))
+        msg.refresh_from_db()
+        self.assertFalse(msg.is_spam or msg.marked_spam_by_admin)
+
+    def test_htmx_removes_the_row(self):
+        response = self.client.post(
+            reverse("core:admin_feedback_spam", kwargs={"pk": self.msg.pk}),
+            HTTP_HX_REQUEST="true",
+        )
+        self.assertEqual(response.content, b"")
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.post(reverse("core:admin_feedback_spam", kwargs={"pk": self.msg.pk}))
+        self.assertEqual(response.status_code, 302)
+        self.msg.refresh_from_db()
+        self.assertFalse(self.msg.is_spam)
@@ -30,3 +30,9 @@ class ImageOptimizationTest(TestCase):
         result = optimize_image(image)
         img = Image.open(result)
         self.assertEqual(img.format, "JPEG")
+
+    def test_optimize_accepts_resampling_filter(self):
+        large_image = self._create_test_image(3000, 1500)
+        result = optimize_image(large_image, max_dimension=1000, resample=Image.BILINEAR)
+        img = Image.open(result)
+        self.assertEqual(img.size, (1000, 500))
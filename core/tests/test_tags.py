@@ -0,0 +1,70 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from core.models import BlogPost, Tag, parse_tags
+
+
+class ParseTagsTest(TestCase):
+    def test_dedupes_by_slug_and_skips_blanks(self):
+        self.assertEqual(
+            parse_tags("Django, django , ,Web Dev"), {"django": "Django", "web-dev": "Web Dev"}
+        )
+
+
+class TagCountTest(TestCase):
+    def count(self, slug):
+        return Tag.objects.get(slug=slug).post_count
+
+    def test_counts_follow_publish_edit_and_delete(self):
+        post = BlogPost.objects.create(title="Post", body="x", tags="art, django")
+        self.assertEqual(self.count("art"), 0)
+        self.assertEqual(list(post.tag_set.order_by("slug").values_list("slug", flat=True)), ["art", "django"])
+
+        post.published = True
+        post.save()
+        self.assertEqual((self.count("art"), self.count("django")), (1, 1))
+
+        other = BlogPost.objects.create(title="Other", body="x", tags="art", published=True)
+        self.assertEqual(self.count("art"), 2)
+
+        post.tags = "django, blender"
+        post.save()
+        self.assertEqual((self.count("art"), self.count("django"), self.count("blender")), (1, 1, 1))
+
+        post.published = False
+        post.save()
+        self.assertEqual((self.count("django"), self.count("blender")), (0, 0))
+
+        BlogPost.objects.filter(pk=other.pk).delete()
+        self.assertEqual(self.count("art"), 0)
+
+    def test_reloaded_post_without_changes_skips_sync(self):
+        post = BlogPost.objects.create(title="Post", body="x", tags="art", published=True)
+        post = BlogPost.objects.get(pk=post.pk)
+        post.title = "Renamed"
+        with self.assertNumQueries(3):  # savepoint, update, release
+            post.save()
+        self.assertEqual(self.count("art"), 1)
+
+
+class BlogTagViewTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        BlogPost.objects.create(title="Tagged", body="x", tags="art", published=True)
+        BlogPost.objects.create(title="Draft", body="x", tags="art", published=False)
+        BlogPost.objects.create(title="Untagged", body="x", published=True)
+
+    def test_lists_published_posts_with_tag(self):
+        response = self.client.get(reverse("core:blog_tag", kwargs={"slug": "art"}))
+        self.assertContains(response, "Tagged")
+        self.assertContains(response, "1 post tagged art")
+        self.assertNotContains(response, "Draft")
+        self.assertNotContains(response, "Untagged")
+
+    def test_unknown_tag_returns_404(self):
+        response = self.client.get(reverse("core:blog_tag", kwargs={"slug": "nope"}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_blog_detail_links_tags(self):
+        post = BlogPost.objects.get(title="Tagged")
+        response = self.client.get(reverse("core:blog_detail", kwargs={"slug": post.slug}))
+        self.assertContains(response, reverse("core:blog_tag", kwargs={"slug": "art"}))
@@ -0,0 +1,140 @@
+import json
+import os
+import tempfile
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+from unittest.mock import patch
+from PIL import Image
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from storages.backends.s3 import S3Storage
+from core.uploads import UploadError, start_upload
+
+
+def png_bytes(size=(100, 100)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color="red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class DirectUploadTest(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        media = override_settings(MEDIA_ROOT=tmpdir.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.media_root = tmpdir.name
+        self.user = User.objects.create_user(username="treefel", password="testpass123")
+        self.client.force_login(self.user)
+
+    def post_json(self, name, data):
+        return self.client.post(reverse(name), json.dumps(data), content_type="application/json")
+
+    def start(self, **data):
+        data = {"folder": "gallery", "content_type": "image/png", "size": 1000, **data}
+        return self.post_json("core:upload_start", data)
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.start().status_code, 302)
+        self.assertEqual(self.post_json("core:upload_complete", {}).status_code, 302)
+
+    def test_round_trip_through_the_filesystem_fallback(self):
+        upload = self.start().json()
+        self.assertEqual(upload["method"], "PUT")
+        response = self.client.generic(
+            "PUT", upload["url"], png_bytes(), content_type="image/png"
+        )
+        self.assertEqual(response.status_code, 204)
+
+        response = self.post_json("core:upload_complete", {"token": upload["token"]})
+        self.assertEqual(response.status_code, 200)
+        url = response.json()["url"]
+        self.assertIn("gallery/", url)
+        self.assertTrue(url.endswith(".jpg"))
+        # Only the optimized copy is left.
+        self.assertEqual(os.listdir(os.path.join(self.media_root, "incoming", "gallery")), [])
+        self.assertEqual(len(os.listdir(os.path.join(self.media_root, "gallery"))), 1)
+
+    def test_rejects_bad_requests(self):
+        self.assertEqual(self.start(folder="../etc").status_code, 400)
+        self.assertEqual(self.start(content_type="text/html").status_code, 400)
+        self.assertEqual(self.start(size=10**12).status_code, 400)
+
+    def test_malformed_json(self):
+        for body in ("{not json", "[]"):
+            for name in ("core:upload_start", "core:upload_complete"):
+                response = self.client.post(reverse(name), body, content_type="application/json")
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["error"], "Malformed request.")
+
+    def test_tampered_token(self):
+        upload = self.start().json()
+        tampered = reverse("core:upload_receive", args=[upload["token"] + "x"])
+        response = self.client.generic("PUT", tampered, b"data")
+        self.assertEqual(response.status_code, 400)
+        response = self.post_json("core:upload_complete", {"token": upload["token"] + "x"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_each_url_takes_one_file(self):
+        upload = self.start().json()
+        self.client.generic("PUT", upload["url"], png_bytes())
+        self.assertEqual(self.client.generic("PUT", upload["url"], png_bytes()).status_code, 400)
+
+    def test_completion_before_the_file_arrives(self):
+        upload = self.start().json()
+        response = self.post_json("core:upload_complete", {"token": upload["token"]})
+        self.assertEqual(response.status_code, 400)
+
+    def test_non_image_is_rejected_and_removed(self):
+        upload = self.start().json()
+        self.client.generic("PUT", upload["url"], b"not an image")
+        response = self.post_json("core:upload_complete", {"token": upload["token"]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(os.listdir(os.path.join(self.media_root, "incoming", "gallery")), [])
+
+    @patch("core.uploads.MAX_DECODE_PIXELS", 100 * 100 - 1)
+    def test_huge_non_jpeg_is_not_decoded(self):
+        upload = self.start().json()
+        self.client.generic("PUT", upload["url"], png_bytes())
+        response = self.post_json("core:upload_complete", {"token": upload["token"]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("JPEG", response.json()["error"])
+
+    @patch("core.views.MAX_UPLOAD_SIZE", 10)
+    def test_oversized_body(self):
+        upload = self.start().json()
+        response = self.client.generic("PUT", upload["url"], png_bytes())
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, "incoming")))
+
+
+class PresignedUploadTest(TestCase):
+    def storage(self, **options):
+        return S3Storage(
+            access_key="key", secret_key="secret", bucket_name="media",
+            endpoint_url="http://localhost:9000", signature_version="s3v4",
+            region_name="auto", **options,
+        )
+
+    def test_presigned_put_for_the_bucket(self):
+        upload = start_upload("blog", "image/png", 1000, storage=self.storage())
+        url = urlsplit(upload["url"])
+        self.assertEqual(url.netloc, "localhost:9000")
+        self.assertRegex(url.path, r"^/media/incoming/blog/[0-9a-f]{32}$")
+        query = parse_qs(url.query)
+        self.assertEqual(query["X-Amz-Expires"], ["900"])
+        self.assertIn("content-type", query["X-Amz-SignedHeaders"][0])
+        self.assertEqual(upload["headers"], {"Content-Type": "image/png"})
+
+    def test_custom_domain_does_not_change_the_upload_endpoint(self):
+        upload = start_upload(
+            "blog", "image/png", 1000, storage=self.storage(custom_domain="media.example.com")
+        )
+        self.assertEqual(urlsplit(upload["url"]).netloc, "localhost:9000")
+
+    def test_validation_applies_too(self):
+        with self.assertRaises(UploadError):
+            start_upload("blog", "application/zip", 1000, storage=self.storage())
@@ -2,6 +2,7 @@ from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
 from core.models import BlogCategory, BlogPost
+from core.views import ADMIN_BLOG_PAGE_SIZE
 
 
 class AdminBlogViewTest(TestCase):
@@ -56,6 +57,22 @@ class AdminBlogViewTest(TestCase):
         self.client.post(reverse("core:admin_blog_delete", kwargs={"pk": post.pk}))
         self.assertEqual(BlogPost.objects.count(), 0)
 
+    def test_list_is_paginated_and_skips_bodies(self):
+        self.client.login(username="treefel", password="testpass123")
+        BlogPost.objects.bulk_create(
+            BlogPost(title=f"Post {i}", slug=f"post-{i}", body="x" * 1000, category=self.category)
+            for i in range(ADMIN_BLOG_PAGE_SIZE + 3)
+        )
+        response = self.client.get(reverse("core:admin_blog"))
+        posts = response.context["posts"]
+        self.assertEqual(len(posts), ADMIN_BLOG_PAGE_SIZE)
+        self.assertLessEqual({"body", "body_rendered"}, posts[0].get_deferred_fields())
+        self.assertContains(response, "Page 1 of 2")
+
+        response = self.client.get(reverse("core:admin_blog") + "?page=2", HTTP_HX_REQUEST="true")
+        self.assertEqual(len(response.context["posts"]), 3)
+        self.assertTemplateNotUsed(response, "core/admin_blog.html")
+
 
 class AdminBlogCategoryTest(TestCase):
     def setUp(self):
@@ -2,6 +2,7 @@ from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
 from core.models import FeedbackMessage, SiteSetting
+from core.views import FEEDBACK_PAGE_SIZE
 
 
 class AdminFeedbackViewTest(TestCase):
@@ -51,6 +52,89 @@ class AdminFeedbackViewTest(TestCase):
         self.assertNotContains(response, "Done")
         self.assertContains(response, "New")
 
+    def test_toggle_writes_only_is_completed(self):
+        self.client.login(username="treefel", password="testpass123")
+        msg = FeedbackMessage.objects.create(subject="Toggle", body="body")
+        FeedbackMessage.objects.filter(pk=msg.pk).update(subject="Edited elsewhere")
+        self.client.post(reverse("core:admin_feedback_toggle", kwargs={"pk": msg.pk}))
+        msg.refresh_from_db()
+        self.assertTrue(msg.is_completed)
+        self.assertEqual(msg.subject, "Edited elsewhere")
+
+    def test_keyset_pages(self):
+        self.client.login(username="treefel", password="testpass123")
+        FeedbackMessage.objects.bulk_create(
+            FeedbackMessage(subject=f"Message {i:03d}", body="b") for i in range(FEEDBACK_PAGE_SIZE + 5)
+        )
+        response = self.client.get(reverse("core:admin_feedback"))
+        shown = response.context["messages"]
+        self.assertEqual(len(shown), FEEDBACK_PAGE_SIZE)
+        self.assertContains(response, f"before={shown[-1].pk}")
+
+        response = self.client.get(
+            reverse("core:admin_feedback") + f"?before={shown[-1].pk}", HTTP_HX_REQUEST="true"
+        )
+        older = response.context["messages"]
+        self.assertEqual(len(older), 5)
+        self.assertTrue(all(msg.pk < shown[-1].pk for msg in older))
+        self.assertEqual(response.context["older_query"], "")
+        self.assertTemplateUsed(response, "core/partials/admin_feedback_page.html")
+        self.assertTemplateNotUsed(response, "core/partials/admin_feedback_list.html")
+
+    def test_search_subject_and_body(self):
+        self.client.login(username="treefel", password="testpass123")
+        FeedbackMessage.objects.create(subject="Broken link", body="b")
+        FeedbackMessage.objects.create(subject="Hi", body="The gallery LINK is broken")
+        FeedbackMessage.objects.create(subject="Other", body="Nice art")
+        response = self.client.get(reverse("core:admin_feedback") + "?q=link")
+        self.assertEqual(len(response.context["messages"]), 2)
+        self.assertNotContains(response, "Nice art")
+
+    def test_swapped_tab_carries_its_filter_to_search_and_bulk_forms(self):
+        self.client.login(username="treefel", password="testpass123")
+        response = self.client.get(
+            reverse("core:admin_feedback") + "?filter=spam", HTTP_HX_REQUEST="true"
+        )
+        for form in ("feedback-search", "feedback-bulk"):
+            self.assertContains(
+                response, f'<input type="hidden" name="filter" value="spam" form="{form}">', html=True
+            )
+
+    def test_tab_counts(self):
+        self.client.login(username="treefel", password="testpass123")
+        FeedbackMessage.objects.create(subject="A", body="b")
+        FeedbackMessage.objects.create(subject="B", body="b", is_completed=True)
+        counts = self.client.get(reverse("core:admin_feedback")).context["counts"]
+        self.assertEqual((counts.inbox, counts.pending, counts.completed), (2, 1, 1))
+
+    def test_bulk_complete(self):
+        self.client.login(username="treefel", password="testpass123")
+        a = FeedbackMessage.objects.create(subject="A", body="b")
+        b = FeedbackMessage.objects.create(subject="B", body="b")
+        c = FeedbackMessage.objects.create(subject="C", body="b")
+        response = self.client.post(reverse("core:admin_feedback_bulk"), {
+            "action": "complete", "ids": [a.pk, b.pk], "filter": "new",
+        })
+        self.assertRedirects(response, reverse("core:admin_feedback") + "?filter=new")
+        self.assertEqual(
+            set(FeedbackMessage.objects.filter(is_completed=True).values_list("pk", flat=True)),
+            {a.pk, b.pk},
+        )
+        c.refresh_from_db()
+        self.assertFalse(c.is_completed)
+
+    def test_bulk_delete(self):
+        self.client.login(username="treefel", password="testpass123")
+        a = FeedbackMessage.objects.create(subject="A", body="b")
+        b = FeedbackMessage.objects.create(subject="B", body="b", is_completed=True)
+        self.client.post(reverse("core:admin_feedback_bulk"), {"action": "delete", "ids": [a.pk, "x"]})
+        self.assertEqual(list(FeedbackMessage.objects.values_list("pk", flat=True)), [b.pk])
+
+    def test_bulk_requires_login(self):
+        msg = FeedbackMessage.objects.create(subject="A", body="b")
+        self.client.post(reverse("core:admin_feedback_bulk"), {"action": "delete", "ids": [msg.pk]})
+        self.assertTrue(FeedbackMessage.objects.filter(pk=msg.pk).exists())
+
     def test_update_welcome_message(self):
         self.client.login(username="treefel", password="testpass123")
         SiteSetting.objects.create(key="feedback_welcome", value="Old message")
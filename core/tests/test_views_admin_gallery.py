@@ -2,6 +2,7 @@ from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
 from core.models import GalleryItem
+from core.views import ADMIN_GALLERY_PAGE_SIZE
 import json
 
 
@@ -77,3 +78,55 @@ class AdminGalleryViewTest(TestCase):
         i2.refresh_from_db()
         self.assertEqual(i2.sort_order, 0)
         self.assertEqual(i1.sort_order, 1)
+
+    def make_items(self, count):
+        GalleryItem.objects.bulk_create(
+            GalleryItem(title=f"Item {i}", category="2D", media_type="image", sort_order=i)
+            for i in range(count)
+        )
+        return list(GalleryItem.objects.order_by("sort_order", "pk").values_list("pk", flat=True))
+
+    def test_gallery_pages_append_over_htmx(self):
+        self.client.login(username="treefel", password="testpass123")
+        self.make_items(ADMIN_GALLERY_PAGE_SIZE + 2)
+        response = self.client.get(reverse("core:admin_gallery"))
+        self.assertEqual(len(response.context["items"]), ADMIN_GALLERY_PAGE_SIZE)
+        self.assertContains(response, "?page=2")
+
+        response = self.client.get(reverse("core:admin_gallery") + "?page=2", HTTP_HX_REQUEST="true")
+        self.assertEqual(len(response.context["items"]), 2)
+        self.assertContains(response, 'hx-swap-oob="true"')
+        self.assertNotContains(response, "?page=3")
+
+    def test_full_load_includes_earlier_pages(self):
+        self.client.login(username="treefel", password="testpass123")
+        self.make_items(ADMIN_GALLERY_PAGE_SIZE + 2)
+        response = self.client.get(reverse("core:admin_gallery") + "?page=2")
+        self.assertEqual(len(response.context["items"]), ADMIN_GALLERY_PAGE_SIZE + 2)
+
+    def test_reorder_loaded_items_keeps_later_pages_in_place(self):
+        self.client.login(username="treefel", password="testpass123")
+        pks = self.make_items(6)
+        loaded = pks[:4]
+        # Drag the fourth loaded item to the top.
+        self.client.post(
+            reverse("core:admin_gallery_reorder"),
+            data=json.dumps({"order": [loaded[3], *loaded[:3]]}),
+            content_type="application/json",
+        )
+        order = list(GalleryItem.objects.order_by("sort_order", "pk").values_list("pk", flat=True))
+        self.assertEqual(order, [pks[3], pks[0], pks[1], pks[2], pks[4], pks[5]])
+
+    def test_reorder_with_tied_sort_orders(self):
+        self.client.login(username="treefel", password="testpass123")
+        GalleryItem.objects.bulk_create(
+            GalleryItem(title=f"Item {i}", category="2D", media_type="image") for i in range(4)
+        )
+        pks = list(GalleryItem.objects.order_by("sort_order", "pk").values_list("pk", flat=True))
+        self.client.post(
+            reverse("core:admin_gallery_reorder"),
+            data=json.dumps({"order": [pks[1], pks[0]]}),
+            content_type="application/json",
+        )
+        order = list(GalleryItem.objects.order_by("sort_order", "pk").values_list("pk", flat=True))
+        self.assertEqual(order, [pks[1], pks[0], pks[2], pks[3]])
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 from core.models import BlogCategory, BlogPost
@@ -5,6 +6,7 @@ from core.models import BlogCategory, BlogPost
 
 class BlogListViewTest(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.category = BlogCategory.objects.create(name="Dev Log")
         self.published_post = BlogPost.objects.create(
@@ -29,6 +31,31 @@ class BlogListViewTest(TestCase):
         self.assertContains(response, "Published Post")
         self.assertNotContains(response, "Draft Post")
 
+    def test_blog_list_hides_empty_categories(self):
+        BlogCategory.objects.create(name="Empty Category")
+        response = self.client.get(reverse("core:blog_list"))
+        self.assertContains(response, "Dev Log")
+        self.assertNotContains(response, "Empty Category")
+
+    def test_category_nav_is_cached_until_counts_change(self):
+        self.client.get(reverse("core:blog_list"))
+        with self.assertNumQueries(2):
+            self.client.get(reverse("core:blog_list"))
+        with self.captureOnCommitCallbacks(execute=True):
+            other = BlogCategory.objects.create(name="Personal")
+            BlogPost.objects.create(title="New", body="body", category=other, published=True)
+        self.assertContains(self.client.get(reverse("core:blog_list")), "/blog/?category=personal")
+
+    def test_unknown_categories_share_the_all_fragment(self):
+        def nav_fragments():
+            return [key for key in cache._cache if "template.cache.category_nav" in key]
+
+        self.client.get(reverse("core:blog_list"))
+        for junk in ("no-such-thing", "another"):
+            response = self.client.get(reverse("core:blog_list") + f"?category={junk}")
+            self.assertNotContains(response, "Published Post")
+        self.assertEqual(len(nav_fragments()), 1)
+
     def test_blog_list_filter_by_category(self):
         other_cat = BlogCategory.objects.create(name="Personal")
         BlogPost.objects.create(
@@ -74,6 +101,15 @@ class BlogDetailViewTest(TestCase):
         self.assertContains(response, "Test Post")
         self.assertContains(response, "Full content here")
 
+    def test_blog_detail_emits_sanitized_body(self):
+        self.post.body = '<p>Safe</p><script>alert("x")</script>'
+        self.post.save()
+        response = self.client.get(
+            reverse("core:blog_detail", kwargs={"slug": self.post.slug})
+        )
+        self.assertContains(response, "Safe")
+        self.assertNotContains(response, 'alert("x")')
+
     def test_unpublished_post_returns_404(self):
         draft = BlogPost.objects.create(
             title="Draft", body="body", category=self.category, published=False
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 from core.models import FeedbackMessage, SiteSetting
@@ -11,6 +12,7 @@ class AboutViewTest(TestCase):
 
 class FeedbackViewTest(TestCase):
     def setUp(self):
+        cache.clear()  # Rate-limit counters are per client IP.
         self.client = Client()
         SiteSetting.objects.create(
             key="feedback_welcome", value="Drop a message!"
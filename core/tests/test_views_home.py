@@ -27,3 +27,9 @@ class HomeViewTest(TestCase):
         )
         response = self.client.get(reverse("core:home"))
         self.assertContains(response, "Featured Art")
+
+    def test_home_loads_assets_from_own_origin(self):
+        response = self.client.get(reverse("core:home"))
+        self.assertNotContains(response, "unpkg.com")
+        self.assertContains(response, "vendor/htmx.min.js")
+        self.assertContains(response, 'rel="preload"')
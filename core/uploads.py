@@ -0,0 +1,118 @@
+import uuid
+
+from PIL import Image
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from core.storage import upload_image
+
+# Folders the admin forms upload into.
+UPLOAD_FOLDERS = ("blog", "gallery")
+# Where files wait between the browser's PUT and the completion callback.
+INCOMING_PREFIX = "incoming"
+MAX_UPLOAD_SIZE = 200 * 1024 * 1024
+# How long the browser has to start its PUT.
+UPLOAD_URL_EXPIRY = 15 * 60
+# How long after that a completion is accepted; a big file on a slow link
+# can take a while to arrive.
+COMPLETION_WINDOW = 24 * 60 * 60
+# optimize_image() decodes JPEGs at reduced scale, but anything else at full
+# size; this caps that at about 120 MB of RGB.
+MAX_DECODE_PIXELS = 40_000_000
+SIGNING_SALT = "core.uploads"
+
+
+class UploadError(Exception):
+    """An upload that can't be started or finished; the message is shown to the admin."""
+
+
+def is_presignable(storage):
+    """Whether storage is an S3-compatible backend the browser can PUT to itself."""
+    return hasattr(storage, "bucket_name") and hasattr(storage, "connection")
+
+
+def check_upload(folder, content_type, size):
+    """Raise UploadError unless an admin upload with these details is allowed."""
+    if folder not in UPLOAD_FOLDERS:
+        raise UploadError(f"Unknown folder {folder!r}.")
+    if not content_type.startswith("image/"):
+        raise UploadError("Only images can be uploaded.")
+    if size > MAX_UPLOAD_SIZE:
+        raise UploadError(f"Files are limited to {MAX_UPLOAD_SIZE // (1024 * 1024)} MB.")
+
+
+def start_upload(folder, content_type, size, storage=default_storage):
+    """Somewhere for the browser to PUT one file, bypassing the app server.
+
+    Returns the URL, method and headers for the PUT, plus a signed token to
+    hand back to finish_upload(). With an S3/R2 backend the URL is presigned
+    for the bucket. Otherwise it points at the upload_receive view, which
+    writes the body into storage the same way; that keeps the flow usable
+    (and testable) with FileSystemStorage.
+    """
+    check_upload(folder, content_type, size)
+    key = f"{INCOMING_PREFIX}/{folder}/{uuid.uuid4().hex}"
+    token = signing.dumps({"key": key, "folder": folder}, salt=SIGNING_SALT)
+    headers = {"Content-Type": content_type}
+    if is_presignable(storage):
+        # Signed for this key and content type only. The incoming object
+        # stays private: no ACL is passed, whatever default_acl says.
+        url = storage.connection.meta.client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": storage.bucket_name,
+                "Key": storage._normalize_name(key),
+                "ContentType": content_type,
+            },
+            ExpiresIn=UPLOAD_URL_EXPIRY,
+        )
+    else:
+        url = reverse("core:upload_receive", args=[token])
+    return {"url": url, "method": "PUT", "headers": headers, "token": token}
+
+
+def upload_key(token, max_age):
+    """The storage key a start_upload() token was issued for."""
+    try:
+        return signing.loads(token, salt=SIGNING_SALT, max_age=max_age)
+    except signing.BadSignature:
+        raise UploadError("This upload has expired; please choose the file again.")
+
+
+def receive_upload(token, stream, storage=default_storage):
+    """Write a PUT body into storage at the token's key (the non-S3 fallback)."""
+    key = upload_key(token, UPLOAD_URL_EXPIRY)["key"]
+    if storage.exists(key):
+        raise UploadError("This upload was already received.")
+    storage.save(key, stream)
+
+
+def process_upload(file_obj, folder):
+    """Optimize and store an uploaded image (core.storage's upload_image). Returns its URL."""
+    try:
+        with Image.open(file_obj) as img:
+            if img.format != "JPEG" and img.width * img.height > MAX_DECODE_PIXELS:
+                raise UploadError("That image is too large; please upload it as a JPEG.")
+        file_obj.seek(0)
+        return upload_image(file_obj, folder=folder)
+    except (OSError, Image.DecompressionBombError):
+        raise UploadError("That file isn't an image we can read.")
+
+
+def finish_upload(token, storage=default_storage):
+    """Process a file the browser has PUT into storage. Returns its public URL.
+
+    The raw upload is optimized like any other image and then deleted,
+    whether or not that worked.
+    """
+    upload = upload_key(token, COMPLETION_WINDOW)
+    key = upload["key"]
+    if not storage.exists(key):
+        raise UploadError("The file never arrived; please try again.")
+    try:
+        if storage.size(key) > MAX_UPLOAD_SIZE:
+            raise UploadError(f"Files are limited to {MAX_UPLOAD_SIZE // (1024 * 1024)} MB.")
+        with storage.open(key, "rb") as f:
+            return process_upload(f, upload["folder"])
+    finally:
+        storage.delete(key)
@@ -1,15 +1,22 @@
 from django.urls import path
-from core import views
+from core import feeds, sitemaps, views
 
 app_name = 'core'
 
 urlpatterns = [
     path('', views.home, name='home'),
     path('blog/', views.blog_list, name='blog_list'),
+    path('blog/feed/', feeds.blog_feed, name='blog_feed'),
+    path('blog/feed/atom/', feeds.blog_feed_atom, name='blog_feed_atom'),
+    path('blog/category/<slug:slug>/feed/', feeds.blog_feed, name='blog_category_feed'),
+    path('blog/category/<slug:slug>/feed/atom/', feeds.blog_feed_atom, name='blog_category_feed_atom'),
+    path('blog/tag/<slug:slug>/', views.blog_tag, name='blog_tag'),
     path('blog/<slug:slug>/', views.blog_detail, name='blog_detail'),
     path('gallery/', views.gallery, name='gallery'),
     path('about/', views.about, name='about'),
     path('feedback/', views.feedback, name='feedback'),
+    path('sitemap.xml', sitemaps.sitemap, name='sitemap'),
+    path('sitemap-<slug:section>-<int:page>.xml', sitemaps.sitemap_section, name='sitemap_section'),
 
     # Admin Blog
     path('admin-blog/', views.admin_blog, name='admin_blog'),
@@ -29,8 +36,20 @@ urlpatterns = [
     # Admin Feedback
     path('admin-feedback/', views.admin_feedback, name='admin_feedback'),
     path('admin-feedback/<int:pk>/toggle/', views.admin_feedback_toggle, name='admin_feedback_toggle'),
+    path('admin-feedback/<int:pk>/spam/', views.admin_feedback_spam, name='admin_feedback_spam'),
+    path('admin-feedback/bulk/', views.admin_feedback_bulk, name='admin_feedback_bulk'),
     path('admin-feedback/welcome/', views.admin_feedback_welcome, name='admin_feedback_welcome'),
 
+    # Admin Metrics
+    path('admin-metrics/', views.admin_metrics, name='admin_metrics'),
+
     # TinyMCE Upload
     path('api/upload/', views.tinymce_upload, name='tinymce_upload'),
+
+    # Direct Uploads
+    path('api/uploads/', views.upload_start, name='upload_start'),
+    path('api/uploads/complete/', views.upload_complete, name='upload_complete'),
+    path('api/uploads/<str:token>/', views.upload_receive, name='upload_receive'),
+    path('api/chunked-uploads/', views.chunked_upload_start, name='chunked_upload_start'),
+    path('api/chunked-uploads/<str:upload_id>/', views.chunked_upload, name='chunked_upload'),
 ]
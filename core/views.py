@@ -1,18 +1,40 @@
 import json
+import logging
+from urllib.parse import urlencode
 
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.core.paginator import Paginator
+from django.db.models import Avg, Count, Max, Q
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
-from django_ratelimit.decorators import ratelimit
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods, require_POST
 from core.forms import FeedbackForm, BlogPostForm, BlogCategoryForm, GalleryItemForm
-from core.models import BlogCategory, BlogPost, FeedbackMessage, GalleryItem, SiteSetting
+from core.models import (
+    FEEDBACK_STATUSES, BlogCategory, BlogPost, FeedbackCounts, FeedbackMessage, GalleryItem,
+    RequestMetric, SiteSetting, Tag,
+)
+from core.chunked_uploads import CHUNK_SIZE, ChunkedUpload, OffsetMismatch
+from core.ingest import feedback_buffer
+from core.navigation import category_nav_version, nav_categories, nav_category
+from core.ratelimit import ratelimit
+from core.spam import DROP_REASONS, schedule_training, spam_reason
 from core.storage import upload_image
+from core.uploads import MAX_UPLOAD_SIZE, UploadError, finish_upload, receive_upload, start_upload
+
+logger = logging.getLogger(__name__)
+
+ADMIN_BLOG_PAGE_SIZE = 25
+ADMIN_GALLERY_PAGE_SIZE = 24
+FEEDBACK_PAGE_SIZE = 25
+# ?filter= values of the admin inbox tabs; no filter lists everything but spam.
+FEEDBACK_FILTERS = {"new": "pending", "completed": "completed", "spam": "spam"}
 
 
 def home(request):
-    latest_post = BlogPost.objects.filter(published=True).first()
+    latest_post = BlogPost.objects.filter(published=True).select_related("category").first()
     featured_item = GalleryItem.objects.first()
     return render(request, "core/home.html", {
         "latest_post": latest_post,
@@ -22,7 +44,8 @@ def home(request):
 
 def blog_list(request):
     posts = BlogPost.objects.filter(published=True).select_related("category")
-    categories = BlogCategory.objects.all()
+    nav_version = category_nav_version()
+    categories = nav_categories(nav_version)
 
     category_slug = request.GET.get("category")
     if category_slug:
@@ -43,15 +66,33 @@ def blog_list(request):
         {
             "posts": posts,
             "categories": categories,
-            "current_category": category_slug,
+            "current_category": nav_category(category_slug, categories),
+            "nav_version": nav_version,
         },
     )
 
 
 def blog_detail(request, slug):
-    post = get_object_or_404(BlogPost, slug=slug, published=True)
-    tags = [tag.strip() for tag in post.tags.split(",") if tag.strip()] if post.tags else []
-    return render(request, "core/blog_detail.html", {"post": post, "tags": tags})
+    post = get_object_or_404(
+        BlogPost.objects.select_related("category").defer("body"), slug=slug, published=True
+    )
+    return render(request, "core/blog_detail.html", {"post": post, "tags": post.tag_set.all()})
+
+
+def blog_tag(request, slug):
+    tag = get_object_or_404(Tag, slug=slug)
+    posts = tag.posts.filter(published=True).select_related("category")
+    paginator = Paginator(posts, 9)
+    # The count is maintained on Tag, so skip the paginator's COUNT(*).
+    paginator.count = tag.post_count
+    posts = paginator.get_page(request.GET.get("page"))
+
+    template = (
+        "core/partials/blog_list_items.html"
+        if request.htmx
+        else "core/blog_tag.html"
+    )
+    return render(request, template, {"posts": posts, "tag": tag})
 
 
 def gallery(request):
@@ -76,7 +117,7 @@ def about(request):
     return render(request, "core/about.html")
 
 
-@ratelimit(key='ip', rate='5/m', method='POST', block=True)
+@ratelimit("feedback", rate="5/m")
 def feedback(request):
     welcome = SiteSetting.objects.filter(key="feedback_welcome").first()
     welcome_message = welcome.value if welcome else ""
@@ -84,7 +125,19 @@ def feedback(request):
     if request.method == "POST":
         form = FeedbackForm(request.POST)
         if form.is_valid() and not form.cleaned_data.get("honeypot"):
-            form.save()
+            reason = spam_reason(form.cleaned_data["subject"], form.cleaned_data["body"])
+            if reason in DROP_REASONS:
+                # Answer as if it worked so bots learn nothing.
+                logger.info("Dropped feedback as spam (%s)", reason)
+            else:
+                if reason:
+                    # Likely spam, but kept in the spam tab in case it isn't.
+                    logger.info("Quarantined feedback as spam (%s)", reason)
+                if settings.FEEDBACK_BUFFERED:
+                    feedback_buffer().enqueue({**form.cleaned_data, "is_spam": bool(reason)})
+                else:
+                    form.instance.is_spam = bool(reason)
+                    form.save()
             template = "core/partials/feedback_form.html" if request.htmx else "core/feedback.html"
             return render(request, template, {
                 "form": FeedbackForm(),
@@ -107,7 +160,13 @@ def feedback(request):
 
 @login_required
 def admin_blog(request):
-    posts = BlogPost.objects.select_related("category").all()
+    # Only what the table shows; bodies can run to megabytes.
+    posts = BlogPost.objects.select_related("category").only(
+        "title", "created_at", "published", "category__name"
+    )
+    posts = Paginator(posts, ADMIN_BLOG_PAGE_SIZE).get_page(request.GET.get("page"))
+    if request.htmx:
+        return render(request, "core/partials/admin_blog_posts.html", {"posts": posts})
     categories = BlogCategory.objects.all()
     return render(request, "core/admin_blog.html", {
         "posts": posts,
@@ -183,8 +242,20 @@ def admin_blog_category_delete(request, pk):
 
 @login_required
 def admin_gallery(request):
-    items = GalleryItem.objects.all()
-    return render(request, "core/admin_gallery.html", {"items": items})
+    items = GalleryItem.objects.only(
+        "title", "category", "media_type", "image", "youtube_url", "sort_order"
+    ).order_by("sort_order", "pk")
+    page = Paginator(items, ADMIN_GALLERY_PAGE_SIZE).get_page(request.GET.get("page"))
+    if request.htmx:
+        # Later pages load as the grid scrolls and append to the same sortable list.
+        return render(request, "core/partials/admin_gallery_items.html", {
+            "items": page.object_list, "page": page,
+        })
+    # A full load shows everything up to this page, so the grid always holds
+    # the leading items that admin_gallery_reorder expects.
+    return render(request, "core/admin_gallery.html", {
+        "items": items[:page.end_index()], "page": page,
+    })
 
 
 @login_required
@@ -233,10 +304,30 @@ def admin_gallery_delete(request, pk):
 @login_required
 @require_POST
 def admin_gallery_reorder(request):
+    """Put the posted items first, in the posted order.
+
+    The admin grid loads pages from the top, so the posted ids are the items
+    loaded so far. They are renumbered to sit just below the first item that
+    wasn't loaded, which leaves every later page where it was.
+    """
     data = json.loads(request.body)
-    order = data.get("order", [])
+    order = [pk for pk in dict.fromkeys(data.get("order", [])) if isinstance(pk, int)]
+    items = GalleryItem.objects.only("sort_order").in_bulk(order)
+    order = [pk for pk in order if pk in items]
+    following = (
+        GalleryItem.objects.exclude(pk__in=order)
+        .order_by("sort_order", "pk")
+        .values_list("sort_order", flat=True)
+        .first()
+    )
+    start = 0 if following is None else following - len(order)
+    changed = []
     for index, pk in enumerate(order):
-        GalleryItem.objects.filter(pk=pk).update(sort_order=index)
+        item = items[pk]
+        if item.sort_order != start + index:
+            item.sort_order = start + index
+            changed.append(item)
+    GalleryItem.objects.bulk_update(changed, ["sort_order"])
     return JsonResponse({"status": "ok"})
 
 
@@ -247,23 +338,43 @@ def admin_gallery_reorder(request):
 
 @login_required
 def admin_feedback(request):
-    messages_qs = FeedbackMessage.objects.all()
-
     filter_param = request.GET.get("filter")
-    if filter_param == "completed":
-        messages_qs = messages_qs.filter(is_completed=True)
-    elif filter_param == "new":
-        messages_qs = messages_qs.filter(is_completed=False)
-
-    welcome = SiteSetting.objects.filter(key="feedback_welcome").first()
-    welcome_message = welcome.value if welcome else ""
+    status = FEEDBACK_FILTERS.get(filter_param)
+    messages_qs = FeedbackMessage.objects.filter(
+        FEEDBACK_STATUSES[status] if status else Q(is_spam=False)
+    )
 
-    template = "core/partials/admin_feedback_list.html" if request.htmx else "core/admin_feedback.html"
-    return render(request, template, {
-        "messages": messages_qs,
-        "welcome_message": welcome_message,
+    query = request.GET.get("q", "").strip()
+    if query:
+        messages_qs = messages_qs.filter(Q(subject__icontains=query) | Q(body__icontains=query))
+
+    # Keyset pagination: each page continues below the last id shown, so a
+    # deep page costs the same index range scan as the first.
+    before = request.GET.get("before", "")
+    if before.isdigit():
+        messages_qs = messages_qs.filter(pk__lt=int(before))
+    page = list(messages_qs.order_by("-pk")[:FEEDBACK_PAGE_SIZE + 1])
+    messages = page[:FEEDBACK_PAGE_SIZE]
+    older_query = ""
+    if len(page) > FEEDBACK_PAGE_SIZE:
+        params = {"filter": filter_param or "", "q": query, "before": messages[-1].pk}
+        older_query = urlencode({key: value for key, value in params.items() if value})
+
+    context = {
+        "messages": messages,
+        "older_query": older_query,
         "current_filter": filter_param,
-    })
+        "query": query,
+    }
+    if request.htmx:
+        # "Load older" appends rows; tabs and search swap the whole list.
+        template = "core/partials/admin_feedback_page.html" if before else "core/partials/admin_feedback_list.html"
+        return render(request, template, context)
+
+    welcome = SiteSetting.objects.filter(key="feedback_welcome").first()
+    context["welcome_message"] = welcome.value if welcome else ""
+    context["counts"] = FeedbackCounts.load()
+    return render(request, "core/admin_feedback.html", context)
 
 
 @login_required
@@ -271,12 +382,42 @@ def admin_feedback(request):
 def admin_feedback_toggle(request, pk):
     msg = get_object_or_404(FeedbackMessage, pk=pk)
     msg.is_completed = not msg.is_completed
-    msg.save()
+    msg.save(update_fields=["is_completed"])
     if request.htmx:
         return render(request, "core/partials/admin_feedback_row.html", {"msg": msg})
     return redirect("core:admin_feedback")
 
 
+@login_required
+@require_POST
+def admin_feedback_spam(request, pk):
+    msg = get_object_or_404(FeedbackMessage, pk=pk)
+    msg.is_spam = msg.marked_spam_by_admin = not msg.is_spam
+    msg.save(update_fields=["is_spam", "marked_spam_by_admin"])
+    schedule_training()
+    if request.htmx:
+        # It moves between the inbox and the spam tab, so drop it from this list.
+        return HttpResponse("")
+    return redirect("core:admin_feedback")
+
+
+@login_required
+@require_POST
+def admin_feedback_bulk(request):
+    ids = [pk for pk in request.POST.getlist("ids") if pk.isdigit()]
+    selected = FeedbackMessage.objects.filter(pk__in=ids)
+    action = request.POST.get("action")
+    if action == "complete":
+        selected.mark_completed()
+    elif action == "delete":
+        selected.delete()
+    filter_param = request.POST.get("filter")
+    url = reverse("core:admin_feedback")
+    if filter_param in FEEDBACK_FILTERS:
+        url += "?" + urlencode({"filter": filter_param})
+    return redirect(url)
+
+
 @login_required
 @require_POST
 def admin_feedback_welcome(request):
@@ -287,6 +428,32 @@ def admin_feedback_welcome(request):
     return redirect("core:admin_feedback")
 
 
+# ---------------------------------------------------------------------------
+# Admin Request Metrics
+# ---------------------------------------------------------------------------
+
+
+@login_required
+def admin_metrics(request):
+    summary = (
+        RequestMetric.objects.values("view_name")
+        .annotate(
+            requests=Count("id"),
+            avg_queries=Avg("query_count"),
+            avg_db_ms=Avg("db_ms"),
+            avg_template_ms=Avg("template_ms"),
+            avg_total_ms=Avg("total_ms"),
+            max_total_ms=Max("total_ms"),
+        )
+        .order_by("-avg_total_ms")
+    )
+    recent = RequestMetric.objects.all()[:50]
+    return render(request, "core/admin_metrics.html", {
+        "summary": summary,
+        "recent": recent,
+    })
+
+
 # ---------------------------------------------------------------------------
 # TinyMCE Image Upload
 # ---------------------------------------------------------------------------
@@ -300,3 +467,104 @@ def tinymce_upload(request):
         return JsonResponse({"error": "No file provided"}, status=400)
     url = upload_image(file, folder="blog")
     return JsonResponse({"location": url})
+
+
+# ---------------------------------------------------------------------------
+# Direct Uploads
+# ---------------------------------------------------------------------------
+
+
+def upload_request(request):
+    """The JSON object an upload endpoint was sent, or UploadError."""
+    try:
+        data = json.loads(request.body or "{}")
+    except ValueError:
+        raise UploadError("Malformed request.")
+    if not isinstance(data, dict):
+        raise UploadError("Malformed request.")
+    return data
+
+
+@login_required
+@require_POST
+def upload_start(request):
+    try:
+        data = upload_request(request)
+        upload = start_upload(
+            data.get("folder", ""), data.get("content_type", ""), int(data.get("size") or 0)
+        )
+    except (UploadError, ValueError) as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return JsonResponse(upload)
+
+
+# The signed token is the credential, as with a presigned S3 URL, so this
+# takes neither a session nor a CSRF token.
+@csrf_exempt
+@require_http_methods(["PUT"])
+def upload_receive(request, token):
+    if int(request.META.get("CONTENT_LENGTH") or 0) > MAX_UPLOAD_SIZE:
+        return JsonResponse({"error": "File too large"}, status=413)
+    try:
+        receive_upload(token, request)
+    except UploadError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return HttpResponse(status=204)
+
+
+@login_required
+@require_POST
+def upload_complete(request):
+    try:
+        url = finish_upload(upload_request(request).get("token", ""))
+    except UploadError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return JsonResponse({"url": url})
+
+
+@login_required
+@require_POST
+def chunked_upload_start(request):
+    try:
+        data = upload_request(request)
+        upload = ChunkedUpload.create(
+            settings.UPLOAD_CHUNK_DIR, data.get("folder", ""), data.get("content_type", ""),
+            int(data.get("size") or 0), owner=request.user.pk,
+        )
+    except (UploadError, ValueError) as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return JsonResponse({
+        "url": reverse("core:chunked_upload", args=[upload.id]),
+        "chunk_size": CHUNK_SIZE,
+        "offset": 0,
+    }, status=201)
+
+
+@login_required
+@require_http_methods(["GET", "PUT", "DELETE"])
+def chunked_upload(request, upload_id):
+    """GET: how much has arrived. PUT: the next chunk, at the Upload-Offset header.
+    DELETE: give up. The PUT that completes the file returns its image URL."""
+    try:
+        upload = ChunkedUpload(settings.UPLOAD_CHUNK_DIR, upload_id)
+        if upload.meta["owner"] != request.user.pk:
+            return JsonResponse({"error": "Unknown upload."}, status=404)
+        if request.method == "DELETE":
+            upload.discard()
+            return HttpResponse(status=204)
+        size = upload.meta["size"]
+        if request.method == "GET":
+            return JsonResponse({"offset": upload.offset, "size": size, "chunk_size": CHUNK_SIZE})
+        offset = upload.append(
+            int(request.headers.get("Upload-Offset", -1)),
+            request,
+            int(request.META.get("CONTENT_LENGTH") or 0),
+        )
+        if offset < size:
+            return JsonResponse({"offset": offset, "size": size})
+        # Only the request whose append claimed the finished file gets here.
+        return JsonResponse({"offset": offset, "size": size, "url": upload.finish()})
+    except OffsetMismatch as exc:
+        return JsonResponse({"error": str(exc), "offset": exc.offset}, status=409)
+    except (UploadError, ValueError) as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
@@ -0,0 +1,6 @@
+import os
+
+# Keep GUNICORN_THREADS in sync with treefel/settings.py,
+# which sizes each worker's database connection pool from the same values.
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
@@ -0,0 +1,187 @@
+// Uploads files picked in <input type="file" data-direct-upload> straight to
+// storage instead of posting them with the form:
+//
+//   1. POST data-start-url for a presigned PUT URL,
+//   2. PUT the file there,
+//   3. POST data-complete-url, which processes it and returns the image URL,
+//   4. fill in the URL field named by data-target and clear the file input.
+//
+// Inputs that also have data-chunked-url send files over CHUNKED_MIN in
+// resumable chunks through the app instead (core.chunked_uploads). Progress
+// is remembered per file, so picking the same file again after a failure or
+// a reload carries on where it stopped.
+//
+// If any step fails the file stays selected, so submitting the form falls
+// back to the ordinary multipart upload.
+(function() {
+    var CHUNKED_MIN = 8 * 1024 * 1024;
+    var CHUNK_ATTEMPTS = 5;
+
+    function csrfToken(input) {
+        var field = input.form && input.form.querySelector('[name=csrfmiddlewaretoken]');
+        return field ? field.value : '';
+    }
+
+    function postJSON(url, input, data) {
+        return fetch(url, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json', 'X-CSRFToken': csrfToken(input)},
+            body: JSON.stringify(data),
+        }).then(function(response) {
+            return response.json().then(function(body) {
+                if (!response.ok) throw new Error(body.error || 'Upload failed');
+                return body;
+            });
+        });
+    }
+
+    function put(upload, file, onProgress) {
+        return new Promise(function(resolve, reject) {
+            var xhr = new XMLHttpRequest();
+            xhr.open(upload.method, upload.url);
+            Object.keys(upload.headers).forEach(function(name) {
+                xhr.setRequestHeader(name, upload.headers[name]);
+            });
+            xhr.upload.onprogress = function(event) {
+                if (event.lengthComputable) onProgress(event.loaded / event.total);
+            };
+            xhr.onload = function() {
+                if (xhr.status >= 200 && xhr.status < 300) resolve();
+                else reject(new Error('Upload failed (' + xhr.status + ')'));
+            };
+            xhr.onerror = function() { reject(new Error('Upload failed')); };
+            xhr.send(file);
+        });
+    }
+
+    function request(method, url, input, body, headers, onProgress) {
+        return new Promise(function(resolve, reject) {
+            var xhr = new XMLHttpRequest();
+            xhr.open(method, url);
+            xhr.setRequestHeader('X-CSRFToken', csrfToken(input));
+            Object.keys(headers || {}).forEach(function(name) {
+                xhr.setRequestHeader(name, headers[name]);
+            });
+            if (onProgress) {
+                xhr.upload.onprogress = function(event) { onProgress(event.loaded); };
+            }
+            xhr.onload = function() {
+                var data = {};
+                try { data = JSON.parse(xhr.responseText); } catch (e) {}
+                resolve({status: xhr.status, data: data});
+            };
+            xhr.onerror = function() { resolve({status: 0, data: {}}); };
+            xhr.send(body);
+        });
+    }
+
+    function sleep(ms) {
+        return new Promise(function(resolve) { setTimeout(resolve, ms); });
+    }
+
+    // Finds where an earlier attempt at this file got to, or starts afresh.
+    function resumeOrStart(input, file, key) {
+        var url = localStorage.getItem(key);
+        var resumed = url
+            ? request('GET', url, input).then(function(response) {
+                if (response.status !== 200) return null;
+                return {url: url, offset: response.data.offset, chunk_size: response.data.chunk_size};
+            })
+            : Promise.resolve(null);
+        return resumed.then(function(upload) {
+            if (upload) return upload;
+            return postJSON(input.dataset.chunkedUrl, input, {
+                folder: input.dataset.folder, content_type: file.type, size: file.size,
+            }).then(function(upload) {
+                localStorage.setItem(key, upload.url);
+                return upload;
+            });
+        });
+    }
+
+    function sendChunks(input, file, upload, attempt, onProgress) {
+        var end = Math.min(upload.offset + upload.chunk_size, file.size);
+        return request(
+            'PUT', upload.url, input, file.slice(upload.offset, end),
+            {'Upload-Offset': String(upload.offset), 'Content-Type': 'application/octet-stream'},
+            function(loaded) { onProgress((upload.offset + loaded) / file.size); }
+        ).then(function(response) {
+            if (response.status === 200 && response.data.url) return response.data;
+            if (response.status === 200 || response.status === 409) {
+                // Accepted, or the server already has more than we thought.
+                upload.offset = response.data.offset;
+                return sendChunks(input, file, upload, 0, onProgress);
+            }
+            if (response.status !== 0 || attempt + 1 >= CHUNK_ATTEMPTS) {
+                throw new Error(response.data.error || 'Upload failed');
+            }
+            // Connection dropped: ask how much arrived, then carry on.
+            return sleep(1000 * Math.pow(2, attempt)).then(function() {
+                return request('GET', upload.url, input);
+            }).then(function(status) {
+                if (status.status === 200) upload.offset = status.data.offset;
+                return sendChunks(input, file, upload, attempt + 1, onProgress);
+            });
+        });
+    }
+
+    function chunkedUpload(input, file, onProgress) {
+        var key = 'chunked-upload:' + [input.dataset.folder, file.name, file.size, file.lastModified].join(':');
+        return resumeOrStart(input, file, key).then(function(upload) {
+            return sendChunks(input, file, upload, 0, onProgress);
+        }).then(function(result) {
+            localStorage.removeItem(key);
+            return result;
+        });
+    }
+
+    function directUpload(input, file, onProgress) {
+        return postJSON(input.dataset.startUrl, input, {
+            folder: input.dataset.folder, content_type: file.type, size: file.size,
+        }).then(function(upload) {
+            return put(upload, file, onProgress).then(function() {
+                onProgress(null);
+                return postJSON(input.dataset.completeUrl, input, {token: upload.token});
+            });
+        });
+    }
+
+    function setBusy(input, busy) {
+        input.form.querySelectorAll('[type=submit]').forEach(function(button) {
+            button.disabled = busy;
+            button.classList.toggle('opacity-50', busy);
+        });
+    }
+
+    function upload(input) {
+        var file = input.files[0];
+        var target = document.getElementById(input.dataset.target);
+        var status = document.getElementById(input.id + '-status');
+        function report(message) { if (status) status.textContent = message; }
+
+        function progress(fraction) {
+            report(fraction === null || fraction >= 1
+                ? 'Processing…'
+                : 'Uploading… ' + Math.round(fraction * 100) + '%');
+        }
+        var send = input.dataset.chunkedUrl && file.size > CHUNKED_MIN ? chunkedUpload : directUpload;
+
+        setBusy(input, true);
+        report('Uploading…');
+        send(input, file, progress).then(function(result) {
+            target.value = result.url;
+            input.value = '';
+            report('Uploaded.');
+        }).catch(function(error) {
+            report(error.message + ' It will be sent with the form instead.');
+        }).finally(function() {
+            setBusy(input, false);
+        });
+    }
+
+    document.querySelectorAll('input[type=file][data-direct-upload]').forEach(function(input) {
+        input.addEventListener('change', function() {
+            if (input.files.length) upload(input);
+        });
+    });
+})();
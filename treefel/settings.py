@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 
 import dj_database_url
@@ -22,6 +23,9 @@ load_dotenv()
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
 
@@ -57,11 +61,13 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.RequestMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django_htmx.middleware.HtmxMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -70,7 +76,7 @@ ROOT_URLCONF = 'treefel.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.metrics.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -93,7 +99,109 @@ DATABASES = {
     'default': dj_database_url.config(
         default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
         conn_max_age=600,
+        conn_health_checks=True,
+    )
+}
+
+# Optional read replica for anonymous traffic on public pages (see
+# core.routers). Locally, a copy of db.sqlite3 works:
+# DATABASE_REPLICA_URL=sqlite:///replica.sqlite3
+# Test runs read from the primary alone; the replica alias there mirrors the
+# test database for tests that turn the router on with override_settings.
+DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL', '')
+if TESTING:
+    DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+elif DATABASE_REPLICA_URL:
+    DATABASES['replica'] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=600,
+        conn_health_checks=True,
     )
+    DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+# Seconds a client keeps reading from the primary after a write, so replica
+# lag never hides the change it just made.
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '15'))
+
+# Sized from the gunicorn layout in gunicorn.conf.py: one pool per worker
+# process, one connection per thread. Postgres sees up to
+# WEB_CONCURRENCY * DB_POOL_MAX_SIZE connections per database.
+GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', '4'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', GUNICORN_THREADS))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+
+for _db in DATABASES.values():
+    if _db['ENGINE'] != 'django.db.backends.postgresql':
+        continue
+    # Django refuses persistent connections alongside a pool; the pool keeps
+    # connections open instead. With CONN_HEALTH_CHECKS it checks them before
+    # handing them out, so ones Railway's proxy dropped while idle are replaced.
+    _db['CONN_MAX_AGE'] = 0
+    _db.setdefault('OPTIONS', {})['pool'] = {
+        'min_size': 1,
+        'max_size': DB_POOL_MAX_SIZE,
+        'timeout': DB_POOL_TIMEOUT,
+        'max_idle': 300,
+    }
+
+
+# Cache
+# Shared by every worker: rate-limit counters (core.ratelimit) and the feed,
+# sitemap and category nav caches must not be per-process. Redis when
+# REDIS_URL is set; otherwise a file cache on the host's disk whose counters
+# are made atomic with file locks. Tests get an in-memory stand-in.
+REDIS_URL = os.getenv('REDIS_URL', '')
+if TESTING:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+elif REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.LockingFileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', '/tmp/treefel-cache'),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+
+# Share of requests stored as RequestMetric rows (0 disables, 1 keeps all).
+REQUEST_METRICS_SAMPLE_RATE = float(os.getenv('REQUEST_METRICS_SAMPLE_RATE', '0'))
+
+# Buffered feedback ingestion (core.ingest): submissions are fsynced to a
+# spool file and bulk inserted by a per-process flusher thread at most
+# FEEDBACK_FLUSH_INTERVAL seconds later. The spool directory must survive
+# restarts (a mounted volume); flush_feedback drains it on deploy.
+FEEDBACK_BUFFERED = os.getenv('FEEDBACK_BUFFERED', 'False') == 'True'
+FEEDBACK_SPOOL_DIR = os.getenv('FEEDBACK_SPOOL_DIR', str(BASE_DIR / 'spool'))
+FEEDBACK_FLUSH_BATCH_SIZE = int(os.getenv('FEEDBACK_FLUSH_BATCH_SIZE', '500'))
+FEEDBACK_FLUSH_INTERVAL = float(os.getenv('FEEDBACK_FLUSH_INTERVAL', '2'))
+
+# Resumable admin uploads (core.chunked_uploads) are assembled here before
+# processing. Every worker must see the same directory.
+UPLOAD_CHUNK_DIR = os.getenv('UPLOAD_CHUNK_DIR', str(BASE_DIR / 'spool' / 'uploads'))
+
+
+# Logging
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core': {
+            'handlers': ['console'],
+            # Per-request metric lines would drown out test output.
+            'level': 'WARNING' if TESTING else os.getenv('CORE_LOG_LEVEL', 'INFO'),
+        },
+    },
 }
 
 
@@ -139,6 +247,16 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# Uploaded media, served by core.media.serve_media with far-future cache
+# headers and byte ranges. MEDIA_ROOT holds it when R2 is off.
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', str(BASE_DIR / 'media'))
+# With R2 on, setting MEDIA_CACHE_DIR serves media from this site too,
+# through an on-disk LRU cache of up to MEDIA_CACHE_MAX_BYTES, instead of
+# linking to the bucket.
+MEDIA_CACHE_DIR = os.getenv('MEDIA_CACHE_DIR', '')
+MEDIA_CACHE_MAX_BYTES = int(os.getenv('MEDIA_CACHE_MAX_BYTES', str(2 * 1024 ** 3)))
+
 # Authentication
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/admin-blog/'
@@ -162,24 +280,38 @@ R2_ACCESS_KEY_ID = os.getenv("R2_ACCESS_KEY_ID", "")
 R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY", "")
 R2_BUCKET_NAME = os.getenv("R2_BUCKET_NAME", "treefel-media")
 R2_CUSTOM_DOMAIN = os.getenv("R2_CUSTOM_DOMAIN", "")
+# Any S3-compatible endpoint, e.g. a local MinIO (http://localhost:9000) for
+# trying direct uploads without R2. Overrides the one derived from the account.
+R2_ENDPOINT_URL = os.getenv("R2_ENDPOINT_URL", "")
 
 STORAGES = {
     "default": {
         "BACKEND": "django.core.files.storage.FileSystemStorage",
     },
     "staticfiles": {
-        "BACKEND": "whitenoise.storage.CompressedStaticFilesStorage",
+        # Hashed filenames let WhiteNoise serve vendored assets with far-future
+        # cache headers. The manifest only exists after collectstatic, so test
+        # runs fall back to the plain storage.
+        "BACKEND": (
+            "whitenoise.storage.CompressedStaticFilesStorage"
+            if TESTING
+            else "whitenoise.storage.CompressedManifestStaticFilesStorage"
+        ),
     },
 }
 
-if R2_ACCOUNT_ID:
+if R2_ACCOUNT_ID or R2_ENDPOINT_URL:
     STORAGES["default"] = {
-        "BACKEND": "storages.backends.s3boto3.S3Boto3Storage",
+        "BACKEND": (
+            "core.media.ProxiedS3Storage"
+            if MEDIA_CACHE_DIR
+            else "storages.backends.s3boto3.S3Boto3Storage"
+        ),
         "OPTIONS": {
             "access_key": R2_ACCESS_KEY_ID,
             "secret_key": R2_SECRET_ACCESS_KEY,
             "bucket_name": R2_BUCKET_NAME,
-            "endpoint_url": f"https://{R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
+            "endpoint_url": R2_ENDPOINT_URL or f"https://{R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
             "custom_domain": R2_CUSTOM_DOMAIN or None,
             "default_acl": "public-read",
             "signature_version": "s3v4",
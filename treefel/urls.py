@@ -1,9 +1,11 @@
 from django.contrib import admin
 from django.urls import path, include
+from core.media import serve_media
 
 urlpatterns = [
     path('django-admin/', admin.site.urls),
     path('accounts/', include('django.contrib.auth.urls')),
     path('tinymce/', include('tinymce.urls')),
+    path('media/<path:path>', serve_media, name='media'),
     path('', include('core.urls')),
 ]